@@ -0,0 +1,10 @@
+"""
+Pytest configuration for backend tests
+Makes the backend `app` package importable once for the whole suite
+"""
+import sys
+from pathlib import Path
+
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
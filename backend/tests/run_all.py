@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run the web search tool tests and the vision + web search E2E tests
+concurrently on a single event loop
+
+Both suites share one interpreter and one loop, so their searches overlap
+instead of running as two separate `python test_*.py` processes.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+from tests.test_web_search_tool import run_tests as run_web_search_tool_tests
+from tests.test_vision_web_e2e import run_tests as run_vision_web_e2e_tests
+
+
+async def main():
+    """Run both suites concurrently and summarize"""
+    # Block-buffer stdout so each test's progress prints don't become a write syscall
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
+    print("=" * 70)
+    print("WEB SEARCH TOOL + VISION E2E TESTS")
+    print("=" * 70)
+
+    tool_results, e2e_results = await asyncio.gather(
+        run_web_search_tool_tests(),
+        run_vision_web_e2e_tests()
+    )
+
+    # Summary (same pass criteria as the individual scripts)
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+
+    tool_passed, tool_total = sum(tool_results), len(tool_results)
+    e2e_passed, e2e_total = sum(e2e_results), len(e2e_results)
+    print(f"Web search tool: {tool_passed}/{tool_total}")
+    print(f"Vision + web search E2E: {e2e_passed}/{e2e_total}")
+
+    tool_ok = tool_passed == tool_total
+    e2e_ok = e2e_passed >= e2e_total // 2
+
+    if tool_ok and e2e_ok:
+        print("\n✅ ALL SUITES PASSED")
+        return 0
+    else:
+        print("\n❌ SOME SUITES FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.stdout.flush()
+    sys.exit(exit_code)
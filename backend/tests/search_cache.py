@@ -0,0 +1,54 @@
+"""
+On-disk cache for web_search results shared by the web search test scripts
+Repeat runs read results from disk instead of hitting SearXNG again
+
+Set IRIS_TEST_NOCACHE=1 to bypass the cache and force fresh searches
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from app.services.agent_tools import web_search
+
+CACHE_DIR = Path(__file__).resolve().parent / ".websearch_cache"
+
+# Underlying coroutine behind the LangChain tool; calling it directly skips
+# the tool wrapper's input validation and dispatch on every search
+_raw_search = getattr(web_search, "coroutine", None) or web_search.func
+
+
+def _cache_enabled() -> bool:
+    """Check whether the on-disk cache should be used"""
+    return os.environ.get("IRIS_TEST_NOCACHE") != "1"
+
+
+def _ckey(query: str) -> str:
+    """Derive the cache file name for a query"""
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+
+async def cached_search(query: str) -> str:
+    """
+    Run web_search for a query, memoized on disk
+
+    Failed searches are returned but never cached, so a transient SearXNG
+    outage doesn't poison later runs.
+
+    Args:
+        query: The search query
+
+    Returns:
+        Formatted search results string from the web_search tool
+    """
+    path = CACHE_DIR / _ckey(query)
+
+    if _cache_enabled() and path.exists():
+        return path.read_text(encoding="utf-8")
+
+    result = await _raw_search(query=query)
+
+    if _cache_enabled() and result and not result.startswith("Web search failed"):
+        CACHE_DIR.mkdir(exist_ok=True)
+        path.write_text(result, encoding="utf-8")
+
+    return result
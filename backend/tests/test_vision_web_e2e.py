@@ -3,24 +3,67 @@ End-to-End Test: Vision + Web Search Integration
 Tests the complete flow of detecting objects and searching for information about them
 """
 import asyncio
+import functools
+import re
 import sys
-import os
+from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add backend directory to path for imports when run as a script
+# (under pytest, tests/conftest.py already does this)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
 
 from app.services.context_manager import context_manager
-from app.services.agent_tools import web_search
+from tests.search_cache import cached_search
 
+# Retry policy for rate-limited searches (only paid when SearXNG pushes back)
+MAX_SEARCH_RETRIES = 3
+MAX_BACKOFF_SECONDS = 30.0
 
-async def test_web_search_tool_directly():
+# Case-insensitive match for the simulated "car" detection, without lowercasing the whole result
+_CAR_RE = re.compile(r"car", re.IGNORECASE)
+
+
+def _looks_rate_limited(result: str) -> bool:
+    """Heuristic check for a CAPTCHA / rate-limit response from the search engine"""
+    if not result or len(result) < 50:
+        return True
+    lowered = result.lower()
+    return "captcha" in lowered or "rate limit" in lowered
+
+
+async def search_with_backoff(query: str, search=cached_search) -> str:
+    """
+    Run a web search, backing off exponentially only if it looks rate-limited
+
+    Clean runs pay no delay; a CAPTCHA response is retried after 1s, 2s, 4s, ...
+
+    Args:
+        query: The search query
+        search: Search coroutine taking a query string (defaults to the disk cache)
+    """
+    backoff = 1.0
+    result = await search(query)
+
+    for _ in range(MAX_SEARCH_RETRIES):
+        if not _looks_rate_limited(result):
+            break
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        result = await search(query)
+
+    return result
+
+
+async def test_web_search_tool_directly(search=cached_search):
     """Test 1: Web search tool works independently"""
     print("\n=== Test 1: Web Search Tool (Direct Call) ===")
     try:
         # Test web search directly
-        result = await web_search.ainvoke({"query": "Python programming language"})
+        result = await search_with_backoff("Python programming language", search)
 
-        if result and len(result) > 50:
+        if isinstance(result, str) and len(result) > 50:
             print(f"✅ PASS: Web search tool works")
             print(f"   Result preview: {result[:100]}...")
             return True
@@ -35,7 +78,7 @@ async def test_web_search_tool_directly():
         return False
 
 
-async def test_simulated_vision_context():
+async def test_simulated_vision_context(search=cached_search):
     """Test 2: Simulated vision detection + web search context"""
     print("\n=== Test 2: Simulated Vision Context ===")
     try:
@@ -49,9 +92,12 @@ async def test_simulated_vision_context():
 
         # Now search for information about the detected object
         search_query = f"what is a {detected_object} used for"
-        result = await web_search.ainvoke({"query": search_query})
+        result = await search_with_backoff(search_query, search)
+
+        # Cheapest checks first: type, then length, then the content scan
+        relevant = isinstance(result, str) and len(result) > 50 and _CAR_RE.search(result)
 
-        if result and "car" in result.lower():
+        if relevant:
             print(f"✅ PASS: Web search returned relevant info about {detected_object}")
             print(f"   Search query: {search_query}")
             print(f"   Result preview: {result[:150]}...")
@@ -67,7 +113,7 @@ async def test_simulated_vision_context():
         return False
 
 
-async def test_contextual_search_queries():
+async def test_contextual_search_queries(search=cached_search):
     """Test 3: Different contextual search queries"""
     print("\n=== Test 3: Contextual Search Queries ===")
 
@@ -81,18 +127,15 @@ async def test_contextual_search_queries():
     for obj, query in test_cases:
         try:
             print(f"\n   Testing: {obj} → '{query}'")
-            result = await web_search.ainvoke({"query": query})
+            result = await search_with_backoff(query, search)
 
-            if result and len(result) > 30:
+            if isinstance(result, str) and len(result) > 30:
                 print(f"   ✅ Query successful")
                 results.append(True)
             else:
                 print(f"   ❌ Query failed or insufficient results")
                 results.append(False)
 
-            # Delay between queries to avoid CAPTCHA
-            await asyncio.sleep(2)
-
         except Exception as e:
             print(f"   ❌ Error: {e}")
             results.append(False)
@@ -108,7 +151,7 @@ async def test_contextual_search_queries():
         return passed >= total // 2  # Pass if at least half succeed
 
 
-async def test_current_status_queries():
+async def test_current_status_queries(search=cached_search):
     """Test 4: Current status/information queries"""
     print("\n=== Test 4: Current Status Queries ===")
     try:
@@ -121,9 +164,9 @@ async def test_current_status_queries():
         # Agent should search for current Tesla information
         query = "current status of Tesla electric cars 2025"
 
-        result = await web_search.ainvoke({"query": query})
+        result = await search_with_backoff(query, search)
 
-        if result and len(result) > 50:
+        if isinstance(result, str) and len(result) > 50:
             print(f"✅ PASS: Retrieved current information")
             print(f"   Query: {query}")
             print(f"   Result preview: {result[:150]}...")
@@ -138,7 +181,7 @@ async def test_current_status_queries():
         return False
 
 
-async def test_integration_flow_simulation():
+async def test_integration_flow_simulation(search=cached_search):
     """Test 5: Complete integration flow simulation"""
     print("\n=== Test 5: Complete Integration Flow ===")
     try:
@@ -164,10 +207,8 @@ async def test_integration_flow_simulation():
         print("\n   Step 4: Execute web searches")
         search_results = []
         for query in queries[:2]:  # Test first 2 to save time
-            result = await web_search.ainvoke({"query": query})
-            search_results.append(result is not None and len(result) > 30)
-            # Delay between searches to avoid CAPTCHA
-            await asyncio.sleep(2)
+            result = await search_with_backoff(query, search)
+            search_results.append(isinstance(result, str) and len(result) > 30)
 
         # Step 5: Verify results
         if all(search_results):
@@ -184,8 +225,39 @@ async def test_integration_flow_simulation():
         return False
 
 
+async def run_tests(search=cached_search) -> list:
+    """
+    Run all E2E tests on the current event loop
+
+    Args:
+        search: Search coroutine the tests should use (disk cache, stub, ...)
+
+    Returns:
+        List of per-test pass/fail results
+    """
+    tests = [
+        functools.partial(test, search=search)
+        for test in (
+            test_web_search_tool_directly,
+            test_simulated_vision_context,
+            test_contextual_search_queries,
+            test_current_status_queries,
+            test_integration_flow_simulation
+        )
+    ]
+
+    results = []
+    for test in tests:
+        result = await test()
+        results.append(result)
+    return results
+
+
 async def main():
     """Run all E2E tests"""
+    # Block-buffer stdout so each test's progress prints don't become a write syscall
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
     print("=" * 70)
     print("VISION + WEB SEARCH E2E INTEGRATION TESTS")
     print("=" * 70)
@@ -195,20 +267,7 @@ async def main():
     print("3. Current status queries")
     print("=" * 70)
 
-    tests = [
-        test_web_search_tool_directly,
-        test_simulated_vision_context,
-        test_contextual_search_queries,
-        test_current_status_queries,
-        test_integration_flow_simulation
-    ]
-
-    results = []
-    for test in tests:
-        result = await test()
-        results.append(result)
-        # Delay between tests to avoid CAPTCHA triggers
-        await asyncio.sleep(2)
+    results = await run_tests()
 
     # Summary
     print("\n" + "=" * 70)
@@ -233,4 +292,5 @@ async def main():
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
+    sys.stdout.flush()
     sys.exit(exit_code)
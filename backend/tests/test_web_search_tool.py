@@ -3,13 +3,33 @@ Verification tests for web_search tool in agent_tools.py
 Tests the LangChain tool interface
 """
 import asyncio
+import functools
+import re
 import sys
-import os
+from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add backend directory to path for imports when run as a script
+# (under pytest, tests/conftest.py already does this)
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
 
 from app.services.agent_tools import web_search
+from tests.search_cache import cached_search
+
+# Formatting markers emitted by web_search: query header, numbered entries, URLs
+_FORMAT_MARKERS = ("Search results for", "\n1. ", "URL:")
+_FORMAT_MARKERS_RE = re.compile("|".join(re.escape(m) for m in _FORMAT_MARKERS))
+
+
+def _scan_format_markers(result: str) -> set:
+    """Return the formatting markers found in result, in a single pass"""
+    seen = set()
+    for match in _FORMAT_MARKERS_RE.finditer(result):
+        seen.add(match.group())
+        if len(seen) == len(_FORMAT_MARKERS):
+            break
+    return seen
 
 
 async def test_tool_can_be_called():
@@ -33,16 +53,17 @@ async def test_tool_can_be_called():
         return False
 
 
-async def test_tool_returns_formatted_results():
+async def test_tool_returns_formatted_results(search=cached_search):
     """Test 2: Tool returns well-formatted results"""
     print("\n=== Test 2: Formatted Results ===")
     try:
-        result = await web_search.ainvoke({"query": "artificial intelligence"})
+        result = await search("artificial intelligence")
 
         # Check for key formatting elements
-        has_search_query = "Search results for" in result
-        has_numbered_results = "\n1. " in result
-        has_urls = "URL:" in result
+        markers = _scan_format_markers(result)
+        has_search_query = "Search results for" in markers
+        has_numbered_results = "\n1. " in markers
+        has_urls = "URL:" in markers
 
         if has_search_query and has_numbered_results and has_urls:
             print(f"✅ PASS: Results are properly formatted")
@@ -64,17 +85,15 @@ async def test_tool_returns_formatted_results():
         return False
 
 
-async def test_tool_handles_no_results():
+async def test_tool_handles_no_results(search=cached_search):
     """Test 3: Tool handles queries with no results gracefully"""
     print("\n=== Test 3: No Results Handling ===")
     try:
         # Search for something very unlikely to have results
-        result = await web_search.ainvoke(
-            {"query": "xyzabc123nonexistentquery456789"}
-        )
+        result = await search("xyzabc123nonexistentquery456789")
 
-        # Tool should return a message, not crash
-        if "No search results" in result or "Search results for" in result:
+        # Tool should return a message, not crash (both formats lead with it)
+        if result.startswith(("No search results", "Search results for")):
             print(f"✅ PASS: Tool handled no-results case gracefully")
             print(f"   Response: {result[:100]}")
             return True
@@ -114,16 +133,21 @@ async def test_tool_metadata():
         return False
 
 
-async def main():
-    """Run all tests"""
-    print("=" * 60)
-    print("WEB SEARCH TOOL VERIFICATION TESTS")
-    print("=" * 60)
+async def run_tests(search=cached_search) -> list:
+    """
+    Run all web search tool tests on the current event loop
+
+    Args:
+        search: Search coroutine for the result-format tests (disk cache, stub, ...);
+            the call and metadata tests always exercise the tool wrapper itself
 
+    Returns:
+        List of per-test pass/fail results
+    """
     tests = [
         test_tool_can_be_called,
-        test_tool_returns_formatted_results,
-        test_tool_handles_no_results,
+        functools.partial(test_tool_returns_formatted_results, search=search),
+        functools.partial(test_tool_handles_no_results, search=search),
         test_tool_metadata
     ]
 
@@ -131,6 +155,19 @@ async def main():
     for test in tests:
         result = await test()
         results.append(result)
+    return results
+
+
+async def main():
+    """Run all tests"""
+    # Block-buffer stdout so each test's progress prints don't become a write syscall
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
+    print("=" * 60)
+    print("WEB SEARCH TOOL VERIFICATION TESTS")
+    print("=" * 60)
+
+    results = await run_tests()
 
     # Summary
     print("\n" + "=" * 60)
@@ -150,4 +187,5 @@ async def main():
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
+    sys.stdout.flush()
     sys.exit(exit_code)
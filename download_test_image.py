@@ -23,16 +23,20 @@ def download_test_image():
     print(f"Downloading test image from Unsplash...")
 
     try:
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
+        with requests.get(image_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
 
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
 
+        size_kb = output_path.stat().st_size / 1024
         print(f"✓ Test image downloaded: {output_path}")
-        print(f"  Size: {len(response.content) / 1024:.1f} KB")
+        print(f"  Size: {size_kb:.1f} KB")
 
     except Exception as e:
+        # Don't leave a partial download behind to be mistaken for the image
+        output_path.unlink(missing_ok=True)
         print(f"✗ Failed to download test image: {e}")
         print(f"  Please manually place a test image in: {test_dir}/sample.jpg")
 
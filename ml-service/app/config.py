@@ -3,7 +3,7 @@ ML Service Configuration
 Manages settings for YOLO models and inference
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     port: int = 9001
     environment: str = "development"
     auto_reload: bool = False  # Set to True for development auto-reload
+    log_level: str = "INFO"  # WARNING in production skips per-request INFO logs
 
     # YOLO Model Paths
     detection_model_path: str = "models/yolo11n.pt"
@@ -24,14 +25,61 @@ class Settings(BaseSettings):
     device: str = "cpu"  # "cpu" or "cuda" for GPU
     batch_size: int = 1
     max_image_size: int = 1920
+    half: bool = False  # FP16 inference (CUDA only; TensorRT engines are always FP16)
+    # Inference precision: "fp32", "fp16" (CUDA; same as half=True) or "int8"
+    # (CPU; models are exported once to INT8 OpenVINO, calibrated on COCO8)
+    precision: Literal["fp32", "fp16", "int8"] = "fp32"
 
     # Performance
     num_workers: int = 4
     model_warmup: bool = True
+    warmup_batch_sizes: list = [1, 8, 16]  # Batch sizes to warm up (video frames are batched)
+    warmup_iterations: int = 2
+    cudnn_benchmark: bool = True  # CUDA: let cuDNN autotune conv algorithms per input shape (picked during warmup)
+
+    # Video frame pipeline (decode runs ahead of batched inference)
+    video_batch_size: int = 8  # Frames per predict call (frame extraction, whole-video and annotated video)
+    video_decode_queue_size: int = 4
+    video_pipeline_prefetch: int = 8  # Frames buffered between decode/infer/encode of annotated video
+    video_backend: str = "opencv"  # Annotated video decoder: "opencv" or "pyav" (NVDEC on CUDA)
+    video_encode_workers: int = 4  # Threads JPEG-encoding extracted frames alongside decode (0 = inline)
+
+    # /detect, /segment and the stream endpoints: concurrent requests are micro-batched
+    stream_max_batch: int = 8
+    stream_max_wait_ms: float = 5.0  # Wait after the first request for more to arrive
+
+    # /detect-video-async: >0 runs tasks in that many worker processes
+    # (each loads its own models); 0 runs them in the API process
+    video_worker_processes: int = 0
+
+    # Cache of single-frame detection results, keyed by video hash + params
+    video_frame_cache_size: int = 128
+    video_frame_cache_ttl: int = 600  # Seconds
+
+    # Decoded multi-frame extractions kept per video + interval, so detect and
+    # segment requests on the same video decode it once (0 = off). Entries
+    # hold full-resolution frames; keep this small
+    video_decoded_frames_cache_size: int = 4
+
+    # Where multi-frame video uploads are spooled for the decoder; point at a
+    # tmpfs (e.g. /dev/shm) to keep them off disk. Empty = system temp dir
+    upload_temp_dir: str = ""
+
+    # Response gzip (runs on the event loop for every response). Level 1 is
+    # several times faster than 6 for a few percent larger JSON; 0 turns the
+    # middleware off, e.g. when a reverse proxy compresses instead
+    gzip_level: int = 1
+    gzip_minimum_size: int = 1024  # Bytes; smaller responses are sent as-is
+
+    # TensorRT (CUDA only): export models to FP16 engines and infer through them
+    use_tensorrt: bool = False
+    tensorrt_imgsz: int = 640
+    tensorrt_max_batch: int = 16  # Upper bound of the engine's dynamic batch profile
 
     # Image Processing
     supported_formats: list = ["jpg", "jpeg", "png", "webp", "bmp"]
     max_file_size_mb: int = 10
+    jpeg_quality: int = 85  # Quality of annotated JPEG responses (1-100)
 
     # Model Download (if not exists)
     auto_download_models: bool = True
@@ -2,15 +2,23 @@
 Dependency injection for FastAPI endpoints
 Provides clean, testable access to services
 """
+from functools import lru_cache
 from typing import Optional, Annotated
 from fastapi import Depends, HTTPException
 
 from app.services.yolo_service import YOLOService
 from app.services.video_yolo_service import VideoYOLOService
+from app.services.batch_scheduler import BatchScheduler
+from app.services.video_worker import VideoTaskWorker
+from app.handlers import DetectionHandler, AnnotationHandler
+from app.handlers.video_handler import VideoHandler
 
 # Singleton instance - managed by main.py
 _yolo_service_instance: Optional[YOLOService] = None
 _video_yolo_service_instance: Optional[VideoYOLOService] = None
+_detect_scheduler_instance: Optional[BatchScheduler] = None
+_segment_scheduler_instance: Optional[BatchScheduler] = None
+_video_worker_instance: Optional[VideoTaskWorker] = None
 
 
 def get_yolo_service() -> YOLOService:
@@ -80,6 +88,143 @@ def set_video_yolo_service_instance(service: VideoYOLOService) -> None:
     _video_yolo_service_instance = service
 
 
+def get_detect_scheduler() -> BatchScheduler:
+    """
+    FastAPI dependency to get the stream detection BatchScheduler
+
+    Returns:
+        BatchScheduler: Scheduler batching detect and detect-stream requests
+
+    Raises:
+        HTTPException: If scheduler not initialized (503)
+    """
+    if _detect_scheduler_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="YOLO service not initialized. Please wait for models to load."
+        )
+    return _detect_scheduler_instance
+
+
+def get_segment_scheduler() -> BatchScheduler:
+    """
+    FastAPI dependency to get the stream segmentation BatchScheduler
+
+    Returns:
+        BatchScheduler: Scheduler batching segment and segment-stream requests
+
+    Raises:
+        HTTPException: If scheduler not initialized (503)
+    """
+    if _segment_scheduler_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="YOLO service not initialized. Please wait for models to load."
+        )
+    return _segment_scheduler_instance
+
+
+def set_stream_scheduler_instances(
+    detect_scheduler: Optional[BatchScheduler],
+    segment_scheduler: Optional[BatchScheduler]
+) -> None:
+    """
+    Set the stream BatchScheduler singletons
+
+    Called once during application startup (and with None on shutdown)
+
+    Args:
+        detect_scheduler: Started scheduler for detect-stream
+        segment_scheduler: Started scheduler for segment-stream
+    """
+    global _detect_scheduler_instance, _segment_scheduler_instance
+    _detect_scheduler_instance = detect_scheduler
+    _segment_scheduler_instance = segment_scheduler
+
+
+def get_video_worker() -> Optional[VideoTaskWorker]:
+    """
+    FastAPI dependency to get the video task worker pool
+
+    Returns:
+        VideoTaskWorker, or None if async video tasks run in-process
+    """
+    return _video_worker_instance
+
+
+def set_video_worker_instance(worker: Optional[VideoTaskWorker]) -> None:
+    """
+    Set the VideoTaskWorker singleton
+
+    Called during application startup if worker processes are enabled
+    (and with None on shutdown)
+
+    Args:
+        worker: Started VideoTaskWorker
+    """
+    global _video_worker_instance
+    _video_worker_instance = worker
+
+
 # Type alias for cleaner endpoint signatures
 YOLOServiceDep = Annotated[YOLOService, Depends(get_yolo_service)]
 VideoYOLOServiceDep = Annotated[VideoYOLOService, Depends(get_video_yolo_service)]
+DetectSchedulerDep = Annotated[BatchScheduler, Depends(get_detect_scheduler)]
+SegmentSchedulerDep = Annotated[BatchScheduler, Depends(get_segment_scheduler)]
+VideoWorkerDep = Annotated[Optional[VideoTaskWorker], Depends(get_video_worker)]
+
+
+# Handlers hold no per-request state, so one instance per service is built
+# on first use and shared by every request (cache is keyed by the service)
+
+@lru_cache(maxsize=1)
+def get_detection_handler(
+    service: YOLOServiceDep,
+    detect_scheduler: DetectSchedulerDep,
+    segment_scheduler: SegmentSchedulerDep
+) -> DetectionHandler:
+    """
+    FastAPI dependency to get the shared DetectionHandler
+
+    Args:
+        service: YOLO service singleton
+        detect_scheduler: Scheduler batching concurrent detect requests
+        segment_scheduler: Scheduler batching concurrent segment requests
+
+    Returns:
+        DetectionHandler: Handler bound to the service and schedulers
+    """
+    return DetectionHandler(service, detect_scheduler, segment_scheduler)
+
+
+@lru_cache(maxsize=1)
+def get_annotation_handler(service: YOLOServiceDep) -> AnnotationHandler:
+    """
+    FastAPI dependency to get the shared AnnotationHandler
+
+    Args:
+        service: YOLO service singleton
+
+    Returns:
+        AnnotationHandler: Handler bound to the service
+    """
+    return AnnotationHandler(service)
+
+
+@lru_cache(maxsize=1)
+def get_video_handler(service: YOLOServiceDep) -> VideoHandler:
+    """
+    FastAPI dependency to get the shared VideoHandler
+
+    Args:
+        service: YOLO service singleton
+
+    Returns:
+        VideoHandler: Handler bound to the service
+    """
+    return VideoHandler(yolo_service=service)
+
+
+DetectionHandlerDep = Annotated[DetectionHandler, Depends(get_detection_handler)]
+AnnotationHandlerDep = Annotated[AnnotationHandler, Depends(get_annotation_handler)]
+VideoHandlerDep = Annotated[VideoHandler, Depends(get_video_handler)]
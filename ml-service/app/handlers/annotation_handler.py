@@ -5,6 +5,7 @@ Handles detect-annotated and detect-faces-annotated endpoints
 from typing import Optional
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import Response
+import asyncio
 
 from app.handlers.base_handler import BaseImageHandler
 from app.utils.async_utils import timed_operation, error_context
@@ -61,10 +62,13 @@ class AnnotationHandler(BaseImageHandler):
             # Parse classes
             class_list = self.parse_classes(classes)
 
+            # Decode once; the same pixels are drawn on below
+            frame = await self._decode(media_bytes)
+
             # Perform detection
             async with timed_operation("YOLO detection") as timer:
                 result = await self.yolo_service.detect(
-                    image_bytes=media_bytes,
+                    image=frame,
                     confidence=confidence,
                     classes=class_list
                 )
@@ -80,8 +84,8 @@ class AnnotationHandler(BaseImageHandler):
             detections = result.get("detections", [])
 
             self.logger.info(
-                f"Detected {len(detections)} objects "
-                f"in {timer['elapsed_ms']}ms, drawing annotations"
+                "Detected %d objects in %sms, drawing annotations",
+                len(detections), timer['elapsed_ms']
             )
 
             # If no detections, return original image
@@ -90,8 +94,11 @@ class AnnotationHandler(BaseImageHandler):
 
             # Draw bounding boxes
             try:
-                annotated_image_bytes = draw_bounding_boxes(
+                # The upload is passed back unchanged if no box is visible
+                annotated_image_bytes = await asyncio.to_thread(
+                    draw_bounding_boxes,
                     image_bytes=media_bytes,
+                    image=frame,
                     detections=detections,
                     line_width=line_width,
                     font_size=font_size
@@ -137,10 +144,13 @@ class AnnotationHandler(BaseImageHandler):
                 allow_video=True
             )
 
+            # Decode once; the same pixels are drawn on below
+            frame = await self._decode(media_bytes)
+
             # Perform face detection
             async with timed_operation("YOLO face detection") as timer:
                 result = await self.yolo_service.detect_faces(
-                    image_bytes=media_bytes,
+                    image=frame,
                     confidence=confidence
                 )
 
@@ -155,8 +165,8 @@ class AnnotationHandler(BaseImageHandler):
             faces = result.get("faces", [])
 
             self.logger.info(
-                f"Detected {len(faces)} faces "
-                f"in {timer['elapsed_ms']}ms, drawing annotations"
+                "Detected %d faces in %sms, drawing annotations",
+                len(faces), timer['elapsed_ms']
             )
 
             # If no faces, return original image
@@ -165,8 +175,10 @@ class AnnotationHandler(BaseImageHandler):
 
             # Draw bounding boxes
             try:
-                annotated_image_bytes = draw_faces(
-                    image_bytes=media_bytes,
+                annotated_image_bytes = await asyncio.to_thread(
+                    draw_faces,
+                    image_bytes=None,
+                    image=frame,
                     faces=faces,
                     line_width=line_width,
                     font_size=font_size
@@ -226,10 +238,13 @@ class AnnotationHandler(BaseImageHandler):
             # Parse classes
             class_list = self.parse_classes(classes)
 
+            # Decode once; the same pixels are drawn on below
+            frame = await self._decode(media_bytes)
+
             # Perform segmentation
             async with timed_operation("YOLO segmentation") as timer:
                 result = await self.yolo_service.segment(
-                    image_bytes=media_bytes,
+                    image=frame,
                     confidence=confidence,
                     classes=class_list
                 )
@@ -245,8 +260,8 @@ class AnnotationHandler(BaseImageHandler):
             segments = result.get("segments", [])
 
             self.logger.info(
-                f"Segmented {len(segments)} objects "
-                f"in {timer['elapsed_ms']}ms, drawing masks"
+                "Segmented %d objects in %sms, drawing masks",
+                len(segments), timer['elapsed_ms']
             )
 
             # If no segments, return original image
@@ -255,8 +270,10 @@ class AnnotationHandler(BaseImageHandler):
 
             # Draw segmentation masks
             try:
-                annotated_image_bytes = draw_segmentation_masks(
-                    image_bytes=media_bytes,
+                annotated_image_bytes = await asyncio.to_thread(
+                    draw_segmentation_masks,
+                    image_bytes=None,
+                    image=frame,
                     segments=segments,
                     opacity=opacity,
                     line_width=line_width,
@@ -3,14 +3,26 @@ Base handler for image processing requests
 Provides common functionality for all handlers
 """
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, Tuple
 from fastapi import UploadFile, HTTPException
+import asyncio
 import logging
+import os
+import sys
+import numpy as np
 
 from app.services.yolo_service import YOLOService
 from app.validators.image_validator import ImageValidator
 from app.validators.video_validator import VideoValidator
-from app.utils.media_utils import detect_media_type
+from app.utils.media_utils import MAGIC_HEAD_SIZE, detect_media_type
+from app.config import settings
+from app.utils.upload_utils import read_capped, stream_upload_to_tempfile
+
+# Validators only hold size limits and format tables, so every handler
+# shares one instance of each rather than building its own
+_IMAGE_VALIDATOR = ImageValidator(max_file_size_mb=10)
+_VIDEO_VALIDATOR = VideoValidator(max_file_size_mb=50)
 
 
 class BaseImageHandler(ABC):
@@ -24,16 +36,23 @@ class BaseImageHandler(ABC):
     - Logging
     """
 
-    def __init__(self, yolo_service: YOLOService):
+    def __init__(
+        self,
+        yolo_service: YOLOService,
+        image_validator: Optional[ImageValidator] = None,
+        video_validator: Optional[VideoValidator] = None
+    ):
         """
         Initialize handler
 
         Args:
             yolo_service: YOLO service instance (injected by FastAPI)
+            image_validator: Pre-built image validator (None = shared default)
+            video_validator: Pre-built video validator (None = shared default)
         """
         self.yolo_service = yolo_service
-        self.image_validator = ImageValidator(max_file_size_mb=10)
-        self.video_validator = VideoValidator(max_file_size_mb=50)
+        self.image_validator = image_validator if image_validator is not None else _IMAGE_VALIDATOR
+        self.video_validator = video_validator if video_validator is not None else _VIDEO_VALIDATOR
         # Keep validator for backward compatibility
         self.validator = self.image_validator
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -57,30 +76,39 @@ class BaseImageHandler(ABC):
             HTTPException: If validation fails
         """
         try:
-            # Read file data
-            file_bytes = await file.read()
-
             # Debug logging
-            self.logger.info(f"File upload - filename: {file.filename}, content_type: {file.content_type}")
+            self.logger.info("File upload - filename: %s, content_type: %s", file.filename, file.content_type)
+
+            # Peek at the leading bytes so the type comes from the content
+            head = await file.read(MAGIC_HEAD_SIZE)
+            await file.seek(0)
 
-            # Detect media type from both filename and content_type
+            # Detect media type from the magic number, then content_type/filename
             media_type = detect_media_type(
                 filename=file.filename,
-                content_type=file.content_type
+                content_type=file.content_type,
+                head=head
             )
 
-            self.logger.info(f"Detected media type: {media_type}")
+            self.logger.info("Detected media type: %s", media_type)
+
+            if media_type == "video" and not allow_video:
+                raise HTTPException(
+                    status_code=400,
+                    detail="This endpoint only accepts image files"
+                )
+
+            # Read file data, rejecting oversized uploads before buffering them fully
+            if media_type == "video":
+                file_bytes = await read_capped(file, self.video_validator.max_file_size_bytes, "Video")
+            else:
+                file_bytes = await read_capped(file, self.image_validator.max_file_size_bytes, "Image")
 
-            # Validate based on type
+            # Validate based on type; for video the size is already capped
+            # and the container header is enough (the decoder checks the rest)
             if media_type == "video":
-                if not allow_video:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="This endpoint only accepts image files"
-                    )
-
-                validation = await self.video_validator.validate_bytes(
-                    file_bytes,
+                validation = await self.video_validator.validate_header(
+                    head,
                     filename=file.filename
                 )
             else:
@@ -94,14 +122,21 @@ class BaseImageHandler(ABC):
                 )
 
             self.logger.info(
-                f"Validated {media_type}: {file.filename} "
-                f"({len(file_bytes) / (1024*1024):.1f}MB)"
+                "Validated %s: %s (%.1fMB)",
+                media_type, file.filename, len(file_bytes) / (1024 * 1024)
             )
 
             return file_bytes
 
         except HTTPException:
             raise
+        except (ValueError, OSError) as e:
+            # Bad or truncated upload: a client error, not worth a traceback
+            self.logger.warning("Failed to read media file: %s", e)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to read media file: {str(e)}"
+            )
         except Exception as e:
             self.logger.error(f"Failed to read media file: {e}", exc_info=True)
             raise HTTPException(
@@ -109,6 +144,84 @@ class BaseImageHandler(ABC):
                 detail=f"Failed to read media file: {str(e)}"
             )
 
+    async def read_and_validate_video_file(self, file: UploadFile) -> str:
+        """
+        Stream an uploaded video to a temporary file and validate it
+
+        The upload goes to disk (settings.upload_temp_dir, e.g. a tmpfs)
+        chunk by chunk instead of being held in memory as bytes, and the
+        decoder opens it by path. The caller owns the file and must remove it.
+
+        Args:
+            file: Uploaded video file
+
+        Returns:
+            Path to the temporary file
+
+        Raises:
+            HTTPException: If validation fails (no file is left behind)
+        """
+        self.logger.info("Video upload - filename: %s, content_type: %s", file.filename, file.content_type)
+
+        # Keep the extension so the decoder can pick the container by name
+        _, ext = os.path.splitext(file.filename or "")
+        try:
+            path = await stream_upload_to_tempfile(
+                file,
+                self.video_validator.max_file_size_bytes,
+                "Video",
+                suffix=ext or ".mp4",
+                dir=settings.upload_temp_dir
+            )
+        except HTTPException:
+            raise
+        except (ValueError, OSError) as e:
+            self.logger.warning("Failed to read video file: %s", e)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to read media file: {str(e)}"
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to read video file: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to read media file: {str(e)}"
+            )
+
+        try:
+            validation = await self.video_validator.validate_file(path, filename=file.filename)
+            if not validation.is_valid:
+                raise HTTPException(
+                    status_code=400,
+                    detail=validation.error_message
+                )
+        except BaseException:
+            os.remove(path)
+            raise
+
+        return path
+
+    async def _decode(self, media_bytes: bytes) -> np.ndarray:
+        """
+        Decode an uploaded image off the event loop
+
+        Args:
+            media_bytes: Uploaded image bytes
+
+        Returns:
+            Decoded image (BGR numpy array), resized as the model sees it
+
+        Raises:
+            HTTPException: If the bytes can't be decoded as an image (400)
+        """
+        try:
+            return await asyncio.to_thread(self.yolo_service.decode_image, media_bytes)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unable to process image: {str(e)}"
+            )
+
     async def read_and_validate_image(self, image: UploadFile) -> bytes:
         """
         Read and validate image from upload (backward compatibility)
@@ -124,24 +237,31 @@ class BaseImageHandler(ABC):
         """
         return await self.read_and_validate_media(image, allow_video=False)
 
-    def parse_classes(self, classes: Optional[str]) -> Optional[List[str]]:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def parse_classes(classes: Optional[str]) -> Optional[Tuple[str, ...]]:
         """
         Parse comma-separated classes string
 
+        Clients resend the same filter on every request, so results are
+        cached per form value (hence the immutable tuple). Names are
+        interned, so every request with the same filter shares one set of
+        strings and later lookups compare by identity first.
+
         Args:
             classes: Comma-separated class names or None
 
         Returns:
-            List of class names or None
+            Tuple of class names, or None if there are none
         """
         if not classes:
             return None
 
         # Parse and clean up class names
-        return [
-            c.strip() for c in classes.split(",")
-            if c.strip()
-        ]
+        return tuple(
+            sys.intern(name) for name in (c.strip() for c in classes.split(","))
+            if name
+        ) or None
 
     def validate_confidence(self, confidence: float) -> None:
         """
@@ -2,16 +2,90 @@
 Detection handler for object detection requests
 Handles detect, segment, and detect-faces endpoints
 """
-from typing import Optional
+import asyncio
+from typing import Awaitable, Callable, Optional
 from fastapi import UploadFile, HTTPException
 
 from app.handlers.base_handler import BaseImageHandler
+from app.services.batch_scheduler import BatchScheduler
+from app.services.yolo_service import YOLOService
 from app.utils.async_utils import timed_operation, error_context
+from app.utils.cache_utils import InFlightRequests, content_hash
 
 
 class DetectionHandler(BaseImageHandler):
     """Handler for object detection requests"""
 
+    def __init__(
+        self,
+        yolo_service: YOLOService,
+        detect_scheduler: Optional[BatchScheduler] = None,
+        segment_scheduler: Optional[BatchScheduler] = None
+    ):
+        """
+        Initialize handler
+
+        Args:
+            yolo_service: YOLO service instance (injected by FastAPI)
+            detect_scheduler: Batches detect requests across clients (None = call the service directly)
+            segment_scheduler: Batches segment requests across clients (None = call the service directly)
+        """
+        super().__init__(yolo_service)
+        self.detect_scheduler = detect_scheduler
+        self.segment_scheduler = segment_scheduler
+        # Concurrent identical uploads (client retries, several viewers of
+        # the same frame) share one inference instead of each running it
+        self._in_flight = InFlightRequests()
+
+    async def _infer(
+        self,
+        scheduler: Optional[BatchScheduler],
+        infer: Callable[..., Awaitable[dict]],
+        image_bytes: bytes,
+        confidence: float,
+        class_list: Optional[tuple]
+    ) -> dict:
+        """
+        Run inference on one upload, batched with concurrent requests if possible
+
+        Requests with the same bytes and parameters that arrive while an
+        identical inference is still running share its result.
+
+        Args:
+            scheduler: BatchScheduler to submit the decoded image to, or None
+            infer: YOLOService method used when there is no scheduler
+            image_bytes: Uploaded image bytes
+            confidence: Confidence threshold
+            class_list: Class names to keep (None = all classes)
+
+        Returns:
+            Result dictionary from the service
+        """
+        digest = await asyncio.to_thread(content_hash, image_bytes)
+        return await self._in_flight.run(
+            (infer, digest, confidence, class_list),
+            lambda: self._run_infer(scheduler, infer, image_bytes, confidence, class_list)
+        )
+
+    async def _run_infer(
+        self,
+        scheduler: Optional[BatchScheduler],
+        infer: Callable[..., Awaitable[dict]],
+        image_bytes: bytes,
+        confidence: float,
+        class_list: Optional[tuple]
+    ) -> dict:
+        """Run one inference through the scheduler or the service (see _infer)"""
+        if scheduler is None:
+            return await infer(
+                image_bytes=image_bytes,
+                confidence=confidence,
+                classes=class_list
+            )
+
+        frame = await self._decode(image_bytes)
+        return await scheduler.submit(frame, confidence=confidence, classes=class_list)
+
     async def process(
         self,
         image: UploadFile,
@@ -47,10 +121,12 @@ class DetectionHandler(BaseImageHandler):
 
             # Perform detection with timing
             async with timed_operation("YOLO detection") as timer:
-                result = await self.yolo_service.detect(
-                    image_bytes=image_bytes,
-                    confidence=confidence,
-                    classes=class_list
+                result = await self._infer(
+                    self.detect_scheduler,
+                    self.yolo_service.detect,
+                    image_bytes,
+                    confidence,
+                    class_list
                 )
 
             # Handle service errors
@@ -61,8 +137,8 @@ class DetectionHandler(BaseImageHandler):
                 )
 
             self.logger.info(
-                f"Detected {result.get('count', 0)} objects "
-                f"in {timer['elapsed_ms']}ms"
+                "Detected %d objects in %sms",
+                result.get('count', 0), timer['elapsed_ms']
             )
 
             return result
@@ -102,10 +178,12 @@ class DetectionHandler(BaseImageHandler):
 
             # Perform segmentation with timing
             async with timed_operation("YOLO segmentation") as timer:
-                result = await self.yolo_service.segment(
-                    image_bytes=image_bytes,
-                    confidence=confidence,
-                    classes=class_list
+                result = await self._infer(
+                    self.segment_scheduler,
+                    self.yolo_service.segment,
+                    image_bytes,
+                    confidence,
+                    class_list
                 )
 
             # Handle service errors
@@ -116,8 +194,8 @@ class DetectionHandler(BaseImageHandler):
                 )
 
             self.logger.info(
-                f"Segmented {result.get('count', 0)} objects "
-                f"in {timer['elapsed_ms']}ms"
+                "Segmented %d objects in %sms",
+                result.get('count', 0), timer['elapsed_ms']
             )
 
             return result
@@ -165,8 +243,8 @@ class DetectionHandler(BaseImageHandler):
                 )
 
             self.logger.info(
-                f"Detected {result.get('count', 0)} faces "
-                f"in {timer['elapsed_ms']}ms"
+                "Detected %d faces in %sms",
+                result.get('count', 0), timer['elapsed_ms']
             )
 
             return result
@@ -3,17 +3,26 @@ Video processing handler
 
 Handles video-specific requests including frame extraction and processing.
 """
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable, AsyncIterator, Literal
 from fastapi import UploadFile
+import asyncio
+import threading
 import logging
+import os
+import time
 
+from app.config import settings
 from app.handlers.base_handler import BaseImageHandler
 from app.services.yolo_service import YOLOService
-from app.services.video_frame_service import VideoFrameService
+from app.services.video_frame_service import VideoFrameService, FrameData, VideoInfo
+from app.utils.cache_utils import TTLCache, content_hash, file_content_hash
 
 
 logger = logging.getLogger(__name__)
 
+# Called with each batch of (FrameData, inference result) pairs as it completes
+BatchCallback = Callable[[List[Tuple[FrameData, Dict]]], Awaitable[None]]
+
 
 class VideoHandler(BaseImageHandler):
     """
@@ -39,6 +48,192 @@ class VideoHandler(BaseImageHandler):
         """
         super().__init__(yolo_service)
         self.frame_service = frame_service or VideoFrameService()
+        self._frame_result_cache = TTLCache(
+            maxsize=settings.video_frame_cache_size,
+            ttl=settings.video_frame_cache_ttl
+        )
+        self._decoded_frames_cache = TTLCache(
+            maxsize=settings.video_decoded_frames_cache_size,
+            ttl=settings.video_frame_cache_ttl
+        ) if settings.video_decoded_frames_cache_size > 0 else None
+
+    async def _extract_and_infer(
+        self,
+        video_path: str,
+        frame_interval: float,
+        max_frames: int,
+        infer_batch: Callable[[List], Awaitable[List[Dict]]],
+        include_base64: bool = True,
+        on_batch: Optional[BatchCallback] = None
+    ) -> Tuple[List[Tuple[FrameData, Dict]], VideoInfo]:
+        """
+        Decode frames and run batched inference concurrently
+
+        A worker thread decodes frames into a bounded queue while this
+        coroutine pulls them off in batches and runs inference, so decoding
+        of the next batch overlaps inference of the current one. Decoded
+        frames are cached per video and extraction settings, so a repeat
+        request (e.g. segmentation after detection) skips decoding.
+
+        Args:
+            video_path: Path to the uploaded video file
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+            infer_batch: Batched inference call taking a list of decoded frames
+            include_base64: Whether to base64-encode each frame's JPEG
+            on_batch: Optional callback awaited with each batch of results as
+                soon as it is inferred, so they can be sent before the rest
+
+        Returns:
+            Tuple of (list of (FrameData, inference result) pairs, VideoInfo)
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        cache_key = None
+        if self._decoded_frames_cache is not None:
+            # Detect and segment requests for one video share its decoded frames
+            video_hash = await asyncio.to_thread(file_content_hash, video_path)
+            cache_key = (video_hash, frame_interval, max_frames)
+            cached = self._decoded_frames_cache.get(cache_key)
+            if cached is not None:
+                return await self._infer_decoded_frames(*cached, infer_batch, include_base64, on_batch)
+
+        pairs, video_info = await self._decode_and_infer(
+            video_path, frame_interval, max_frames, infer_batch, include_base64, on_batch
+        )
+
+        if cache_key is not None:
+            self._decoded_frames_cache.set(cache_key, ([f for f, _ in pairs], video_info))
+
+        return pairs, video_info
+
+    async def _infer_decoded_frames(
+        self,
+        frames: List[FrameData],
+        video_info: VideoInfo,
+        infer_batch: Callable[[List], Awaitable[List[Dict]]],
+        include_base64: bool,
+        on_batch: Optional[BatchCallback] = None
+    ) -> Tuple[List[Tuple[FrameData, Dict]], VideoInfo]:
+        """
+        Run batched inference on frames decoded by an earlier request
+
+        Args:
+            frames: Cached frames (with decoded images)
+            video_info: Cached video metadata
+            infer_batch: Batched inference call taking a list of decoded frames
+            include_base64: Whether each frame needs its base64 JPEG
+            on_batch: Optional callback awaited with each batch of results
+
+        Returns:
+            Tuple of (list of (FrameData, inference result) pairs, VideoInfo)
+        """
+        if include_base64:
+            # Frames cached by a multipart request were extracted without base64
+            for frame_data in frames:
+                if frame_data.frame_base64 is None:
+                    frame_data.frame_base64 = self.frame_service.encode_bytes_to_base64(
+                        frame_data.frame_bytes
+                    )
+
+        pairs = []
+        for i in range(0, len(frames), settings.video_batch_size):
+            batch = frames[i:i + settings.video_batch_size]
+            batch_results = await infer_batch([f.image for f in batch])
+            batch_pairs = list(zip(batch, batch_results))
+            pairs.extend(batch_pairs)
+            if on_batch is not None:
+                await on_batch(batch_pairs)
+
+        return pairs, video_info
+
+    async def _decode_and_infer(
+        self,
+        video_path: str,
+        frame_interval: float,
+        max_frames: int,
+        infer_batch: Callable[[List], Awaitable[List[Dict]]],
+        include_base64: bool,
+        on_batch: Optional[BatchCallback] = None
+    ) -> Tuple[List[Tuple[FrameData, Dict]], VideoInfo]:
+        """
+        Decode frames on a worker thread while inferring on earlier batches
+
+        Args:
+            video_path: Path to the uploaded video file
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+            infer_batch: Batched inference call taking a list of decoded frames
+            include_base64: Whether to base64-encode each frame's JPEG
+            on_batch: Optional callback awaited with each batch of results
+
+        Returns:
+            Tuple of (list of (FrameData, inference result) pairs, VideoInfo)
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.video_decode_queue_size)
+        stop = threading.Event()
+
+        def put(item) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def on_frame(frame_data: FrameData) -> None:
+            if stop.is_set():
+                raise RuntimeError("Frame consumer stopped")
+            put(frame_data)
+
+        def produce() -> VideoInfo:
+            try:
+                _, video_info = self.frame_service.extract_frames_by_interval(
+                    video_path=video_path,
+                    frame_interval=frame_interval,
+                    max_frames=max_frames,
+                    include_base64=include_base64,
+                    jpeg_quality=85,
+                    on_frame=on_frame
+                )
+                return video_info
+            finally:
+                if not stop.is_set():
+                    put(None)  # End of frames
+
+        producer = loop.run_in_executor(None, produce)
+
+        pairs = []
+        batch = []
+        try:
+            while True:
+                frame_data = await queue.get()
+                if frame_data is not None:
+                    batch.append(frame_data)
+
+                if batch and (frame_data is None or len(batch) >= settings.video_batch_size):
+                    batch_results = await infer_batch([f.image for f in batch])
+                    batch_pairs = list(zip(batch, batch_results))
+                    pairs.extend(batch_pairs)
+                    if on_batch is not None:
+                        await on_batch(batch_pairs)
+                    batch = []
+
+                if frame_data is None:
+                    break
+
+            video_info = await producer
+        finally:
+            if not producer.done():
+                # Unblock and stop the decoder if inference failed mid-stream
+                stop.set()
+                while not producer.done():
+                    while not queue.empty():
+                        queue.get_nowait()
+                    await asyncio.sleep(0.01)
+                producer.exception()  # Mark the decoder's abort as retrieved
+
+        return pairs, video_info
 
     async def process_single_frame_detection(
         self,
@@ -65,26 +260,40 @@ class VideoHandler(BaseImageHandler):
         # Parse classes
         class_list = self.parse_classes(classes)
 
-        # Extract frame
-        frame_data = self.frame_service.extract_single_frame(
-            video_bytes=video_bytes,
-            frame_index=frame_index,
-            include_base64=True,
-            jpeg_quality=85
+        # Identical video + parameters give an identical result
+        video_hash = await asyncio.to_thread(content_hash, video_bytes)
+        cache_key = (
+            video_hash,
+            round(confidence, 2),
+            class_list,
+            frame_index
+        )
+        cached = self._frame_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Extract frame and get video info for metadata in worker threads;
+        # decoding and JPEG encoding are blocking and would stall the event loop
+        frame_data, video_info = await asyncio.gather(
+            asyncio.to_thread(
+                self.frame_service.extract_single_frame,
+                video_bytes=video_bytes,
+                frame_index=frame_index,
+                include_base64=True,
+                jpeg_quality=85
+            ),
+            asyncio.to_thread(self.frame_service.get_video_info, video_bytes)
         )
 
-        # Get video info for metadata
-        video_info = self.frame_service.get_video_info(video_bytes)
-
-        # Run detection on the extracted frame
-        result = await self.yolo_service.detect(
-            image_bytes=frame_data.frame_bytes,
+        # Run detection on the decoded frame (JPEG is only for the response)
+        result = await self.yolo_service.detect_numpy(
+            image=frame_data.image,
             confidence=confidence,
             classes=class_list
         )
 
         # Return frame + detections
-        return {
+        response = {
             "status": "success",
             "frame_base64": frame_data.frame_base64,
             "frame_index": frame_data.frame_index,
@@ -93,6 +302,9 @@ class VideoHandler(BaseImageHandler):
             "image_shape": result.get("image_shape", []),
             "count": result.get("count", 0)
         }
+        self._frame_result_cache.set(cache_key, response)
+
+        return response
 
     async def process_multiple_frames_detection(
         self,
@@ -100,7 +312,8 @@ class VideoHandler(BaseImageHandler):
         confidence: float,
         classes: Optional[str] = None,
         frame_interval: float = 2.0,
-        max_frames: int = 10
+        max_frames: int = 10,
+        include_base64: bool = True
     ) -> Dict:
         """
         Extract multiple frames from video and run detection on each
@@ -111,153 +324,254 @@ class VideoHandler(BaseImageHandler):
             classes: Comma-separated class names (optional)
             frame_interval: Seconds between extracted frames
             max_frames: Maximum number of frames to extract
+            include_base64: Whether to base64-encode each frame ("frame_base64");
+                if False, raw JPEG bytes are returned as "frame_jpeg" instead
 
         Returns:
             Dict with array of frames with detections
         """
-        # Read and validate video
-        video_bytes = await self.read_and_validate_media(video, allow_video=True)
+        return await self._process_multiple_frames(
+            video, confidence, classes, frame_interval, max_frames, include_base64,
+            infer_batch=self.yolo_service.detect_batch,
+            item_key="detections"
+        )
 
-        # Parse classes
-        class_list = self.parse_classes(classes)
+    async def process_multiple_frames_segmentation(
+        self,
+        video: UploadFile,
+        confidence: float,
+        classes: Optional[str] = None,
+        frame_interval: float = 2.0,
+        max_frames: int = 10,
+        include_base64: bool = True
+    ) -> Dict:
+        """
+        Extract multiple frames from video and run segmentation on each
+
+        Args:
+            video: Uploaded video file
+            confidence: Segmentation confidence threshold
+            classes: Comma-separated class names (optional)
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+            include_base64: Whether to base64-encode each frame ("frame_base64");
+                if False, raw JPEG bytes are returned as "frame_jpeg" instead
 
-        # Extract frames
-        frames, video_info = self.frame_service.extract_frames_by_interval(
-            video_bytes=video_bytes,
-            frame_interval=frame_interval,
-            max_frames=max_frames,
-            include_base64=True,
-            jpeg_quality=85
+        Returns:
+            Dict with array of frames with segmentations
+        """
+        return await self._process_multiple_frames(
+            video, confidence, classes, frame_interval, max_frames, include_base64,
+            infer_batch=self.yolo_service.segment_batch,
+            item_key="segments"
         )
 
-        logger.info(f"Extracted {len(frames)} frames, running detection on each")
+    async def _process_multiple_frames(
+        self,
+        video: UploadFile,
+        confidence: float,
+        classes: Optional[str],
+        frame_interval: float,
+        max_frames: int,
+        include_base64: bool,
+        infer_batch: Callable[..., Awaitable[List[Dict]]],
+        item_key: Literal["detections", "segments"]
+    ) -> Dict:
+        """
+        Shared body of the multi-frame detection and segmentation requests
 
-        # Run detection on each frame
-        results = []
-        for frame_data in frames:
-            # Run detection
-            detection_result = await self.yolo_service.detect(
-                image_bytes=frame_data.frame_bytes,
-                confidence=confidence,
-                classes=class_list
-            )
+        Args:
+            video: Uploaded video file
+            confidence: Confidence threshold
+            classes: Comma-separated class names (optional)
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+            include_base64: Whether to base64-encode each frame
+            infer_batch: YOLOService batch method (detect_batch or segment_batch)
+            item_key: Result key for per-frame items ("detections" or "segments")
 
-            # Build result for this frame
-            results.append({
-                "frame_index": frame_data.frame_index,
-                "timestamp": round(frame_data.timestamp, 2),
-                "frame_base64": frame_data.frame_base64,
-                "detections": detection_result.get("detections", []),
-                "image_shape": detection_result.get("image_shape", []),
-                "count": detection_result.get("count", 0)
-            })
-
-            logger.info(
-                f"Frame {frame_data.frame_index} ({frame_data.timestamp:.2f}s): "
-                f"{detection_result.get('count', 0)} detections"
-            )
+        Returns:
+            Dict with array of frames with results, plus total_<item_key>
+        """
+        start_time = time.perf_counter()
 
-        # Calculate total detections
-        total_detections = sum(f["count"] for f in results)
+        # Stream the video to a temp file; the decoder reads it by path
+        video_path = await self.read_and_validate_video_file(video)
 
-        logger.info(f"Processed {len(results)} frames, total {total_detections} detections")
+        # Parse classes
+        class_list = self.parse_classes(classes)
+
+        try:
+            # Decode frames and run batched inference as they arrive
+            frame_results, video_info = await self._extract_and_infer(
+                video_path=video_path,
+                frame_interval=frame_interval,
+                max_frames=max_frames,
+                infer_batch=lambda images: infer_batch(
+                    images=images,
+                    confidence=confidence,
+                    classes=class_list
+                ),
+                include_base64=include_base64
+            )
+        finally:
+            await asyncio.to_thread(os.remove, video_path)
+
+        # Build per-frame results, totalling detections/segments as we go
+        results = []
+        total = 0
+        for frame_data, inference_result in frame_results:
+            frame_result = self._frame_result(frame_data, inference_result, item_key, include_base64)
+            total += frame_result["count"]
+            results.append(frame_result)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Per-frame counts: " + ", ".join(
+                    f"{f['frame_index']} ({f['timestamp']:.2f}s): {f['count']}" for f in results
+                )
+            )
+        logger.info(
+            "Processed %d frames, total %d %s in %.1fms",
+            len(results), total, item_key, (time.perf_counter() - start_time) * 1000
+        )
 
         # Return results
         return {
             "status": "success",
-            "video_info": {
-                "total_frames": video_info.total_frames,
-                "fps": video_info.fps,
-                "duration": round(video_info.duration, 2),
-                "width": video_info.width,
-                "height": video_info.height
-            },
+            "video_info": self._video_info_dict(video_info),
             "frames": results,
             "total_frames_processed": len(results),
-            "total_detections": total_detections
+            f"total_{item_key}": total
         }
 
-    async def process_multiple_frames_segmentation(
+    async def process_multiple_frames_detection_stream(
         self,
         video: UploadFile,
         confidence: float,
         classes: Optional[str] = None,
         frame_interval: float = 2.0,
         max_frames: int = 10
-    ) -> Dict:
+    ) -> AsyncIterator[Dict]:
         """
-        Extract multiple frames from video and run segmentation on each
+        Extract multiple frames from video and yield each one as it is detected
+
+        The upload is read and validated before this returns, so upload
+        errors surface as HTTPException before any response is started.
+        Decoding and inference then run as the returned iterator is consumed.
 
         Args:
             video: Uploaded video file
-            confidence: Segmentation confidence threshold
+            confidence: Detection confidence threshold
             classes: Comma-separated class names (optional)
             frame_interval: Seconds between extracted frames
             max_frames: Maximum number of frames to extract
 
         Returns:
-            Dict with array of frames with segmentations
+            Async iterator of per-frame result dicts (raw JPEG in "frame_jpeg"),
+            followed by one summary dict without "frames"
         """
-        # Read and validate video
-        video_bytes = await self.read_and_validate_media(video, allow_video=True)
-
-        # Parse classes
+        video_path = await self.read_and_validate_video_file(video)
         class_list = self.parse_classes(classes)
 
-        # Extract frames
-        frames, video_info = self.frame_service.extract_frames_by_interval(
-            video_bytes=video_bytes,
-            frame_interval=frame_interval,
-            max_frames=max_frames,
-            include_base64=True,
-            jpeg_quality=85
-        )
-
-        logger.info(f"Extracted {len(frames)} frames, running segmentation on each")
+        async def results() -> AsyncIterator[Dict]:
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def run() -> VideoInfo:
+                try:
+                    _, video_info = await self._extract_and_infer(
+                        video_path=video_path,
+                        frame_interval=frame_interval,
+                        max_frames=max_frames,
+                        infer_batch=lambda images: self.yolo_service.detect_batch(
+                            images=images,
+                            confidence=confidence,
+                            classes=class_list
+                        ),
+                        include_base64=False,
+                        on_batch=queue.put
+                    )
+                    return video_info
+                finally:
+                    await queue.put(None)  # End of batches
+
+            task = asyncio.create_task(run())
+            try:
+                processed = 0
+                total = 0
+                while (batch_pairs := await queue.get()) is not None:
+                    for frame_data, inference_result in batch_pairs:
+                        frame_result = self._frame_result(
+                            frame_data, inference_result, "detections", include_base64=False
+                        )
+                        processed += 1
+                        total += frame_result["count"]
+                        yield frame_result
+
+                yield {
+                    "status": "success",
+                    "video_info": self._video_info_dict(await task),
+                    "total_frames_processed": processed,
+                    "total_detections": total
+                }
+            finally:
+                if not task.done():
+                    # Client went away mid-stream
+                    task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await asyncio.to_thread(os.remove, video_path)
+
+        return results()
+
+    @staticmethod
+    def _frame_result(
+        frame_data: FrameData,
+        inference_result: Dict,
+        item_key: Literal["detections", "segments"],
+        include_base64: bool
+    ) -> Dict:
+        """
+        Build the response entry for one inferred frame
 
-        # Run segmentation on each frame
-        results = []
-        for frame_data in frames:
-            # Run segmentation
-            segmentation_result = await self.yolo_service.segment(
-                image_bytes=frame_data.frame_bytes,
-                confidence=confidence,
-                classes=class_list
-            )
+        Args:
+            frame_data: Extracted frame
+            inference_result: Detection or segmentation result for the frame
+            item_key: Result key for per-frame items ("detections" or "segments")
+            include_base64: Whether the frame carries base64; if False, its raw
+                JPEG is added as "frame_jpeg" instead
 
-            # Build result for this frame
-            results.append({
-                "frame_index": frame_data.frame_index,
-                "timestamp": round(frame_data.timestamp, 2),
-                "frame_base64": frame_data.frame_base64,
-                "segments": segmentation_result.get("segments", []),
-                "image_shape": segmentation_result.get("image_shape", []),
-                "count": segmentation_result.get("count", 0)
-            })
-
-            logger.info(
-                f"Frame {frame_data.frame_index} ({frame_data.timestamp:.2f}s): "
-                f"{segmentation_result.get('count', 0)} segments"
-            )
+        Returns:
+            Frame result dict
+        """
+        frame_result = {
+            "frame_index": frame_data.frame_index,
+            "timestamp": round(frame_data.timestamp, 2),
+            "frame_base64": frame_data.frame_base64,
+            item_key: inference_result.get(item_key, []),
+            "image_shape": inference_result.get("image_shape", []),
+            "count": inference_result.get("count", 0)
+        }
+        if not include_base64:
+            frame_result["frame_jpeg"] = frame_data.frame_bytes
+        return frame_result
 
-        # Calculate total segments
-        total_segments = sum(f["count"] for f in results)
+    @staticmethod
+    def _video_info_dict(video_info: VideoInfo) -> Dict:
+        """
+        Build the response's video metadata
 
-        logger.info(f"Processed {len(results)} frames, total {total_segments} segments")
+        Args:
+            video_info: Video metadata
 
-        # Return results
+        Returns:
+            Video info dict
+        """
         return {
-            "status": "success",
-            "video_info": {
-                "total_frames": video_info.total_frames,
-                "fps": video_info.fps,
-                "duration": round(video_info.duration, 2),
-                "width": video_info.width,
-                "height": video_info.height
-            },
-            "frames": results,
-            "total_frames_processed": len(results),
-            "total_segments": total_segments
+            "total_frames": video_info.total_frames,
+            "fps": video_info.fps,
+            "duration": round(video_info.duration, 2),
+            "width": video_info.width,
+            "height": video_info.height
         }
 
     async def process(self, *args, **kwargs):
@@ -267,6 +581,7 @@ class VideoHandler(BaseImageHandler):
         Video handler uses specific methods instead:
         - process_single_frame_detection()
         - process_multiple_frames_detection()
+        - process_multiple_frames_detection_stream()
         - process_multiple_frames_segmentation()
         """
         raise NotImplementedError(
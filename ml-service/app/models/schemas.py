@@ -14,17 +14,22 @@ class BoundingBox(BaseModel):
 
 
 class Detection(BaseModel):
-    """Single object detection result"""
+    """
+    Single object detection result
+
+    Response-only: values come straight from the model, so fields carry no
+    range constraints to re-check on the way out.
+    """
     class_name: str = Field(..., description="Detected object class")
-    confidence: float = Field(..., ge=0.0, le=1.0, description="Detection confidence")
-    bbox: List[float] = Field(..., description="Bounding box [x1, y1, x2, y2]")
+    confidence: float = Field(..., description="Detection confidence (0.0-1.0)")
+    bbox: Tuple[float, float, float, float] = Field(..., description="Bounding box [x1, y1, x2, y2]")
 
 
 class Segment(BaseModel):
-    """Single segmentation result"""
+    """Single segmentation result (response-only, like Detection)"""
     class_name: str = Field(..., description="Segmented object class")
-    confidence: float = Field(..., ge=0.0, le=1.0, description="Segmentation confidence")
-    bbox: List[float] = Field(..., description="Bounding box [x1, y1, x2, y2]")
+    confidence: float = Field(..., description="Segmentation confidence (0.0-1.0)")
+    bbox: Tuple[float, float, float, float] = Field(..., description="Bounding box [x1, y1, x2, y2]")
     mask: List[List[float]] = Field(..., description="Polygon points [[x1,y1], [x2,y2], ...]")
 
 
@@ -5,11 +5,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ValidationResult:
     """
     Result of validation operation
 
+    Immutable, so success() can hand out one shared instance.
+
     Attributes:
         is_valid: Whether validation passed
         error_message: Optional error message if validation failed
@@ -19,8 +21,8 @@ class ValidationResult:
 
     @classmethod
     def success(cls) -> 'ValidationResult':
-        """Create successful validation result"""
-        return cls(is_valid=True)
+        """Return the shared successful validation result"""
+        return _SUCCESS
 
     @classmethod
     def failure(cls, message: str) -> 'ValidationResult':
@@ -30,3 +32,6 @@ class ValidationResult:
     def __bool__(self) -> bool:
         """Allow using validation result in boolean context"""
         return self.is_valid
+
+
+_SUCCESS = ValidationResult(is_valid=True)
@@ -0,0 +1,153 @@
+"""
+Cross-request batch scheduler for real-time inference
+Collects single-image requests arriving close together and runs them
+through the model as one batched predict call
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """
+    Micro-batches concurrent single-image inference requests
+
+    Requests are queued with a future. A background task takes the first
+    waiting request, then keeps collecting until max_batch requests are
+    waiting or max_wait_ms has passed, and runs one batched inference call
+    per (confidence, classes) group in the batch.
+    """
+
+    def __init__(
+        self,
+        infer_batch: Callable[..., Awaitable[List[Dict]]],
+        max_batch: int = 8,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            infer_batch: Batched inference call, e.g. YOLOService.detect_batch;
+                called as infer_batch(images=..., confidence=..., classes=...)
+            max_batch: Maximum number of images per batch
+            max_wait_ms: How long to wait for more requests after the first
+        """
+        self.infer_batch = infer_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the batching loop and fail any requests still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    async def submit(
+        self,
+        image: np.ndarray,
+        confidence: float,
+        classes: Optional[Sequence[Union[str, int]]] = None
+    ) -> Dict:
+        """
+        Queue one decoded image and wait for its result
+
+        Args:
+            image: Decoded image (BGR numpy array)
+            confidence: Confidence threshold (0.0-1.0)
+            classes: Class names or IDs to keep (None = all classes)
+
+        Returns:
+            Result dict for this image, as returned by infer_batch
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, confidence, tuple(classes) if classes else None, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Batching loop: collect a batch, run it, repeat"""
+        loop = asyncio.get_running_loop()
+        getter: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(self._queue.get())
+                batch = [await getter]
+                getter = None
+
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+
+                    # Keep an unfinished get for the next batch rather than
+                    # cancelling it, so no request is dropped
+                    getter = asyncio.ensure_future(self._queue.get())
+                    done, _ = await asyncio.wait({getter}, timeout=remaining)
+                    if not done:
+                        break
+                    batch.append(getter.result())
+                    getter = None
+
+                await self._dispatch(batch)
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    async def _dispatch(self, batch: List[Tuple]) -> None:
+        """
+        Run inference for a collected batch and resolve its futures
+
+        Args:
+            batch: List of (image, confidence, classes, future) tuples
+        """
+        groups: Dict[Tuple, List[Tuple]] = {}
+        for item in batch:
+            if not item[3].cancelled():
+                groups.setdefault((item[1], item[2]), []).append(item)
+
+        for (confidence, classes), items in groups.items():
+            try:
+                results = await self.infer_batch(
+                    images=[item[0] for item in items],
+                    confidence=confidence,
+                    classes=list(classes) if classes else None
+                )
+            except Exception as e:
+                logger.error(f"Batched inference failed for {len(items)} images: {e}", exc_info=True)
+                for *_, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (*_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
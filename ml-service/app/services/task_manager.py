@@ -3,29 +3,45 @@ Task Manager for async video processing with progress tracking
 Tracks video processing tasks and their progress
 """
 import asyncio
+import heapq
+import itertools
+import threading
 import uuid
 import time
 import logging
-from typing import Dict, Optional, Callable
+from typing import Dict, Final, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Number of independently locked task shards (power of two)
+TASK_SHARDS = 8
+
+
+class TaskStatus:
+    """
+    Task status values
 
-class TaskStatus(str, Enum):
-    """Task status enum"""
-    PENDING = "pending"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
+    Plain (interned) strings rather than an Enum: status is set on every
+    update and serialized on every poll, with no member lookup or .value
+    """
+    PENDING: Final = "pending"
+    PROCESSING: Final = "processing"
+    COMPLETED: Final = "completed"
+    FAILED: Final = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskProgress:
-    """Progress information for a video processing task"""
+    """
+    Progress information for a video processing task
+
+    Slotted: one instance per task, written on every progress update
+    """
     task_id: str
-    status: TaskStatus = TaskStatus.PENDING
+    status: str = TaskStatus.PENDING
     progress: float = 0.0  # 0.0 to 1.0
     current_frame: int = 0
     total_frames: int = 0
@@ -35,12 +51,17 @@ class TaskProgress:
     completed_at: Optional[float] = None
     result: Optional[Dict] = None
     error: Optional[str] = None
+    # Live frame count written by a worker process (shared memory), read
+    # on demand instead of receiving a progress message per update
+    frame_source: Optional[Callable[[], int]] = None
+    # Serialized to_dict() of a finished task, which no longer changes
+    json_cache: Optional[bytes] = field(default=None, init=False, repr=False)
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON response"""
         return {
             "task_id": self.task_id,
-            "status": self.status.value,
+            "status": self.status,
             "progress": round(self.progress, 2),
             "current_frame": self.current_frame,
             "total_frames": self.total_frames,
@@ -48,16 +69,45 @@ class TaskProgress:
             "created_at": self.created_at,
             "started_at": self.started_at,
             "completed_at": self.completed_at,
-            "elapsed_time": round(time.time() - self.started_at, 2) if self.started_at else 0,
+            "elapsed_time": (
+                round((self.completed_at or time.time()) - self.started_at, 2)
+                if self.started_at else 0
+            ),
             "result": self.result,
             "error": self.error
         }
 
+    def to_json(self) -> bytes:
+        """
+        Serialize to_dict() as JSON, once for a finished task
+
+        Completed and failed tasks are polled until the client notices, but
+        never change again, so their JSON is built once and reused.
+
+        Returns:
+            JSON bytes
+        """
+        if self.json_cache is not None:
+            return self.json_cache
+
+        data = orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        if self.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            self.json_cache = data
+        return data
+
 
 class TaskManager:
     """
     Manages video processing tasks with progress tracking
     Singleton instance shared across the application
+
+    Tasks are spread over TASK_SHARDS dicts, each with its own lock, so
+    writers updating tasks in different shards never contend. Status polls
+    read their shard without taking the lock at all.
+
+    Finished tasks are also pushed onto a min-heap keyed by completion time,
+    so evicting the oldest or expired ones pops from the heap instead of
+    scanning and sorting every task.
     """
 
     def __init__(self, max_tasks: int = 100, task_ttl: int = 3600):
@@ -68,12 +118,43 @@ class TaskManager:
             max_tasks: Maximum number of tasks to keep in memory
             task_ttl: Time to live for completed tasks (seconds)
         """
-        self.tasks: Dict[str, TaskProgress] = {}
+        self._shards: List[Tuple[threading.Lock, Dict[str, TaskProgress]]] = [
+            (threading.Lock(), {}) for _ in range(TASK_SHARDS)
+        ]
+        # Min-heap of (completed_at, sequence, task_id) for finished tasks
+        self._finished: List[Tuple[float, int, str]] = []
+        self._finished_lock = threading.Lock()
+        self._finished_seq = itertools.count()
         self.max_tasks = max_tasks
         self.task_ttl = task_ttl
         self._cleanup_task: Optional[asyncio.Task] = None
         logger.info(f"TaskManager initialized (max_tasks={max_tasks}, ttl={task_ttl}s)")
 
+    def _shard(self, task_id: str) -> Tuple[threading.Lock, Dict[str, TaskProgress]]:
+        """
+        Get the (lock, tasks) shard a task ID belongs to
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Tuple of (shard lock, shard task dict)
+        """
+        return self._shards[hash(task_id) & (TASK_SHARDS - 1)]
+
+    @property
+    def tasks(self) -> Dict[str, TaskProgress]:
+        """Snapshot of all tasks across shards (task_id -> TaskProgress)"""
+        snapshot: Dict[str, TaskProgress] = {}
+        for lock, shard in self._shards:
+            with lock:
+                snapshot.update(shard)
+        return snapshot
+
+    def _count(self) -> int:
+        """Number of tasks currently held"""
+        return sum(len(shard) for _, shard in self._shards)
+
     def create_task(self, total_frames: int = 0) -> str:
         """
         Create a new task and return task ID
@@ -90,7 +171,9 @@ class TaskManager:
             total_frames=total_frames,
             message="Task created, waiting to start"
         )
-        self.tasks[task_id] = task
+        lock, shard = self._shard(task_id)
+        with lock:
+            shard[task_id] = task
         logger.info(f"Created task {task_id} (total_frames={total_frames})")
 
         # Clean up old tasks if we have too many
@@ -106,9 +189,63 @@ class TaskManager:
             task_id: Task ID
 
         Returns:
-            TaskProgress or None if not found
+            TaskProgress or None if not found (or expired)
         """
-        return self.tasks.get(task_id)
+        self._evict_expired()
+
+        # A single dict lookup is atomic, so status polls skip the shard lock
+        lock, shard = self._shard(task_id)
+        task = shard.get(task_id)
+        if task is not None and task.frame_source is not None:
+            with lock:
+                self._sync_frames(task)
+        return task
+
+    @staticmethod
+    def _set_frame(task: TaskProgress, current_frame: int) -> None:
+        """Record the current frame and the progress derived from it (shard lock held)"""
+        task.current_frame = current_frame
+        if task.total_frames > 0:
+            task.progress = min(current_frame / task.total_frames, 1.0)
+
+    @classmethod
+    def _sync_frames(cls, task: TaskProgress) -> None:
+        """Pull the latest frame count from the task's frame source (shard lock held)"""
+        if task.frame_source is not None:
+            # Never step back, e.g. if the worker already reset its counter
+            # for its next job before this task's completion was applied
+            cls._set_frame(task, max(task.current_frame, task.frame_source()))
+
+    def attach_frame_source(
+        self,
+        task_id: str,
+        frame_source: Callable[[], int],
+        message: str = "Processing video"
+    ) -> None:
+        """
+        Mark a task as processing, reading its progress from a frame counter
+
+        The counter (e.g. a slot in a shared-memory array written by a
+        worker process) is read when the task is polled, so the worker
+        reports progress without a message per update.
+
+        Args:
+            task_id: Task ID
+            frame_source: Returns the current frame number
+            message: Status message while processing
+        """
+        lock, shard = self._shard(task_id)
+        with lock:
+            task = shard.get(task_id)
+            if not task:
+                logger.warning(f"Task {task_id} not found for frame source")
+                return
+
+            task.frame_source = frame_source
+            task.message = message
+            if task.status == TaskStatus.PENDING:
+                task.status = TaskStatus.PROCESSING
+                task.started_at = time.time()
 
     def update_progress(
         self,
@@ -124,22 +261,22 @@ class TaskManager:
             current_frame: Current frame number
             message: Optional status message
         """
-        task = self.tasks.get(task_id)
-        if not task:
-            logger.warning(f"Task {task_id} not found for progress update")
-            return
+        lock, shard = self._shard(task_id)
+        with lock:
+            task = shard.get(task_id)
+            if not task:
+                logger.warning(f"Task {task_id} not found for progress update")
+                return
 
-        task.current_frame = current_frame
-        if task.total_frames > 0:
-            task.progress = min(current_frame / task.total_frames, 1.0)
+            self._set_frame(task, current_frame)
 
-        if message:
-            task.message = message
+            if message:
+                task.message = message
 
-        # Update status
-        if task.status == TaskStatus.PENDING:
-            task.status = TaskStatus.PROCESSING
-            task.started_at = time.time()
+            # Update status
+            if task.status == TaskStatus.PENDING:
+                task.status = TaskStatus.PROCESSING
+                task.started_at = time.time()
 
     def complete_task(self, task_id: str, result: Dict) -> None:
         """
@@ -149,16 +286,23 @@ class TaskManager:
             task_id: Task ID
             result: Result data
         """
-        task = self.tasks.get(task_id)
-        if not task:
-            logger.warning(f"Task {task_id} not found for completion")
-            return
-
-        task.status = TaskStatus.COMPLETED
-        task.progress = 1.0
-        task.completed_at = time.time()
-        task.result = result
-        task.message = "Processing completed successfully"
+        lock, shard = self._shard(task_id)
+        with lock:
+            task = shard.get(task_id)
+            if not task:
+                logger.warning(f"Task {task_id} not found for completion")
+                return
+
+            self._sync_frames(task)
+            task.frame_source = None
+            task.progress = 1.0
+            task.completed_at = time.time()
+            task.result = result
+            task.message = "Processing completed successfully"
+            # Last: polls read without the lock and cache finished tasks
+            task.status = TaskStatus.COMPLETED
+
+        self._mark_finished(task_id, task.completed_at)
 
         elapsed = task.completed_at - (task.started_at or task.created_at)
         logger.info(f"Task {task_id} completed in {elapsed:.2f}s")
@@ -171,37 +315,71 @@ class TaskManager:
             task_id: Task ID
             error: Error message
         """
-        task = self.tasks.get(task_id)
-        if not task:
-            logger.warning(f"Task {task_id} not found for failure")
-            return
-
-        task.status = TaskStatus.FAILED
-        task.completed_at = time.time()
-        task.error = error
-        task.message = f"Processing failed: {error}"
+        lock, shard = self._shard(task_id)
+        with lock:
+            task = shard.get(task_id)
+            if not task:
+                logger.warning(f"Task {task_id} not found for failure")
+                return
+
+            self._sync_frames(task)
+            task.frame_source = None
+            task.completed_at = time.time()
+            task.error = error
+            task.message = f"Processing failed: {error}"
+            # Last: polls read without the lock and cache finished tasks
+            task.status = TaskStatus.FAILED
+
+        self._mark_finished(task_id, task.completed_at)
 
         logger.error(f"Task {task_id} failed: {error}")
 
+    def _mark_finished(self, task_id: str, completed_at: float) -> None:
+        """
+        Queue a finished task for eviction
+
+        Args:
+            task_id: Task ID
+            completed_at: Completion time of the task
+        """
+        with self._finished_lock:
+            heapq.heappush(self._finished, (completed_at, next(self._finished_seq), task_id))
+
+    def _remove(self, task_id: str) -> None:
+        """Drop a task from its shard"""
+        lock, shard = self._shard(task_id)
+        with lock:
+            shard.pop(task_id, None)
+        logger.debug(f"Cleaned up task {task_id}")
+
+    def _evict_expired(self) -> None:
+        """Remove finished tasks older than task_ttl"""
+        cutoff = time.time() - self.task_ttl
+        with self._finished_lock:
+            expired = []
+            while self._finished and self._finished[0][0] < cutoff:
+                expired.append(heapq.heappop(self._finished)[2])
+
+        for task_id in expired:
+            self._remove(task_id)
+
     def _cleanup_old_tasks(self) -> None:
-        """Remove old completed/failed tasks if we exceed max_tasks"""
-        if len(self.tasks) <= self.max_tasks:
-            return
+        """Remove expired tasks, then the oldest finished ones if we exceed max_tasks"""
+        self._evict_expired()
 
-        # Sort by completion time, oldest first
-        completed_tasks = [
-            (task_id, task) for task_id, task in self.tasks.items()
-            if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]
-            and task.completed_at is not None
-        ]
+        total = self._count()
+        if total <= self.max_tasks:
+            return
 
-        completed_tasks.sort(key=lambda x: x[1].completed_at)
+        to_remove = total - self.max_tasks + 10  # Remove a few extra
+        with self._finished_lock:
+            oldest = [
+                heapq.heappop(self._finished)[2]
+                for _ in range(min(to_remove, len(self._finished)))
+            ]
 
-        # Remove oldest tasks
-        to_remove = len(self.tasks) - self.max_tasks + 10  # Remove a few extra
-        for task_id, _ in completed_tasks[:to_remove]:
-            del self.tasks[task_id]
-            logger.debug(f"Cleaned up task {task_id}")
+        for task_id in oldest:
+            self._remove(task_id)
 
     def get_all_tasks(self) -> Dict[str, Dict]:
         """
@@ -210,7 +388,13 @@ class TaskManager:
         Returns:
             Dictionary of task_id -> task dict
         """
-        return {task_id: task.to_dict() for task_id, task in self.tasks.items()}
+        all_tasks = {}
+        for lock, shard in self._shards:
+            with lock:
+                for task_id, task in shard.items():
+                    self._sync_frames(task)
+                    all_tasks[task_id] = task.to_dict()
+        return all_tasks
 
     def get_stats(self) -> Dict:
         """
@@ -220,12 +404,16 @@ class TaskManager:
             Statistics dictionary
         """
         statuses = {}
-        for task in self.tasks.values():
-            status = task.status.value
-            statuses[status] = statuses.get(status, 0) + 1
+        total = 0
+        for lock, shard in self._shards:
+            with lock:
+                total += len(shard)
+                for task in shard.values():
+                    status = task.status
+                    statuses[status] = statuses.get(status, 0) + 1
 
         return {
-            "total_tasks": len(self.tasks),
+            "total_tasks": total,
             "by_status": statuses,
             "max_tasks": self.max_tasks,
             "task_ttl": self.task_ttl
@@ -4,20 +4,41 @@ Video frame extraction service
 Handles extraction of frames from video files for processing.
 Consolidates video handling logic used across multiple endpoints.
 """
+import bisect
+import math
 import cv2
 import numpy as np
-import tempfile
-import os
 import base64
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from PIL import Image
-from typing import List, Dict, Tuple, Optional
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator, Union
 from dataclasses import dataclass
 
+from app.config import settings
+from app.utils.upload_utils import write_temp_file
+
 
 logger = logging.getLogger(__name__)
 
+# Optional in-memory decoder; without it videos go through a temp file for OpenCV
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+    logger.info("PyAV not installed. Video frames will be decoded via temp file + OpenCV.")
+
+# Optional libjpeg-turbo binding; encodes BGR frames with the fast DCT, which
+# OpenCV's imencode doesn't expose
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJFLAG_FASTDCT
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbo_jpeg = None
+
 
 @dataclass
 class VideoInfo:
@@ -32,10 +53,11 @@ class VideoInfo:
 @dataclass
 class FrameData:
     """Data for an extracted frame"""
-    frame_bytes: bytes
+    frame_bytes: bytes  # JPEG data (a memoryview over the encoder's buffer when extracted)
     frame_index: int
     timestamp: float
     frame_base64: Optional[str] = None
+    image: Optional[np.ndarray] = None  # Decoded BGR frame, for direct model input
 
 
 class VideoFrameService:
@@ -49,14 +71,27 @@ class VideoFrameService:
     - Converting frames to various formats
     """
 
-    def __init__(self):
-        """Initialize video frame service"""
-        pass
+    def __init__(self, encode_workers: Optional[int] = None):
+        """
+        Initialize video frame service
+
+        Args:
+            encode_workers: Threads JPEG-encoding extracted frames while the
+                next ones decode (settings.video_encode_workers if None;
+                0 = encode on the decoding thread)
+        """
+        if encode_workers is None:
+            encode_workers = settings.video_encode_workers
+        self._encode_workers = encode_workers
+        self._encode_pool = (
+            ThreadPoolExecutor(max_workers=encode_workers, thread_name_prefix="frame-encode")
+            if encode_workers > 0 else None
+        )
 
     @staticmethod
     def _write_video_to_temp(video_bytes: bytes, suffix: str = '.mp4') -> str:
         """
-        Write video bytes to a temporary file
+        Write video bytes to a temporary file (in settings.upload_temp_dir, if set)
 
         Args:
             video_bytes: Raw video data
@@ -65,12 +100,36 @@ class VideoFrameService:
         Returns:
             Path to temporary file
         """
-        fd, temp_path = tempfile.mkstemp(suffix=suffix)
-        try:
-            os.write(fd, video_bytes)
-        finally:
-            os.close(fd)
-        return temp_path
+        return write_temp_file(video_bytes, suffix=suffix, dir=settings.upload_temp_dir)
+
+    @staticmethod
+    def _frame_to_jpeg_buffer(frame: np.ndarray, quality: int = 85) -> Union[bytes, np.ndarray]:
+        """
+        Encode OpenCV frame (BGR) as JPEG into the encoder's output buffer
+
+        Encodes straight from the BGR array, without an RGB copy or a PIL
+        image in between: with PyTurboJPEG (fast DCT) when installed,
+        otherwise with OpenCV.
+
+        Args:
+            frame: OpenCV frame array (BGR format)
+            quality: JPEG quality (1-100)
+
+        Returns:
+            JPEG data (bytes from PyTurboJPEG, a 1-D uint8 array from OpenCV)
+
+        Raises:
+            ValueError: If the frame cannot be encoded
+        """
+        if _turbo_jpeg is not None:
+            return _turbo_jpeg.encode(
+                frame, quality=quality, pixel_format=TJPF_BGR, flags=TJFLAG_FASTDCT
+            )
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Failed to encode frame as JPEG")
+        return buffer
 
     @staticmethod
     def _frame_to_jpeg_bytes(frame: np.ndarray, quality: int = 85) -> bytes:
@@ -83,15 +142,11 @@ class VideoFrameService:
 
         Returns:
             JPEG image as bytes
-        """
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(frame_rgb)
 
-        # Convert to JPEG bytes
-        img_byte_arr = BytesIO()
-        pil_image.save(img_byte_arr, format='JPEG', quality=quality)
-        return img_byte_arr.getvalue()
+        Raises:
+            ValueError: If the frame cannot be encoded
+        """
+        return bytes(VideoFrameService._frame_to_jpeg_buffer(frame, quality))
 
     @staticmethod
     def encode_bytes_to_base64(data: bytes) -> str:
@@ -99,12 +154,351 @@ class VideoFrameService:
         Encode bytes to base64 string
 
         Args:
-            data: Bytes to encode
+            data: Bytes (or any bytes-like buffer) to encode
 
         Returns:
             Base64-encoded string
         """
-        return base64.b64encode(data).decode('utf-8')
+        return base64.b64encode(data).decode('ascii')
+
+    def _build_frame_data(
+        self,
+        frame: np.ndarray,
+        frame_index: int,
+        timestamp: float,
+        include_base64: bool,
+        jpeg_quality: int
+    ) -> FrameData:
+        """
+        Package a decoded frame as FrameData (JPEG bytes + optional base64)
+
+        Args:
+            frame: Decoded frame (BGR format)
+            frame_index: Index of the frame in the video
+            timestamp: Frame timestamp in seconds
+            include_base64: Whether to include base64-encoded image
+            jpeg_quality: JPEG compression quality (1-100)
+
+        Returns:
+            FrameData object
+        """
+        # Work on the encoder's buffer directly; no intermediate bytes copy
+        frame_bytes = memoryview(self._frame_to_jpeg_buffer(frame, quality=jpeg_quality))
+
+        frame_base64 = None
+        if include_base64:
+            frame_base64 = self.encode_bytes_to_base64(frame_bytes)
+
+        return FrameData(
+            frame_bytes=frame_bytes,
+            frame_index=frame_index,
+            timestamp=timestamp,
+            frame_base64=frame_base64,
+            image=frame
+        )
+
+    def _encode_frames(
+        self,
+        decoded: Iterable[Tuple[int, np.ndarray]],
+        timestamps: Dict[int, float],
+        include_base64: bool,
+        jpeg_quality: int,
+        on_frame: Optional[Callable[[FrameData], None]] = None
+    ) -> List[FrameData]:
+        """
+        Package decoded frames as FrameData, encoding them on the encode pool
+
+        OpenCV and libjpeg-turbo release the GIL while encoding, so up to
+        encode_workers frames are encoded in parallel with decoding of the
+        next ones. Frames are still returned (and passed to on_frame) in
+        decode order.
+
+        Args:
+            decoded: (frame index, decoded BGR frame) pairs
+            timestamps: Timestamp in seconds for each frame index
+            include_base64: Whether to include base64-encoded images
+            jpeg_quality: JPEG compression quality (1-100)
+            on_frame: Optional callback invoked with each frame once encoded
+
+        Returns:
+            List of FrameData objects
+        """
+        extracted_frames = []
+
+        def emit(frame_data: FrameData) -> None:
+            extracted_frames.append(frame_data)
+            if on_frame is not None:
+                on_frame(frame_data)
+
+        if self._encode_pool is None:
+            for frame_idx, frame in decoded:
+                emit(self._build_frame_data(
+                    frame, frame_idx, timestamps[frame_idx], include_base64, jpeg_quality
+                ))
+            return extracted_frames
+
+        pending = deque()
+        try:
+            for frame_idx, frame in decoded:
+                pending.append(self._encode_pool.submit(
+                    self._build_frame_data,
+                    frame, frame_idx, timestamps[frame_idx], include_base64, jpeg_quality
+                ))
+                # Bound the frames held in flight
+                if len(pending) >= self._encode_workers:
+                    emit(pending.popleft().result())
+
+            while pending:
+                emit(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+
+        return extracted_frames
+
+    @staticmethod
+    def _interval_frame_indices(
+        video_info: VideoInfo,
+        frame_interval: float,
+        max_frames: int
+    ) -> List[Tuple[int, float]]:
+        """
+        Calculate frame indices to extract at regular time intervals
+
+        Args:
+            video_info: Video metadata
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+
+        Returns:
+            List of (frame index, timestamp) tuples in ascending order, one per
+            distinct frame (with its earliest timestamp)
+        """
+        if frame_interval <= 0 or video_info.duration <= 0 or max_frames <= 0:
+            return []
+
+        # Sample times below the duration, capped at max_frames; indices only
+        # grow with time, so any past the last frame are at the end. The
+        # epsilon keeps e.g. 4.2s * 60 FPS on frame 252, not 251.
+        count = min(math.ceil(video_info.duration / frame_interval), max_frames)
+        timestamps = np.arange(count) * frame_interval
+        indices = np.floor(timestamps * video_info.fps + 1e-6).astype(np.int64)
+        keep = indices < video_info.total_frames
+        indices, timestamps = indices[keep], timestamps[keep]
+
+        # Intervals shorter than a frame (low-FPS video) land on the same
+        # frame more than once; keep its first sample time
+        indices, first = np.unique(indices, return_index=True)
+
+        return list(zip(indices.tolist(), timestamps[first].tolist()))
+
+    @staticmethod
+    def _cv2_iter_frames(cap, frame_indices: List[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Read the requested frames in a single sequential pass
+
+        Grabs every frame up to the last wanted index and only decodes
+        (retrieves) the wanted ones. For inter-frame codecs this is much
+        cheaper than seeking per frame, which re-decodes from the previous
+        keyframe each time.
+
+        Args:
+            cap: Opened cv2.VideoCapture positioned at the first frame
+            frame_indices: Frame indices to keep
+
+        Yields:
+            (frame index, decoded frame in BGR format) in stream order
+        """
+        wanted = set(frame_indices)
+        if not wanted:
+            return
+
+        last_index = max(wanted)
+
+        for index in range(last_index + 1):
+            if not cap.grab():
+                return
+            if index in wanted:
+                ret, frame = cap.retrieve()
+                if ret:
+                    yield index, frame
+
+    @staticmethod
+    def _open_av_container(video: Union[bytes, str]):
+        """
+        Open a video with PyAV (bytes are decoded in memory, no temp file)
+
+        Args:
+            video: Raw video data, or a path to the video file
+
+        Returns:
+            Tuple of (PyAV container, video stream)
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        try:
+            container = av.open(BytesIO(video) if isinstance(video, bytes) else video)
+        except Exception as e:
+            raise ValueError("Failed to open video file") from e
+
+        if not container.streams.video:
+            container.close()
+            raise ValueError("Failed to open video file")
+
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        return container, stream
+
+    @staticmethod
+    def _av_video_info(container, stream) -> VideoInfo:
+        """
+        Read video metadata from a PyAV container
+
+        Args:
+            container: PyAV container
+            stream: Video stream of the container
+
+        Returns:
+            VideoInfo object with metadata
+        """
+        fps = float(stream.average_rate) if stream.average_rate else 0.0
+
+        if stream.duration is not None and stream.time_base is not None:
+            duration = float(stream.duration * stream.time_base)
+        elif container.duration is not None:
+            duration = container.duration / av.time_base
+        else:
+            duration = 0.0
+
+        total_frames = stream.frames or int(round(duration * fps))
+        if fps > 0 and total_frames:
+            duration = total_frames / fps
+
+        return VideoInfo(
+            total_frames=total_frames,
+            fps=fps,
+            duration=duration,
+            width=stream.codec_context.width,
+            height=stream.codec_context.height
+        )
+
+    @staticmethod
+    def _av_keyframe_pts(container, stream, until_pts: int) -> List[int]:
+        """
+        Collect keyframe timestamps by demuxing (no decoding)
+
+        Args:
+            container: PyAV container
+            stream: Video stream to scan
+            until_pts: Stop after the first keyframe past this timestamp
+
+        Returns:
+            Sorted keyframe timestamps up to until_pts (in stream time_base units)
+        """
+        keyframes = []
+        for packet in container.demux(stream):
+            if packet.pts is None or not packet.is_keyframe:
+                continue
+            if packet.pts > until_pts:
+                break
+            keyframes.append(packet.pts)
+        return sorted(keyframes)
+
+    @staticmethod
+    def _av_iter_frames(
+        container,
+        stream,
+        frame_indices: List[int],
+        fps: float = 0.0
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Decode the requested frames, skipping whole GOPs between them
+
+        With a known frame rate, the keyframes are located by demuxing first.
+        Decoding then jumps to the keyframe before a wanted frame whenever
+        that keyframe lies ahead of the current position, and otherwise
+        continues forward, so sparse samples of long videos only decode the
+        GOPs that contain them. Without a frame rate, every frame up to the
+        last wanted one is decoded in a single sequential pass.
+
+        Args:
+            container: PyAV container
+            stream: Video stream to decode
+            frame_indices: Frame indices to keep
+            fps: Video frame rate (0 = unknown, decode sequentially)
+
+        Yields:
+            (frame index, decoded frame in BGR format) in stream order
+        """
+        wanted = sorted(set(frame_indices))
+        if not wanted:
+            return
+
+        keyframes = []
+        if fps > 0 and stream.time_base is not None:
+            start_pts = stream.start_time or 0
+            targets = [
+                (index, start_pts + int(index / fps / stream.time_base)) for index in wanted
+            ]
+            keyframes = VideoFrameService._av_keyframe_pts(container, stream, targets[-1][1])
+
+        if not keyframes:
+            if fps > 0 and stream.time_base is not None:
+                container.seek(0)  # Rewind after the keyframe scan
+            wanted_set = set(wanted)
+            for index, frame in enumerate(container.decode(stream)):
+                if index in wanted_set:
+                    yield index, frame.to_ndarray(format="bgr24")
+                if index >= wanted[-1]:
+                    break
+            return
+
+        frames = None
+        current = None
+        for index, target_pts in targets:
+            keyframe = keyframes[max(bisect.bisect_right(keyframes, target_pts) - 1, 0)]
+            if frames is None or (current is not None and current.pts < keyframe):
+                container.seek(keyframe, stream=stream, backward=True)
+                frames = container.decode(stream)
+                current = None
+
+            while current is None or current.pts is None or current.pts < target_pts:
+                current = next(frames, None)
+                if current is None:
+                    return
+
+            yield index, current.to_ndarray(format="bgr24")
+
+    @staticmethod
+    def _av_decode_at(container, stream, frame_index: int, fps: float) -> Optional[np.ndarray]:
+        """
+        Decode one frame by seeking to the nearest keyframe before it
+
+        Args:
+            container: PyAV container
+            stream: Video stream to decode
+            frame_index: Frame index to decode
+            fps: Video frame rate
+
+        Returns:
+            Decoded frame (BGR format), or None if it could not be decoded
+        """
+        if fps <= 0 or stream.time_base is None:
+            frames = dict(VideoFrameService._av_iter_frames(container, stream, [frame_index]))
+            return frames.get(frame_index)
+
+        start_pts = stream.start_time or 0
+        target_pts = start_pts + int(frame_index / fps / stream.time_base)
+        container.seek(target_pts, stream=stream, backward=True)
+
+        last = None
+        for frame in container.decode(stream):
+            last = frame
+            if frame.pts is not None and frame.pts >= target_pts:
+                break
+
+        return last.to_ndarray(format="bgr24") if last is not None else None
 
     def get_video_info(self, video_bytes: bytes) -> VideoInfo:
         """
@@ -119,6 +513,13 @@ class VideoFrameService:
         Raises:
             ValueError: If video cannot be opened or read
         """
+        if AV_AVAILABLE:
+            container, stream = self._open_av_container(video_bytes)
+            try:
+                return self._av_video_info(container, stream)
+            finally:
+                container.close()
+
         temp_path = self._write_video_to_temp(video_bytes)
 
         try:
@@ -143,8 +544,7 @@ class VideoFrameService:
             )
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            Path(temp_path).unlink(missing_ok=True)
 
     def extract_single_frame(
         self,
@@ -168,6 +568,11 @@ class VideoFrameService:
         Raises:
             ValueError: If video cannot be opened or frame cannot be extracted
         """
+        if AV_AVAILABLE:
+            return self._extract_single_frame_av(
+                video_bytes, frame_index, include_base64, jpeg_quality
+            )
+
         temp_path = self._write_video_to_temp(video_bytes)
 
         try:
@@ -194,45 +599,88 @@ class VideoFrameService:
             if not ret:
                 raise ValueError(f"Failed to extract frame {frame_index}")
 
-            # Convert to JPEG bytes
-            frame_bytes = self._frame_to_jpeg_bytes(frame, quality=jpeg_quality)
-
             # Calculate timestamp
             timestamp = frame_index / fps if fps > 0 else 0
 
-            # Optionally encode to base64
-            frame_base64 = None
-            if include_base64:
-                frame_base64 = self.encode_bytes_to_base64(frame_bytes)
-
-            return FrameData(
-                frame_bytes=frame_bytes,
-                frame_index=frame_index,
-                timestamp=timestamp,
-                frame_base64=frame_base64
+            return self._build_frame_data(
+                frame, frame_index, timestamp, include_base64, jpeg_quality
             )
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            Path(temp_path).unlink(missing_ok=True)
 
-    def extract_frames_by_interval(
+    def _extract_single_frame_av(
         self,
         video_bytes: bytes,
+        frame_index: Optional[int],
+        include_base64: bool,
+        jpeg_quality: int
+    ) -> FrameData:
+        """
+        Extract a single frame by decoding the video in memory with PyAV
+
+        Args:
+            video_bytes: Raw video data
+            frame_index: Frame index to extract (None = middle frame)
+            include_base64: Whether to include base64-encoded image
+            jpeg_quality: JPEG compression quality (1-100)
+
+        Returns:
+            FrameData object
+
+        Raises:
+            ValueError: If video cannot be opened or frame cannot be extracted
+        """
+        container, stream = self._open_av_container(video_bytes)
+
+        try:
+            video_info = self._av_video_info(container, stream)
+            total_frames = video_info.total_frames
+
+            # Use middle frame if not specified
+            if frame_index is None:
+                frame_index = total_frames // 2
+
+            # Validate frame index
+            if frame_index < 0 or frame_index >= total_frames:
+                raise ValueError(f"Frame index {frame_index} out of range (0-{total_frames-1})")
+
+            frame = self._av_decode_at(container, stream, frame_index, video_info.fps)
+        finally:
+            container.close()
+
+        if frame is None:
+            raise ValueError(f"Failed to extract frame {frame_index}")
+
+        timestamp = frame_index / video_info.fps if video_info.fps > 0 else 0
+
+        return self._build_frame_data(
+            frame, frame_index, timestamp, include_base64, jpeg_quality
+        )
+
+    def extract_frames_by_interval(
+        self,
+        video_bytes: Optional[bytes] = None,
         frame_interval: float = 2.0,
         max_frames: int = 10,
         include_base64: bool = False,
-        jpeg_quality: int = 85
+        jpeg_quality: int = 85,
+        on_frame: Optional[Callable[[FrameData], None]] = None,
+        video_path: Optional[str] = None
     ) -> Tuple[List[FrameData], VideoInfo]:
         """
         Extract multiple frames from video at regular time intervals
 
         Args:
-            video_bytes: Raw video data
+            video_bytes: Raw video data (or pass video_path instead)
             frame_interval: Seconds between extracted frames
             max_frames: Maximum number of frames to extract
             include_base64: Whether to include base64-encoded images
             jpeg_quality: JPEG compression quality (1-100)
+            on_frame: Optional callback invoked with each frame as soon as it
+                is extracted, so consumers can start work before decoding ends
+            video_path: Path to a video file already on disk; decoded in place
+                (no copy into a temp file)
 
         Returns:
             Tuple of (list of FrameData objects, VideoInfo)
@@ -240,7 +688,36 @@ class VideoFrameService:
         Raises:
             ValueError: If video cannot be opened
         """
-        temp_path = self._write_video_to_temp(video_bytes)
+        if AV_AVAILABLE:
+            container, stream = self._open_av_container(video_path or video_bytes)
+            try:
+                video_info = self._av_video_info(container, stream)
+                logger.info(
+                    f"Video: {video_info.total_frames} frames, {video_info.fps:.2f} FPS, "
+                    f"{video_info.duration:.2f}s duration"
+                )
+
+                frames_to_extract = self._interval_frame_indices(video_info, frame_interval, max_frames)
+                logger.info(f"Extracting {len(frames_to_extract)} frames from video")
+
+                timestamps = dict(frames_to_extract)
+                extracted_frames = self._encode_frames(
+                    self._av_iter_frames(container, stream, list(timestamps), video_info.fps),
+                    timestamps, include_base64, jpeg_quality, on_frame
+                )
+            finally:
+                container.close()
+
+            if len(extracted_frames) < len(frames_to_extract):
+                logger.warning(
+                    f"Failed to extract {len(frames_to_extract) - len(extracted_frames)} frames, skipped"
+                )
+
+            logger.info(f"Successfully extracted {len(extracted_frames)} frames")
+
+            return extracted_frames, video_info
+
+        temp_path = video_path or self._write_video_to_temp(video_bytes)
 
         try:
             cap = cv2.VideoCapture(temp_path)
@@ -265,59 +742,161 @@ class VideoFrameService:
             logger.info(f"Video: {total_frames} frames, {fps:.2f} FPS, {duration:.2f}s duration")
 
             # Calculate frame indices to extract
-            frames_to_extract = []
-            current_time = 0.0
-
-            while current_time < duration and len(frames_to_extract) < max_frames:
-                frame_index = int(current_time * fps)
-                if frame_index < total_frames:
-                    frames_to_extract.append({
-                        'index': frame_index,
-                        'timestamp': current_time
-                    })
-                current_time += frame_interval
+            frames_to_extract = self._interval_frame_indices(video_info, frame_interval, max_frames)
 
             logger.info(f"Extracting {len(frames_to_extract)} frames from video")
 
             # Extract frames
-            extracted_frames = []
+            timestamps = dict(frames_to_extract)
+            extracted_frames = self._encode_frames(
+                self._cv2_iter_frames(cap, list(timestamps)),
+                timestamps, include_base64, jpeg_quality, on_frame
+            )
 
-            for frame_info in frames_to_extract:
-                frame_idx = frame_info['index']
-                timestamp = frame_info['timestamp']
+            cap.release()
 
-                # Seek to frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
+            if len(extracted_frames) < len(frames_to_extract):
+                logger.warning(
+                    f"Failed to extract {len(frames_to_extract) - len(extracted_frames)} frames, skipped"
+                )
 
-                if not ret:
-                    logger.warning(f"Failed to extract frame {frame_idx}, skipping")
-                    continue
+            logger.info(f"Successfully extracted {len(extracted_frames)} frames")
 
-                # Convert to JPEG bytes
-                frame_bytes = self._frame_to_jpeg_bytes(frame, quality=jpeg_quality)
+            return extracted_frames, video_info
 
-                # Optionally encode to base64
-                frame_base64 = None
-                if include_base64:
-                    frame_base64 = self.encode_bytes_to_base64(frame_bytes)
+        finally:
+            if video_path is None:
+                Path(temp_path).unlink(missing_ok=True)
 
-                extracted_frames.append(FrameData(
-                    frame_bytes=frame_bytes,
-                    frame_index=frame_idx,
-                    timestamp=timestamp,
-                    frame_base64=frame_base64
-                ))
+    @staticmethod
+    def _stack_frames(
+        decoded: Iterable[Tuple[int, np.ndarray]],
+        count: int
+    ) -> Tuple[np.ndarray, List[int]]:
+        """
+        Copy decoded frames into one preallocated (N, H, W, 3) array
 
-            cap.release()
+        Args:
+            decoded: (frame index, decoded BGR frame) pairs
+            count: Maximum number of frames expected
 
-            logger.info(f"Successfully extracted {len(extracted_frames)} frames")
+        Returns:
+            Tuple of (frame batch, frame indices of its rows)
+        """
+        batch = None
+        frame_indices = []
+        for frame_idx, frame in decoded:
+            if batch is None:
+                batch = np.empty((count, *frame.shape), dtype=frame.dtype)
+            batch[len(frame_indices)] = frame
+            frame_indices.append(frame_idx)
+
+        if batch is None:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8), frame_indices
+        return batch[:len(frame_indices)], frame_indices
+
+    def extract_frames_as_ndarray(
+        self,
+        video_bytes: Optional[bytes] = None,
+        frame_interval: float = 2.0,
+        max_frames: int = 10,
+        video_path: Optional[str] = None
+    ) -> Tuple[np.ndarray, List[int], VideoInfo]:
+        """
+        Decode frames at regular time intervals into a single array
 
-            return extracted_frames, video_info
+        For inference-only consumers: frames are not JPEG-encoded, and the
+        batch can be handed straight to YOLOService.detect_batch.
+
+        Args:
+            video_bytes: Raw video data (or pass video_path instead)
+            frame_interval: Seconds between extracted frames
+            max_frames: Maximum number of frames to extract
+            video_path: Path to a video file already on disk; decoded in place
+
+        Returns:
+            Tuple of ((N, H, W, 3) BGR uint8 array, frame index of each row, VideoInfo)
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        if AV_AVAILABLE:
+            container, stream = self._open_av_container(video_path or video_bytes)
+            try:
+                video_info = self._av_video_info(container, stream)
+                frames_to_extract = self._interval_frame_indices(video_info, frame_interval, max_frames)
+                batch, frame_indices = self._stack_frames(
+                    self._av_iter_frames(
+                        container, stream, [idx for idx, _ in frames_to_extract], video_info.fps
+                    ),
+                    len(frames_to_extract)
+                )
+            finally:
+                container.close()
+
+            return batch, frame_indices, video_info
+
+        temp_path = video_path or self._write_video_to_temp(video_bytes)
+
+        try:
+            cap = cv2.VideoCapture(temp_path)
+            if not cap.isOpened():
+                raise ValueError("Failed to open video file")
+
+            try:
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                video_info = VideoInfo(
+                    total_frames=total_frames,
+                    fps=fps,
+                    duration=total_frames / fps if fps > 0 else 0,
+                    width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                )
+                frames_to_extract = self._interval_frame_indices(video_info, frame_interval, max_frames)
+                batch, frame_indices = self._stack_frames(
+                    self._cv2_iter_frames(cap, [idx for idx, _ in frames_to_extract]),
+                    len(frames_to_extract)
+                )
+            finally:
+                cap.release()
+
+            return batch, frame_indices, video_info
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if video_path is None:
+                Path(temp_path).unlink(missing_ok=True)
+
+    def _encode_decoded_by_indices(
+        self,
+        decoded: Dict[int, np.ndarray],
+        frame_indices: List[int],
+        fps: float,
+        include_base64: bool,
+        jpeg_quality: int
+    ) -> List[FrameData]:
+        """
+        Encode decoded frames in the order they were requested
+
+        Args:
+            decoded: Decoded frames by frame index
+            frame_indices: Requested frame indices (missing ones are skipped)
+            fps: Video frame rate, for timestamps
+            include_base64: Whether to include base64-encoded images
+            jpeg_quality: JPEG compression quality (1-100)
+
+        Returns:
+            List of FrameData objects
+        """
+        ordered = []
+        for frame_idx in frame_indices:
+            if frame_idx not in decoded:
+                logger.warning(f"Failed to extract frame {frame_idx}, skipping")
+                continue
+            ordered.append((frame_idx, decoded[frame_idx]))
+
+        timestamps = {frame_idx: frame_idx / fps if fps > 0 else 0 for frame_idx, _ in ordered}
+        return self._encode_frames(ordered, timestamps, include_base64, jpeg_quality)
 
     def extract_frames_by_indices(
         self,
@@ -341,6 +920,18 @@ class VideoFrameService:
         Raises:
             ValueError: If video cannot be opened
         """
+        if AV_AVAILABLE:
+            container, stream = self._open_av_container(video_bytes)
+            try:
+                fps = self._av_video_info(container, stream).fps
+                decoded = dict(self._av_iter_frames(container, stream, frame_indices, fps))
+            finally:
+                container.close()
+
+            return self._encode_decoded_by_indices(
+                decoded, frame_indices, fps, include_base64, jpeg_quality
+            )
+
         temp_path = self._write_video_to_temp(video_bytes)
 
         try:
@@ -349,39 +940,12 @@ class VideoFrameService:
                 raise ValueError("Failed to open video file")
 
             fps = cap.get(cv2.CAP_PROP_FPS)
-            extracted_frames = []
-
-            for frame_idx in frame_indices:
-                # Seek to frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-
-                if not ret:
-                    logger.warning(f"Failed to extract frame {frame_idx}, skipping")
-                    continue
-
-                # Convert to JPEG bytes
-                frame_bytes = self._frame_to_jpeg_bytes(frame, quality=jpeg_quality)
-
-                # Calculate timestamp
-                timestamp = frame_idx / fps if fps > 0 else 0
-
-                # Optionally encode to base64
-                frame_base64 = None
-                if include_base64:
-                    frame_base64 = self.encode_bytes_to_base64(frame_bytes)
-
-                extracted_frames.append(FrameData(
-                    frame_bytes=frame_bytes,
-                    frame_index=frame_idx,
-                    timestamp=timestamp,
-                    frame_base64=frame_base64
-                ))
-
+            decoded = dict(self._cv2_iter_frames(cap, frame_indices))
             cap.release()
 
-            return extracted_frames
+            return self._encode_decoded_by_indices(
+                decoded, frame_indices, fps, include_base64, jpeg_quality
+            )
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            Path(temp_path).unlink(missing_ok=True)
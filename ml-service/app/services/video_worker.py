@@ -0,0 +1,224 @@
+"""
+Out-of-process worker for async video annotation tasks
+Runs /detect-video-async jobs in separate processes so long CPU inference
+doesn't compete with the API process for the GIL and executor threads
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.task_manager import TaskManager, get_task_manager
+from app.services.video_yolo_service import VideoYOLOService
+from app.services.yolo_service import YOLOService
+
+logger = logging.getLogger(__name__)
+
+
+async def run_annotation_job(
+    video_service: VideoYOLOService,
+    video_path: str,
+    progress_callback: Callable[[int, str], None],
+    **params
+) -> Dict:
+    """
+    Annotate a video on disk and build the task result
+
+    Args:
+        video_service: VideoYOLOService to run with
+        video_path: Path to the uploaded video
+        progress_callback: Called as progress_callback(current_frame, message)
+        **params: annotate_video_to_file options (confidence, classes, ...)
+
+    Returns:
+        Task result dict with detection stats and output size
+    """
+    output_path, stats = await video_service.annotate_video_to_file(
+        video_path=video_path,
+        progress_callback=progress_callback,
+        **params
+    )
+
+    # Store result (for now, just stats; video file would need file storage)
+    def _discard_output() -> int:
+        try:
+            return os.path.getsize(output_path)
+        finally:
+            os.remove(output_path)
+
+    output_size = await asyncio.to_thread(_discard_output)
+
+    return {
+        "status": "success",
+        "stats": stats,
+        "output_size_mb": output_size / (1024*1024)
+    }
+
+
+def _worker_main(job_queue, event_queue, frame_counters=None, slot: int = 0) -> None:
+    """
+    Worker process entry point: load models once, then run jobs until None
+
+    Events sent back are ("progress", task_id, frame, message),
+    ("completed", task_id, result) and ("failed", task_id, error).
+    With frame_counters (a shared-memory array), progress is instead
+    written to frame_counters[slot] and announced once per job as
+    ("started", task_id, slot).
+    The job's video file is removed once the job ends.
+    """
+    loop = asyncio.new_event_loop()
+    video_service = None
+    init_error = None
+
+    try:
+        yolo_service = YOLOService()
+        loop.run_until_complete(yolo_service.load_models())
+        video_service = VideoYOLOService(yolo_service)
+        logger.info(f"Video worker {os.getpid()} ready")
+    except Exception as e:
+        # Keep consuming jobs so they fail visibly instead of hanging
+        logger.error(f"Video worker {os.getpid()} failed to start: {e}", exc_info=True)
+        init_error = f"Video worker failed to start: {e}"
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+
+        task_id, video_path, params = job
+        try:
+            if init_error:
+                raise RuntimeError(init_error)
+
+            if frame_counters is not None:
+                frame_counters[slot] = 0
+                event_queue.put(("started", task_id, slot))
+
+                def progress_callback(current_frame: int, message: str):
+                    # Aligned 64-bit store: no lock, no message to the API process
+                    frame_counters[slot] = current_frame
+            else:
+                def progress_callback(current_frame: int, message: str):
+                    event_queue.put(("progress", task_id, current_frame, message))
+
+            result = loop.run_until_complete(
+                run_annotation_job(video_service, video_path, progress_callback, **params)
+            )
+            event_queue.put(("completed", task_id, result))
+        except Exception as e:
+            event_queue.put(("failed", task_id, str(e)))
+        finally:
+            # A failed cleanup must not end the worker and strand queued jobs
+            try:
+                Path(video_path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to remove video file {video_path}: {e}")
+
+    loop.close()
+
+
+class VideoTaskWorker:
+    """
+    Pool of worker processes running video annotation tasks
+
+    Jobs reference the uploaded video by file path, so no video data is
+    pickled. Each process writes its current frame to its own slot of a
+    shared-memory array, which the TaskManager reads when the task is
+    polled; results come back over a queue and are applied to the
+    TaskManager on the API's event loop.
+    """
+
+    def __init__(self, processes: int = 1, task_manager: Optional[TaskManager] = None):
+        """
+        Initialize worker pool
+
+        Args:
+            processes: Number of worker processes (each loads its own models)
+            task_manager: TaskManager to report to (global instance if None)
+        """
+        self.task_manager = task_manager or get_task_manager()
+        context = multiprocessing.get_context("spawn")
+        self._jobs = context.Queue()
+        self._events = context.Queue()
+        # One frame counter per process; single writer, so no lock
+        self._frames = context.Array("q", max(processes, 1), lock=False)
+        self._processes: List[multiprocessing.Process] = [
+            context.Process(
+                target=_worker_main,
+                args=(self._jobs, self._events, self._frames, i),
+                name=f"video-worker-{i}",
+                daemon=True
+            )
+            for i in range(processes)
+        ]
+        self._listener: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start the worker processes and the event listener (call from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        for process in self._processes:
+            process.start()
+        self._listener = threading.Thread(target=self._listen, name="video-worker-events", daemon=True)
+        self._listener.start()
+        logger.info(f"Started {len(self._processes)} video worker process(es)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the worker processes after their current job
+
+        Args:
+            timeout: Seconds to wait for each process before terminating it
+        """
+        for _ in self._processes:
+            self._jobs.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        if self._listener is not None:
+            self._events.put(None)
+            self._listener.join()
+            self._listener = None
+
+    def submit(self, task_id: str, video_path: str, **params) -> None:
+        """
+        Queue an annotation job; the worker takes ownership of video_path
+
+        Args:
+            task_id: TaskManager task ID to report to
+            video_path: Path to the uploaded video (removed when the job ends)
+            **params: annotate_video_to_file options (confidence, classes, ...)
+        """
+        self._jobs.put((task_id, video_path, params))
+
+    def _listen(self) -> None:
+        """Forward worker events to the TaskManager on the event loop"""
+        while True:
+            event = self._events.get()
+            if event is None:
+                break
+            self._loop.call_soon_threadsafe(self._apply_event, event)
+
+    def _apply_event(self, event: tuple) -> None:
+        """
+        Apply one worker event to the TaskManager
+
+        Args:
+            event: Event tuple sent by a worker process
+        """
+        kind, task_id, *payload = event
+        if kind == "started":
+            self.task_manager.attach_frame_source(task_id, partial(self._frames.__getitem__, payload[0]))
+        elif kind == "progress":
+            self.task_manager.update_progress(task_id, *payload)
+        elif kind == "completed":
+            self.task_manager.complete_task(task_id, payload[0])
+            logger.info(f"Task {task_id} completed successfully")
+        elif kind == "failed":
+            self.task_manager.fail_task(task_id, payload[0])
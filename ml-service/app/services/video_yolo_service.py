@@ -7,12 +7,18 @@ import time
 import logging
 import tempfile
 import os
+import queue
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional, Dict, Tuple
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Dict, Tuple, Union
 from collections import defaultdict
 import numpy as np
 
+from app.config import settings
 from app.models.schemas import Detection, FrameDetection, VideoInfo, VideoDetectionResponse
+from app.services.video_frame_service import VideoFrameService
+from app.utils.upload_utils import prefetch_file, write_temp_file
 
 # Lazy imports to avoid issues if packages not installed
 try:
@@ -24,6 +30,19 @@ except ImportError:
     CV2_AVAILABLE = False
     logging.warning("OpenCV or Ultralytics not installed. Video features will be disabled.")
 
+# Optional PyAV decoder: whole-video detection/segmentation demuxes uploads in
+# memory with it, and annotated video uses it when settings.video_backend = "pyav"
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+try:
+    from av.codec.hwaccel import HWAccel  # PyAV >= 14
+except ImportError:
+    HWAccel = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,7 +66,12 @@ class VideoYOLOService:
             )
 
         self.yolo_service = yolo_service
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        # Whole-video jobs hold a thread for their full duration; size the
+        # pool like the inference pool so concurrent async tasks don't queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.num_workers,
+            thread_name_prefix="video-yolo"
+        )
         logger.info("VideoYOLOService initialized")
 
     async def detect_objects_in_video(
@@ -71,13 +95,15 @@ class VideoYOLOService:
         """
         start_time = time.time()
 
-        # Write video to temporary file
         temp_video_path = None
         try:
-            temp_video_path = await self._write_temp_video(video_bytes)
+            if AV_AVAILABLE:
+                video = video_bytes  # Demuxed in memory, no temp file
+            else:
+                video = temp_video_path = await self._write_temp_video(video_bytes)
 
             # Load video and get metadata
-            video_info = await self._get_video_info(temp_video_path)
+            video_info = await self._get_video_info(video)
             logger.info(
                 f"Processing video: {video_info['total_frames']} frames, "
                 f"{video_info['fps']:.2f} FPS, {video_info['duration_seconds']:.2f}s"
@@ -85,7 +111,7 @@ class VideoYOLOService:
 
             # Process video frames
             frame_detections = await self._process_video_frames(
-                temp_video_path,
+                video,
                 confidence,
                 classes,
                 frame_skip,
@@ -124,15 +150,15 @@ class VideoYOLOService:
             }
         finally:
             # Clean up temporary file
-            if temp_video_path and os.path.exists(temp_video_path):
+            if temp_video_path:
                 try:
-                    os.remove(temp_video_path)
+                    Path(temp_video_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.warning(f"Failed to remove temp video file: {e}")
 
     async def _write_temp_video(self, video_bytes: bytes) -> str:
         """
-        Write video bytes to temporary file
+        Write video bytes to temporary file (in settings.upload_temp_dir, if set)
 
         Args:
             video_bytes: Video data
@@ -142,23 +168,16 @@ class VideoYOLOService:
         """
         loop = asyncio.get_event_loop()
 
-        def _write():
-            # Create temporary file
-            fd, path = tempfile.mkstemp(suffix='.mp4')
-            try:
-                os.write(fd, video_bytes)
-            finally:
-                os.close(fd)
-            return path
-
-        return await loop.run_in_executor(self.executor, _write)
+        return await loop.run_in_executor(
+            self.executor, write_temp_file, video_bytes, '.mp4', settings.upload_temp_dir
+        )
 
-    async def _get_video_info(self, video_path: str) -> Dict:
+    async def _get_video_info(self, video: Union[bytes, str]) -> Dict:
         """
         Extract video metadata
 
         Args:
-            video_path: Path to video file
+            video: Video data (read in memory with PyAV) or path to video file
 
         Returns:
             Dictionary with video info
@@ -166,7 +185,20 @@ class VideoYOLOService:
         loop = asyncio.get_event_loop()
 
         def _extract_info():
-            cap = cv2.VideoCapture(video_path)
+            if isinstance(video, bytes):
+                container, stream = VideoFrameService._open_av_container(video)
+                try:
+                    info = VideoFrameService._av_video_info(container, stream)
+                finally:
+                    container.close()
+                return {
+                    "total_frames": info.total_frames,
+                    "fps": round(info.fps, 2),
+                    "duration_seconds": round(info.duration, 2),
+                    "resolution": (info.width, info.height)
+                }
+
+            cap = cv2.VideoCapture(video)
             if not cap.isOpened():
                 raise ValueError("Failed to open video file")
 
@@ -187,9 +219,107 @@ class VideoYOLOService:
 
         return await loop.run_in_executor(self.executor, _extract_info)
 
+    @staticmethod
+    def _iter_video_frames(video: Union[bytes, str]) -> Iterator[np.ndarray]:
+        """
+        Decode every frame of a video in order
+
+        Args:
+            video: Video data (demuxed in memory with PyAV) or path to video file
+
+        Yields:
+            Decoded frames (BGR format)
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        if isinstance(video, bytes):
+            container, stream = VideoFrameService._open_av_container(video)
+            try:
+                for frame in container.decode(stream):
+                    yield frame.to_ndarray(format="bgr24")
+            finally:
+                container.close()
+            return
+
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            raise ValueError("Failed to open video file")
+
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+        finally:
+            cap.release()
+
+    def _iter_frame_batches(
+        self,
+        video: Union[bytes, str],
+        frame_skip: int
+    ) -> Iterator[List[Tuple[int, np.ndarray]]]:
+        """
+        Group a video's non-skipped frames into inference batches
+
+        Args:
+            video: Video data or path to video file
+            frame_skip: Number of frames to skip between processed frames
+
+        Yields:
+            Lists of up to settings.video_batch_size (frame_number, frame) pairs
+        """
+        batch = []
+        for frame_number, frame in enumerate(self._iter_video_frames(video)):
+            # Skip frames if configured
+            if frame_skip > 0 and frame_number % (frame_skip + 1) != 0:
+                continue
+
+            batch.append((frame_number, frame))
+            if len(batch) >= settings.video_batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def _predict_frames(
+        self,
+        model,
+        frames: List[np.ndarray],
+        confidence: float,
+        class_ids: Optional[List[int]]
+    ) -> list:
+        """
+        Run batched predict calls over decoded frames (on the calling thread)
+
+        Args:
+            model: YOLO model to run
+            frames: Decoded frames (BGR numpy arrays; ultralytics takes them as-is)
+            confidence: Confidence threshold (0.0-1.0)
+            class_ids: Class IDs to keep (None = all classes)
+
+        Returns:
+            List of YOLO result objects, one per frame
+        """
+        # TensorRT engines only accept batches within their optimization profile
+        chunk_size = settings.tensorrt_max_batch if self.yolo_service.use_tensorrt else len(frames)
+        return [
+            result
+            for i in range(0, len(frames), chunk_size)
+            for result in model.predict(
+                frames[i:i + chunk_size],
+                conf=confidence,
+                classes=class_ids,
+                half=self.yolo_service.half,
+                verbose=False
+            )
+        ]
+
     async def _process_video_frames(
         self,
-        video_path: str,
+        video: Union[bytes, str],
         confidence: float,
         classes: Optional[List[str]],
         frame_skip: int,
@@ -199,7 +329,7 @@ class VideoYOLOService:
         Process video frames with YOLO detection
 
         Args:
-            video_path: Path to video file
+            video: Video data or path to video file
             confidence: Detection confidence threshold
             classes: List of class names to detect
             frame_skip: Number of frames to skip between detections
@@ -216,38 +346,21 @@ class VideoYOLOService:
 
         def _process_frames():
             """Process frames in thread pool (CPU/GPU bound)"""
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError("Failed to open video file for processing")
-
             frame_results = []
-            frame_number = 0
             fps = video_info["fps"]
 
-            try:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-
-                    # Skip frames if configured
-                    if frame_skip > 0 and frame_number % (frame_skip + 1) != 0:
-                        frame_number += 1
-                        continue
-
-                    # Convert BGR to RGB (OpenCV uses BGR, YOLO expects RGB)
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    # Run YOLO detection on frame
-                    results = self.yolo_service.detection_model.predict(
-                        frame_rgb,
-                        conf=confidence,
-                        classes=class_ids,
-                        verbose=False
-                    )
+            for batch in self._iter_frame_batches(video, frame_skip):
+                # Run YOLO detection on the whole batch in one call
+                results = self._predict_frames(
+                    self.yolo_service.detection_model,
+                    [frame for _, frame in batch],
+                    confidence,
+                    class_ids
+                )
 
+                for (frame_number, _), result in zip(batch, results):
                     # Parse detections
-                    detections = self.yolo_service._parse_detection_results(results[0])
+                    detections = self.yolo_service._parse_detection_results(result)
 
                     # Calculate timestamp
                     timestamp = frame_number / fps if fps > 0 else 0
@@ -260,14 +373,9 @@ class VideoYOLOService:
                         "count": len(detections)
                     })
 
-                    frame_number += 1
-
                     # Log progress every 30 frames
-                    if frame_number % 30 == 0:
-                        logger.info(f"Processed {frame_number} frames...")
-
-            finally:
-                cap.release()
+                    if (frame_number + 1) % 30 == 0:
+                        logger.info(f"Processed {frame_number + 1} frames...")
 
             return frame_results
 
@@ -348,13 +456,15 @@ class VideoYOLOService:
         """
         start_time = time.time()
 
-        # Write video to temporary file
         temp_video_path = None
         try:
-            temp_video_path = await self._write_temp_video(video_bytes)
+            if AV_AVAILABLE:
+                video = video_bytes  # Demuxed in memory, no temp file
+            else:
+                video = temp_video_path = await self._write_temp_video(video_bytes)
 
             # Load video and get metadata
-            video_info = await self._get_video_info(temp_video_path)
+            video_info = await self._get_video_info(video)
             logger.info(
                 f"Processing video for segmentation: {video_info['total_frames']} frames, "
                 f"{video_info['fps']:.2f} FPS, {video_info['duration_seconds']:.2f}s"
@@ -362,7 +472,7 @@ class VideoYOLOService:
 
             # Process video frames with segmentation
             frame_segmentations = await self._process_video_frames_segmentation(
-                temp_video_path,
+                video,
                 confidence,
                 classes,
                 frame_skip,
@@ -401,15 +511,15 @@ class VideoYOLOService:
             }
         finally:
             # Clean up temporary file
-            if temp_video_path and os.path.exists(temp_video_path):
+            if temp_video_path:
                 try:
-                    os.remove(temp_video_path)
+                    Path(temp_video_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.warning(f"Failed to remove temp video file: {e}")
 
     async def _process_video_frames_segmentation(
         self,
-        video_path: str,
+        video: Union[bytes, str],
         confidence: float,
         classes: Optional[List[str]],
         frame_skip: int,
@@ -419,7 +529,7 @@ class VideoYOLOService:
         Process video frames with YOLO segmentation
 
         Args:
-            video_path: Path to video file
+            video: Video data or path to video file
             confidence: Segmentation confidence threshold
             classes: List of class names to segment
             frame_skip: Number of frames to skip between segmentations
@@ -436,38 +546,21 @@ class VideoYOLOService:
 
         def _process_frames():
             """Process frames with segmentation in thread pool (CPU/GPU bound)"""
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError("Failed to open video file for segmentation")
-
             frame_results = []
-            frame_number = 0
             fps = video_info["fps"]
 
-            try:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-
-                    # Skip frames if configured
-                    if frame_skip > 0 and frame_number % (frame_skip + 1) != 0:
-                        frame_number += 1
-                        continue
-
-                    # Convert BGR to RGB (OpenCV uses BGR, YOLO expects RGB)
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    # Run YOLO segmentation on frame
-                    results = self.yolo_service.segmentation_model.predict(
-                        frame_rgb,
-                        conf=confidence,
-                        classes=class_ids,
-                        verbose=False
-                    )
+            for batch in self._iter_frame_batches(video, frame_skip):
+                # Run YOLO segmentation on the whole batch in one call
+                results = self._predict_frames(
+                    self.yolo_service.segmentation_model,
+                    [frame for _, frame in batch],
+                    confidence,
+                    class_ids
+                )
 
+                for (frame_number, _), result in zip(batch, results):
                     # Parse segmentations
-                    segments = self.yolo_service._parse_segmentation_results(results[0])
+                    segments = self.yolo_service._parse_segmentation_results(result)
 
                     # Calculate timestamp
                     timestamp = frame_number / fps if fps > 0 else 0
@@ -481,14 +574,9 @@ class VideoYOLOService:
                         "count": len(segments)
                     })
 
-                    frame_number += 1
-
                     # Log progress every 30 frames
-                    if frame_number % 30 == 0:
-                        logger.info(f"Segmented {frame_number} frames...")
-
-            finally:
-                cap.release()
+                    if (frame_number + 1) % 30 == 0:
+                        logger.info(f"Segmented {frame_number + 1} frames...")
 
             return frame_results
 
@@ -526,79 +614,111 @@ class VideoYOLOService:
             frame_skip=frame_skip
         )
 
-    async def segment_objects_in_video(
+    async def detect_and_annotate_video(
         self,
-        video_bytes: bytes,
+        video_bytes: Optional[bytes] = None,
         confidence: float = 0.5,
-        frame_skip: int = 0
-    ) -> Dict:
+        classes: Optional[List[str]] = None,
+        frame_skip: int = 0,
+        line_width: int = 2,
+        font_scale: float = 0.6,
+        progress_callback: Optional[callable] = None,
+        video_path: Optional[str] = None
+    ) -> Tuple[bytes, Dict]:
         """
-        Segment objects in video frame-by-frame
+        Detect objects in video and return annotated video with bounding boxes
 
         Args:
-            video_bytes: Video data as bytes
-            confidence: Segmentation confidence threshold
+            video_bytes: Video data as bytes (ignored if video_path is given)
+            confidence: Detection confidence threshold
+            classes: List of class names to detect
             frame_skip: Skip N frames between detections
+            line_width: Width of bounding box lines
+            font_scale: Font scale for labels
+            progress_callback: Optional callback(current_frame, message)
+            video_path: Path to a video file already on disk (not removed)
 
         Returns:
-            Dictionary with video info, frame segmentations, and summary
+            Tuple of (annotated_video_bytes, detection_summary)
         """
-        # Similar to detect_objects_in_video but uses segmentation model
-        # For now, we'll return a not implemented response
-        # This can be implemented later following the same pattern
-        return {
-            "status": "error",
-            "message": "Video segmentation not yet implemented. Use detect_objects_in_video instead."
-        }
+        output_path, detection_stats = await self.annotate_video_to_file(
+            video_bytes=video_bytes,
+            confidence=confidence,
+            classes=classes,
+            frame_skip=frame_skip,
+            line_width=line_width,
+            font_scale=font_scale,
+            progress_callback=progress_callback,
+            video_path=video_path
+        )
 
-    async def detect_and_annotate_video(
+        def _read_output() -> bytes:
+            # read() sizes its buffer from the file size: one allocation, no regrowth
+            try:
+                with open(output_path, 'rb') as f:
+                    return f.read()
+            finally:
+                os.remove(output_path)
+
+        # Read output video off the event loop
+        return await asyncio.to_thread(_read_output), detection_stats
+
+    async def annotate_video_to_file(
         self,
-        video_bytes: bytes,
+        video_bytes: Optional[bytes] = None,
         confidence: float = 0.5,
         classes: Optional[List[str]] = None,
         frame_skip: int = 0,
         line_width: int = 2,
         font_scale: float = 0.6,
-        progress_callback: Optional[callable] = None
-    ) -> Tuple[bytes, Dict]:
+        progress_callback: Optional[callable] = None,
+        video_path: Optional[str] = None
+    ) -> Tuple[str, Dict]:
         """
-        Detect objects in video and return annotated video with bounding boxes
+        Detect objects in video and write the annotated video to a temp file
+
+        Lets callers serve the result from disk (or just stat it) instead of
+        holding the encoded video in memory. The caller owns the output file
+        and must remove it.
 
         Args:
-            video_bytes: Video data as bytes
+            video_bytes: Video data as bytes (ignored if video_path is given)
             confidence: Detection confidence threshold
             classes: List of class names to detect
             frame_skip: Skip N frames between detections
             line_width: Width of bounding box lines
             font_scale: Font scale for labels
+            progress_callback: Optional callback(current_frame, message)
+            video_path: Path to a video file already on disk (not removed)
 
         Returns:
-            Tuple of (annotated_video_bytes, detection_summary)
+            Tuple of (annotated_video_path, detection_summary)
         """
         start_time = time.time()
 
-        # Write video to temporary file
+        # Write video to temporary file unless it's already on disk
         temp_input_path = None
         temp_output_path = None
 
         try:
-            temp_input_path = await self._write_temp_video(video_bytes)
+            if video_path is None:
+                temp_input_path = await self._write_temp_video(video_bytes)
+            input_path = video_path or temp_input_path
 
             # Load video and get metadata
-            video_info = await self._get_video_info(temp_input_path)
+            video_info = await self._get_video_info(input_path)
             logger.info(
                 f"Processing video for annotation: {video_info['total_frames']} frames, "
                 f"{video_info['fps']:.2f} FPS"
             )
 
             # Create output video path
-            import tempfile
             fd, temp_output_path = tempfile.mkstemp(suffix='.mp4')
             os.close(fd)
 
             # Process and annotate video
             detection_stats = await self._process_and_annotate_video(
-                temp_input_path,
+                input_path,
                 temp_output_path,
                 confidence,
                 classes,
@@ -609,33 +729,30 @@ class VideoYOLOService:
                 progress_callback
             )
 
-            # Read output video
-            with open(temp_output_path, 'rb') as f:
-                output_video_bytes = f.read()
-
             processing_time = time.time() - start_time
 
             # Add processing info to stats
             detection_stats['processing_time_seconds'] = round(processing_time, 2)
             detection_stats['video_info'] = video_info
 
-            logger.info(f"Annotated video generated: {len(output_video_bytes) / (1024*1024):.2f} MB")
+            logger.info(f"Annotated video generated: {os.path.getsize(temp_output_path) / (1024*1024):.2f} MB")
 
-            return output_video_bytes, detection_stats
+            output_path, temp_output_path = temp_output_path, None  # Owned by the caller now
+            return output_path, detection_stats
 
         except Exception as e:
             logger.error(f"Error annotating video: {e}", exc_info=True)
             raise
         finally:
             # Clean up temporary files
-            if temp_input_path and os.path.exists(temp_input_path):
+            if temp_input_path:
                 try:
-                    os.remove(temp_input_path)
+                    Path(temp_input_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.warning(f"Failed to remove temp input file: {e}")
-            if temp_output_path and os.path.exists(temp_output_path):
+            if temp_output_path:
                 try:
-                    os.remove(temp_output_path)
+                    Path(temp_output_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.warning(f"Failed to remove temp output file: {e}")
 
@@ -672,13 +789,7 @@ class VideoYOLOService:
 
         def _process():
             """Process and annotate frames in thread pool"""
-            cap = cv2.VideoCapture(input_path)
-            if not cap.isOpened():
-                raise ValueError("Failed to open input video")
-
-            # Get video properties
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            read_frame, (width, height), close_source = self._open_frame_source(input_path)
             fps = video_info["fps"]
 
             # Create video writer
@@ -686,117 +797,115 @@ class VideoYOLOService:
             out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
 
             if not out.isOpened():
-                cap.release()
+                close_source()
                 raise ValueError("Failed to create output video writer")
 
             # Statistics
             total_detections = 0
             frames_with_detections = 0
             class_counts = defaultdict(int)
-            frame_number = 0
             frames_processed = 0
 
             # Generate colors for classes (consistent across frames)
             np.random.seed(42)  # Consistent colors
             colors = {}
 
-            try:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-
-                    # Process every frame but only detect on non-skipped frames
-                    should_detect = (frame_skip == 0) or (frame_number % (frame_skip + 1) == 0)
+            def annotate(batch: List[Tuple[int, np.ndarray]]) -> List[np.ndarray]:
+                """Detect on the batch's non-skipped frames in one call and draw the results in place"""
+                # Process every frame but only detect on non-skipped frames
+                to_detect = [
+                    frame for frame_number, frame in batch
+                    if frame_skip == 0 or frame_number % (frame_skip + 1) == 0
+                ]
+                if to_detect:
+                    results = self._predict_frames(
+                        self.yolo_service.detection_model, to_detect, confidence, class_ids
+                    )
+                    for frame, result in zip(to_detect, results):
+                        draw(frame, self.yolo_service._parse_detection_results(result))
+
+                return [frame for _, frame in batch]
+
+            def draw(frame: np.ndarray, detections: List[Dict]) -> None:
+                """Draw one frame's detections in place and count them"""
+                nonlocal total_detections, frames_with_detections, frames_processed
+
+                # Draw bounding boxes and labels
+                if len(detections) > 0:
+                    frames_with_detections += 1
+                    total_detections += len(detections)
+
+                    for det in detections:
+                        class_name = det["class_name"]
+                        conf = det["confidence"]
+                        bbox = det["bbox"]  # [x1, y1, x2, y2]
+
+                        # Get or create color for this class
+                        if class_name not in colors:
+                            colors[class_name] = tuple(
+                                int(c) for c in np.random.randint(0, 255, 3)
+                            )
+                        color = colors[class_name]
+
+                        # Update class counts
+                        class_counts[class_name] += 1
+
+                        # Draw bounding box
+                        x1, y1, x2, y2 = map(int, bbox)
+                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, line_width)
+
+                        # Draw label with background
+                        label = f"{class_name} {conf:.2f}"
+                        font = cv2.FONT_HERSHEY_SIMPLEX
+
+                        # Get text size
+                        (text_width, text_height), baseline = cv2.getTextSize(
+                            label, font, font_scale, 1
+                        )
 
-                    if should_detect:
-                        # Convert BGR to RGB for YOLO
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                        # Draw label background
+                        cv2.rectangle(
+                            frame,
+                            (x1, y1 - text_height - baseline - 5),
+                            (x1 + text_width, y1),
+                            color,
+                            -1  # Filled
+                        )
 
-                        # Run YOLO detection
-                        results = self.yolo_service.detection_model.predict(
-                            frame_rgb,
-                            conf=confidence,
-                            classes=class_ids,
-                            verbose=False
+                        # Draw label text
+                        cv2.putText(
+                            frame,
+                            label,
+                            (x1, y1 - baseline - 2),
+                            font,
+                            font_scale,
+                            (255, 255, 255),  # White text
+                            1,
+                            cv2.LINE_AA
                         )
 
-                        # Parse detections
-                        detections = self.yolo_service._parse_detection_results(results[0])
-
-                        # Draw bounding boxes and labels
-                        if len(detections) > 0:
-                            frames_with_detections += 1
-                            total_detections += len(detections)
-
-                            for det in detections:
-                                class_name = det["class_name"]
-                                conf = det["confidence"]
-                                bbox = det["bbox"]  # [x1, y1, x2, y2]
-
-                                # Get or create color for this class
-                                if class_name not in colors:
-                                    colors[class_name] = tuple(
-                                        int(c) for c in np.random.randint(0, 255, 3)
-                                    )
-                                color = colors[class_name]
-
-                                # Update class counts
-                                class_counts[class_name] += 1
-
-                                # Draw bounding box
-                                x1, y1, x2, y2 = map(int, bbox)
-                                cv2.rectangle(frame, (x1, y1), (x2, y2), color, line_width)
-
-                                # Draw label with background
-                                label = f"{class_name} {conf:.2f}"
-                                font = cv2.FONT_HERSHEY_SIMPLEX
-
-                                # Get text size
-                                (text_width, text_height), baseline = cv2.getTextSize(
-                                    label, font, font_scale, 1
-                                )
-
-                                # Draw label background
-                                cv2.rectangle(
-                                    frame,
-                                    (x1, y1 - text_height - baseline - 5),
-                                    (x1 + text_width, y1),
-                                    color,
-                                    -1  # Filled
-                                )
-
-                                # Draw label text
-                                cv2.putText(
-                                    frame,
-                                    label,
-                                    (x1, y1 - baseline - 2),
-                                    font,
-                                    font_scale,
-                                    (255, 255, 255),  # White text
-                                    1,
-                                    cv2.LINE_AA
-                                )
-
-                        frames_processed += 1
-
-                    # Write frame to output video
-                    out.write(frame)
-                    frame_number += 1
+                frames_processed += 1
 
-                    # Report progress via callback
-                    if progress_callback and frame_number % 10 == 0:
-                        try:
-                            progress_callback(frame_number, f"Processing frame {frame_number}/{video_info['total_frames']}")
-                        except Exception as e:
-                            logger.warning(f"Progress callback error: {e}")
+            def on_frame(frame_number: int) -> None:
+                """Report progress after each annotated frame"""
+                # Report progress via callback
+                if progress_callback and frame_number % 10 == 0:
+                    try:
+                        progress_callback(frame_number, f"Processing frame {frame_number}/{video_info['total_frames']}")
+                    except Exception as e:
+                        logger.warning(f"Progress callback error: {e}")
 
-                    # Log progress
-                    if frame_number % 100 == 0:
-                        logger.info(f"Annotated {frame_number} frames...")
+                # Log progress
+                if frame_number % 100 == 0:
+                    logger.info(f"Annotated {frame_number} frames...")
 
+            try:
+                frame_number = self._run_pipeline(
+                    read_frame, (width, height), out, annotate, on_frame,
+                    batch_size=settings.video_batch_size
+                )
             finally:
-                cap.release()
+                close_source()
                 out.release()
 
             return {
@@ -811,3 +920,257 @@ class VideoYOLOService:
         # Run in executor
         stats = await loop.run_in_executor(self.executor, _process)
         return stats
+
+    def _open_frame_source(
+        self,
+        video_path: str
+    ) -> Tuple[Callable[[np.ndarray], Optional[np.ndarray]], Tuple[int, int], Callable[[], None]]:
+        """
+        Open a video for sequential BGR frame decoding
+
+        Uses PyAV when settings.video_backend is "pyav" and PyAV is installed
+        (with NVDEC when the service runs on CUDA), otherwise OpenCV.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Tuple of (read_frame, (width, height), close function).
+            read_frame(buffer) decodes the next frame into buffer where the
+            size matches and returns it, or None at the end of the video.
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        prefetch_file(video_path)
+
+        if settings.video_backend == "pyav" and AV_AVAILABLE:
+            container = self._open_pyav_container(video_path)
+            stream = container.streams.video[0]
+            size = (stream.codec_context.width, stream.codec_context.height)
+            return self._pyav_frame_reader(container), size, container.close
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError("Failed to open input video")
+
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        return self._cv2_frame_reader(cap), size, cap.release
+
+    def _open_pyav_container(self, video_path: str):
+        """
+        Open a video file with PyAV, requesting NVDEC decode on CUDA
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            PyAV input container with at least one video stream
+
+        Raises:
+            ValueError: If video cannot be opened
+        """
+        kwargs = {}
+        if HWAccel is not None and self.yolo_service.device == "cuda":
+            # Falls back to software decode if the codec has no NVDEC support
+            kwargs["hwaccel"] = HWAccel(device_type="cuda", allow_software_fallback=True)
+
+        try:
+            container = av.open(video_path, **kwargs)
+        except Exception as e:
+            raise ValueError("Failed to open input video") from e
+
+        if not container.streams.video:
+            container.close()
+            raise ValueError("Failed to open input video")
+
+        container.streams.video[0].thread_type = "AUTO"
+        return container
+
+    @staticmethod
+    def _pyav_frame_reader(container) -> Callable[[np.ndarray], Optional[np.ndarray]]:
+        """
+        Build a read_frame function over a PyAV container
+
+        PyAV has no output-buffer argument, so each frame is converted to
+        bgr24 in the decoder's own buffer and copied into the caller's.
+
+        Args:
+            container: PyAV input container
+
+        Returns:
+            read_frame(buffer) returning the next BGR frame or None at the end
+        """
+        decoded = container.decode(video=0)
+
+        def read_frame(buffer: np.ndarray) -> Optional[np.ndarray]:
+            frame = next(decoded, None)
+            if frame is None:
+                return None
+            image = frame.to_ndarray(format="bgr24")
+            if image.shape != buffer.shape:
+                return image.copy()
+            np.copyto(buffer, image)
+            return buffer
+
+        return read_frame
+
+    @staticmethod
+    def _cv2_frame_reader(cap) -> Callable[[np.ndarray], Optional[np.ndarray]]:
+        """
+        Build a read_frame function over an OpenCV capture
+
+        Args:
+            cap: Opened cv2.VideoCapture
+
+        Returns:
+            read_frame(buffer) returning the next BGR frame or None at the end
+        """
+        def read_frame(buffer: np.ndarray) -> Optional[np.ndarray]:
+            if not cap.grab():
+                return None
+            # retrieve() decodes into buffer when its shape and dtype match
+            ret, frame = cap.retrieve(buffer)
+            return frame if ret else None
+
+        return read_frame
+
+    def _run_pipeline(
+        self,
+        read_frame: Callable[[np.ndarray], Optional[np.ndarray]],
+        frame_size: Tuple[int, int],
+        writer,
+        annotate: Callable[[List[Tuple[int, np.ndarray]]], List[np.ndarray]],
+        on_frame: Optional[Callable[[int], None]] = None,
+        batch_size: int = 1
+    ) -> int:
+        """
+        Decode, annotate and encode a video as a three-stage pipeline
+
+        A reader thread decodes frames and a writer thread encodes them,
+        connected to the calling thread through bounded queues, so decoding
+        of the next batch and encoding of the previous one overlap with
+        inference on the current batch. Inference stays on the calling
+        thread so frames reach the model in order from a single thread.
+
+        Frames are decoded into a fixed pool of prefetch + batch_size + 1
+        preallocated buffers; the writer hands each buffer back once it is
+        encoded, so no per-frame arrays are allocated and at most that many
+        frames are in flight.
+
+        Args:
+            read_frame: read_frame(buffer) decoding the next frame (ideally
+                into buffer) or returning None at the end; called on the
+                reader thread
+            frame_size: (width, height) of the decoded frames
+            writer: Opened cv2.VideoWriter
+            annotate: Called as annotate(batch) with up to batch_size
+                (frame_number, frame) pairs in order; draws in place and
+                returns the frames to write
+            on_frame: Optional callback(frames_done) after each frame is queued
+                for writing
+            batch_size: Number of frames handed to annotate at once
+
+        Returns:
+            Number of frames written
+        """
+        read_q: queue.Queue = queue.Queue(maxsize=settings.video_pipeline_prefetch)
+        write_q: queue.Queue = queue.Queue(maxsize=settings.video_pipeline_prefetch)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        width, height = frame_size
+        free_q: queue.Queue = queue.Queue()
+        # The calling thread holds up to batch_size frames while the reader fills another
+        for _ in range(settings.video_pipeline_prefetch + batch_size + 1):
+            free_q.put(np.empty((height, width, 3), dtype=np.uint8))
+
+        def put(q: queue.Queue, item) -> bool:
+            """Put into q unless the pipeline is stopping"""
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            """Get from q; None once the pipeline is stopping"""
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def read() -> None:
+            try:
+                frame_number = 0
+                while True:
+                    buffer = get(free_q)
+                    if buffer is None:
+                        return
+                    frame = read_frame(buffer)
+                    if frame is None:
+                        break
+                    if not put(read_q, (frame_number, frame)):
+                        return
+                    frame_number += 1
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(read_q, None)  # End of frames
+
+        def write() -> None:
+            try:
+                while True:
+                    frame = get(write_q)
+                    if frame is None:
+                        break
+                    writer.write(frame)
+                    free_q.put(frame)  # Reuse the buffer for a later frame
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        reader_thread = threading.Thread(target=read, name="video-reader", daemon=True)
+        writer_thread = threading.Thread(target=write, name="video-writer", daemon=True)
+        reader_thread.start()
+        writer_thread.start()
+
+        frames_done = 0
+        batch: List[Tuple[int, np.ndarray]] = []
+        try:
+            while True:
+                item = get(read_q)
+                if item is not None:
+                    batch.append(item)
+                    if len(batch) < batch_size:
+                        continue
+
+                stopped = False
+                for frame in (annotate(batch) if batch else []):
+                    if not put(write_q, frame):
+                        stopped = True
+                        break
+                    frames_done += 1
+                    if on_frame:
+                        on_frame(frames_done)
+                batch = []
+
+                if item is None or stopped:
+                    break
+
+            put(write_q, None)  # Let the writer drain and exit
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            reader_thread.join()
+            writer_thread.join()
+
+        if errors:
+            raise errors[0]
+        return frames_done
@@ -3,16 +3,19 @@ YOLO Service for object detection, segmentation, and face detection
 Handles model loading, inference, and result parsing
 """
 import asyncio
+import threading
 import time
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional, Dict, Tuple, TypeVar, Union
 import io
-from PIL import Image
+import numpy as np
 
 from app.config import settings
 from app.models.schemas import Detection, Segment
-from app.utils.image_utils import bytes_to_image, resize_image, validate_image
+from app.utils.image_utils import ImageProcessor, FrameBatchBuffer
 
 # Lazy import to avoid issues if torch/ultralytics not installed
 try:
@@ -23,8 +26,21 @@ except ImportError:
     ULTRALYTICS_AVAILABLE = False
     logging.warning("Ultralytics not installed. ML features will be disabled.")
 
+# nvJPEG decoding via torchvision (stream frames on CUDA)
+try:
+    import torch.nn.functional as F
+    from torchvision.io import ImageReadMode, decode_jpeg
+    GPU_DECODE_AVAILABLE = True
+except ImportError:
+    GPU_DECODE_AVAILABLE = False
+
+# JPEG start-of-image marker
+_JPEG_MAGIC = b"\xff\xd8"
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class YOLOService:
     """
@@ -44,11 +60,33 @@ class YOLOService:
         self.segmentation_model: Optional[YOLO] = None
         self.face_model: Optional[YOLO] = None
 
-        # Thread pool for CPU/GPU-bound operations
+        # Thread pool for CPU/GPU-bound operations (one CUDA stream per thread)
         self.executor = ThreadPoolExecutor(max_workers=settings.num_workers)
+        self._thread_local = threading.local()
 
         # Device configuration
         self.device = self._get_device()
+        self.use_tensorrt = settings.use_tensorrt and self.device == "cuda"
+        self.half = (settings.half or settings.precision == "fp16") and self.device == "cuda"
+        self.use_openvino_int8 = settings.precision == "int8" and self.device == "cpu"
+        self.gpu_decode = GPU_DECODE_AVAILABLE and self.device == "cuda"
+
+        if self.device == "cuda" and settings.cudnn_benchmark:
+            # Letterboxed inputs come in a handful of shapes; cuDNN times its
+            # conv algorithms once per shape (during warmup) and reuses the fastest
+            torch.backends.cudnn.benchmark = True
+
+        # Per-worker buffer that batched video frames are resized into
+        self._frame_buffer = FrameBatchBuffer(
+            capacity=settings.tensorrt_max_batch,
+            use_cuda=self.device == "cuda"
+        )
+
+        # Class name -> ID resolution, memoized per class list and per raw
+        # comma-separated form value; the name table is built at model load
+        self._class_name_to_id: Dict[str, int] = {}
+        self._resolve_class_ids = lru_cache(maxsize=256)(self._class_names_to_ids)
+        self.resolve_classes = lru_cache(maxsize=256)(self._parse_class_ids)
 
         # Metrics
         self.total_requests = 0
@@ -80,6 +118,47 @@ class YOLOService:
         else:
             return "cpu"
 
+    def _run_on_worker_stream(self, fn: Callable[[], T]) -> T:
+        """
+        Run a model call on this executor thread's own CUDA stream
+
+        Each inference thread gets a dedicated stream, so kernels from
+        concurrent requests can overlap instead of queuing on the default
+        stream. The stream is synchronized before returning, so results are
+        ready for whichever thread parses them.
+
+        Args:
+            fn: Model call to run (e.g. a predict lambda)
+
+        Returns:
+            Whatever fn returns
+        """
+        if self.device != "cuda":
+            return fn()
+
+        stream = getattr(self._thread_local, "cuda_stream", None)
+        if stream is None:
+            stream = torch.cuda.Stream()
+            self._thread_local.cuda_stream = stream
+
+        with torch.cuda.stream(stream):
+            result = fn()
+        stream.synchronize()
+        return result
+
+    async def _run_inference(self, fn: Callable[[], T]) -> T:
+        """
+        Run a blocking model call in the inference thread pool
+
+        Args:
+            fn: Model call to run (e.g. a predict lambda)
+
+        Returns:
+            Whatever fn returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._run_on_worker_stream, fn)
+
     async def load_models(self):
         """
         Load all YOLO models on startup
@@ -93,30 +172,34 @@ class YOLOService:
             logger.info(f"Loading detection model: {settings.detection_model_path}")
             self.detection_model = await loop.run_in_executor(
                 self.executor,
-                lambda: YOLO(settings.detection_model_path)
+                lambda: self._load_model(settings.detection_model_path)
             )
-            self.detection_model.to(self.device)
 
             # Load segmentation model
             logger.info(f"Loading segmentation model: {settings.segmentation_model_path}")
             self.segmentation_model = await loop.run_in_executor(
                 self.executor,
-                lambda: YOLO(settings.segmentation_model_path)
+                lambda: self._load_model(settings.segmentation_model_path)
             )
-            self.segmentation_model.to(self.device)
 
             # Load face detection model (use detection model if face model not available)
             try:
                 logger.info(f"Loading face detection model: {settings.face_model_path}")
                 self.face_model = await loop.run_in_executor(
                     self.executor,
-                    lambda: YOLO(settings.face_model_path)
+                    lambda: self._load_model(settings.face_model_path)
                 )
-                self.face_model.to(self.device)
             except Exception as e:
                 logger.warning(f"Face model not available, using detection model for person detection: {e}")
                 self.face_model = self.detection_model
 
+            # Class IDs resolved against a previous model are stale
+            self._class_name_to_id = {
+                name.lower(): class_id for class_id, name in self.detection_model.names.items()
+            }
+            self._resolve_class_ids.cache_clear()
+            self.resolve_classes.cache_clear()
+
             # Warmup models if configured
             if settings.model_warmup:
                 await self._warmup_models()
@@ -128,29 +211,89 @@ class YOLOService:
             logger.error(f"❌ Failed to load models: {e}")
             raise
 
+    def _load_model(self, model_path: str) -> "YOLO":
+        """
+        Load a YOLO model onto the configured device
+
+        When TensorRT is enabled and running on CUDA, the weights are exported
+        once to an FP16 engine with a dynamic batch profile (cached next to the
+        weights as .engine) and inference is routed through that engine.
+
+        With INT8 precision on CPU, the weights are likewise exported once to
+        an INT8-quantized OpenVINO model (cached next to the weights as
+        <name>_int8_openvino_model/) and inference runs through OpenVINO.
+
+        Args:
+            model_path: Path to the PyTorch weights (.pt)
+
+        Returns:
+            Loaded YOLO model
+        """
+        if self.use_tensorrt:
+            engine_path = Path(model_path).with_suffix(".engine")
+            if not engine_path.exists():
+                logger.info(f"Exporting TensorRT FP16 engine: {engine_path}")
+                YOLO(model_path).export(
+                    format="engine",
+                    imgsz=settings.tensorrt_imgsz,
+                    half=True,
+                    dynamic=True,
+                    batch=settings.tensorrt_max_batch,
+                    device=0
+                )
+            logger.info(f"Using TensorRT engine: {engine_path}")
+            # Engines are bound to the GPU they were built on; no .to(device)
+            return YOLO(str(engine_path))
+
+        if self.use_openvino_int8:
+            weights = Path(model_path)
+            export_dir = weights.with_name(f"{weights.stem}_int8_openvino_model")
+            if not export_dir.exists():
+                logger.info(f"Exporting INT8 OpenVINO model: {export_dir}")
+                export_dir = Path(YOLO(model_path).export(format="openvino", int8=True))
+            logger.info(f"Using INT8 OpenVINO model: {export_dir}")
+            # OpenVINO runs on the CPU itself; no .to(device)
+            return YOLO(str(export_dir))
+
+        model = YOLO(model_path)
+        model.to(self.device)
+        return model
+
     async def _warmup_models(self):
         """
         Warmup models with dummy inference
         Improves first real inference speed
+
+        Runs a few passes per model at every batch size the video-frame
+        endpoints use, so CUDA init, cuDNN autotuning and TensorRT profile
+        selection happen before the first real request. On CUDA the passes
+        run on every inference thread at once, since each thread has its own
+        stream and its first call pays for its own cuDNN/cuBLAS handles.
         """
         logger.info("Warming up models...")
-        loop = asyncio.get_event_loop()
 
-        # Create dummy image (640x640 RGB)
-        dummy_image = Image.new('RGB', (640, 640), color='white')
+        # Dummy decoded frame (640x640 BGR), same input type as the batched path
+        dummy_frame = np.full((640, 640, 3), 255, dtype=np.uint8)
 
-        try:
-            # Warmup detection
-            await loop.run_in_executor(
-                self.executor,
-                lambda: self.detection_model.predict(dummy_image, verbose=False)
-            )
+        models = {"detection": self.detection_model, "segmentation": self.segmentation_model}
+        if self.face_model is not self.detection_model:
+            models["face"] = self.face_model
 
-            # Warmup segmentation
-            await loop.run_in_executor(
-                self.executor,
-                lambda: self.segmentation_model.predict(dummy_image, verbose=False)
-            )
+        # Concurrent submissions make the pool start (and warm) all its threads
+        concurrency = settings.num_workers if self.device == "cuda" else 1
+
+        try:
+            for name, model in models.items():
+                for batch_size in settings.warmup_batch_sizes:
+                    batch = [dummy_frame] * batch_size
+                    for _ in range(settings.warmup_iterations):
+                        await asyncio.gather(*(
+                            self._run_inference(
+                                lambda: model.predict(batch, half=self.half, verbose=False)
+                            )
+                            for _ in range(concurrency)
+                        ))
+                logger.info(f"Warmed up {name} model (batch sizes {settings.warmup_batch_sizes})")
 
             logger.info("✅ Model warmup complete")
         except Exception as e:
@@ -158,17 +301,19 @@ class YOLOService:
 
     async def detect(
         self,
-        image_bytes: bytes,
+        image_bytes: Optional[bytes] = None,
         confidence: float = 0.5,
-        classes: Optional[List[str]] = None
+        classes: Optional[List[str]] = None,
+        image: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Perform object detection
 
         Args:
-            image_bytes: Image data as bytes
+            image_bytes: Image data as bytes (ignored if image is given)
             confidence: Detection confidence threshold (0.0-1.0)
             classes: List of class names to detect (None = all classes)
+            image: Already-decoded image (BGR numpy array), e.g. from decode_image
 
         Returns:
             Dictionary with detection results
@@ -177,26 +322,23 @@ class YOLOService:
 
         # Note: Validation is now handled by handler layer (ImageValidator/VideoValidator)
 
-        # Convert to PIL Image
-        try:
-            image = bytes_to_image(image_bytes)
-        except Exception as e:
-            return {"status": "error", "message": f"Unable to process image: {str(e)}"}
-
-        # Resize if needed
-        image = resize_image(image, settings.max_image_size)
+        # Decode (and resize if needed) off the event loop
+        if image is None:
+            try:
+                image = await asyncio.to_thread(self.decode_image, image_bytes)
+            except Exception as e:
+                return {"status": "error", "message": f"Unable to process image: {str(e)}"}
 
         # Convert class names to class IDs if specified
         class_ids = self._get_class_ids(classes) if classes else None
 
         # Run inference in thread pool
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            self.executor,
+        results = await self._run_inference(
             lambda: self.detection_model.predict(
                 image,
                 conf=confidence,
                 classes=class_ids,
+                half=self.half,
                 verbose=False
             )
         )
@@ -221,17 +363,19 @@ class YOLOService:
 
     async def segment(
         self,
-        image_bytes: bytes,
+        image_bytes: Optional[bytes] = None,
         confidence: float = 0.5,
-        classes: Optional[List[str]] = None
+        classes: Optional[List[str]] = None,
+        image: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Perform instance segmentation
 
         Args:
-            image_bytes: Image data as bytes
+            image_bytes: Image data as bytes (ignored if image is given)
             confidence: Segmentation confidence threshold (0.0-1.0)
             classes: List of class names to segment (None = all classes)
+            image: Already-decoded image (BGR numpy array), e.g. from decode_image
 
         Returns:
             Dictionary with segmentation results
@@ -240,26 +384,23 @@ class YOLOService:
 
         # Note: Validation is now handled by handler layer (ImageValidator/VideoValidator)
 
-        # Convert to PIL Image
-        try:
-            image = bytes_to_image(image_bytes)
-        except Exception as e:
-            return {"status": "error", "message": f"Unable to process image: {str(e)}"}
-
-        # Resize if needed
-        image = resize_image(image, settings.max_image_size)
+        # Decode (and resize if needed) off the event loop
+        if image is None:
+            try:
+                image = await asyncio.to_thread(self.decode_image, image_bytes)
+            except Exception as e:
+                return {"status": "error", "message": f"Unable to process image: {str(e)}"}
 
         # Convert class names to class IDs if specified
         class_ids = self._get_class_ids(classes) if classes else None
 
-        # Run inference
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            self.executor,
+        # Run inference in thread pool
+        results = await self._run_inference(
             lambda: self.segmentation_model.predict(
                 image,
                 conf=confidence,
                 classes=class_ids,
+                half=self.half,
                 verbose=False
             )
         )
@@ -284,15 +425,17 @@ class YOLOService:
 
     async def detect_faces(
         self,
-        image_bytes: bytes,
-        confidence: float = 0.5
+        image_bytes: Optional[bytes] = None,
+        confidence: float = 0.5,
+        image: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Detect human faces
 
         Args:
-            image_bytes: Image data as bytes
+            image_bytes: Image data as bytes (ignored if image is given)
             confidence: Detection confidence threshold (0.0-1.0)
+            image: Already-decoded image (BGR numpy array), e.g. from decode_image
 
         Returns:
             Dictionary with face detection results
@@ -301,36 +444,32 @@ class YOLOService:
 
         # Note: Validation is now handled by handler layer (ImageValidator/VideoValidator)
 
-        # Convert to PIL Image
-        try:
-            image = bytes_to_image(image_bytes)
-        except Exception as e:
-            return {"status": "error", "message": f"Unable to process image: {str(e)}"}
-
-        # Resize if needed
-        image = resize_image(image, settings.max_image_size)
+        # Decode (and resize if needed) off the event loop
+        if image is None:
+            try:
+                image = await asyncio.to_thread(self.decode_image, image_bytes)
+            except Exception as e:
+                return {"status": "error", "message": f"Unable to process image: {str(e)}"}
 
         # If using dedicated face model, use it; otherwise filter for 'person' class
-        loop = asyncio.get_event_loop()
-
         if self.face_model != self.detection_model:
             # Dedicated face model
-            results = await loop.run_in_executor(
-                self.executor,
+            results = await self._run_inference(
                 lambda: self.face_model.predict(
                     image,
                     conf=confidence,
+                    half=self.half,
                     verbose=False
                 )
             )
         else:
             # Use detection model filtered to 'person' class (class ID 0 in COCO)
-            results = await loop.run_in_executor(
-                self.executor,
+            results = await self._run_inference(
                 lambda: self.detection_model.predict(
                     image,
                     conf=confidence,
                     classes=[0],  # person class
+                    half=self.half,
                     verbose=False
                 )
             )
@@ -353,29 +492,252 @@ class YOLOService:
             "inference_time_ms": round(inference_time, 2)
         }
 
-    def _parse_detection_results(self, result) -> List[Dict]:
+    @staticmethod
+    def decode_image(image_bytes: bytes) -> np.ndarray:
         """
-        Parse YOLO detection results into structured format
+        Decode image bytes to a BGR array, downscaled to max_image_size
 
         Args:
-            result: YOLO result object
+            image_bytes: Image data as bytes
 
         Returns:
-            List of detection dictionaries
+            Decoded image ready for predict()
+        """
+        image = ImageProcessor.decode_to_array(image_bytes)
+        return ImageProcessor.resize_array(image, settings.max_image_size)
+
+    def decode_stream_frame(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode a camera frame for the stream endpoints
+
+        On CUDA, JPEG frames are decoded and downscaled on the GPU with
+        nvJPEG, so the CPU never touches full-resolution pixels. Other
+        formats, other devices and frames nvJPEG rejects use decode_image.
+
+        Args:
+            image_bytes: Image data as bytes
+
+        Returns:
+            Decoded image ready for predict()
         """
-        detections = []
+        if self.gpu_decode and image_bytes[:2] == _JPEG_MAGIC:
+            try:
+                return self._decode_gpu(image_bytes)
+            except Exception as e:
+                logger.debug(f"GPU JPEG decode failed, using CPU: {e}")
+        return self.decode_image(image_bytes)
+
+    @staticmethod
+    def _decode_gpu(image_bytes: bytes) -> np.ndarray:
+        """
+        Decode and downscale a JPEG on the GPU
 
-        if result.boxes is None or len(result.boxes) == 0:
-            return detections
+        Args:
+            image_bytes: JPEG data as bytes
 
-        for box in result.boxes:
-            detections.append({
-                "class_name": result.names[int(box.cls)],
-                "confidence": float(box.conf),
-                "bbox": box.xyxy[0].tolist()  # [x1, y1, x2, y2]
+        Returns:
+            Decoded image (BGR numpy array), downscaled to max_image_size
+        """
+        data = torch.frombuffer(bytearray(image_bytes), dtype=torch.uint8)
+        image = decode_jpeg(data, mode=ImageReadMode.RGB, device="cuda")  # (3, H, W)
+
+        height, width = image.shape[1:]
+        scale = settings.max_image_size / max(height, width)
+        if scale < 1:
+            image = F.interpolate(
+                image.unsqueeze(0).float(),
+                size=(int(height * scale), int(width * scale)),
+                mode="area"
+            )[0].round_().clamp_(0, 255).to(torch.uint8)
+
+        # RGB -> BGR, CHW -> HWC; only the downscaled frame crosses to the host
+        return image.flip(0).permute(1, 2, 0).contiguous().cpu().numpy()
+
+    async def detect_numpy(
+        self,
+        image: np.ndarray,
+        confidence: float = 0.5,
+        classes: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Perform object detection on an already-decoded frame
+
+        Skips the bytes -> PIL decode of detect(); ultralytics takes the
+        BGR array as-is.
+
+        Args:
+            image: Decoded frame (BGR numpy array, as read by OpenCV)
+            confidence: Detection confidence threshold (0.0-1.0)
+            classes: List of class names to detect (None = all classes)
+
+        Returns:
+            Dictionary with detection results
+        """
+        results = await self.detect_batch([image], confidence=confidence, classes=classes)
+        return results[0]
+
+    async def detect_batch(
+        self,
+        images: Union[List[np.ndarray], np.ndarray],
+        confidence: float = 0.5,
+        classes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Perform object detection on a batch of decoded frames in one call
+
+        Args:
+            images: List of decoded frames (BGR numpy arrays, as read by OpenCV),
+                or one stacked (N, H, W, 3) array
+            confidence: Detection confidence threshold (0.0-1.0)
+            classes: List of class names to detect (None = all classes)
+
+        Returns:
+            List of detection result dictionaries, one per input frame
+        """
+        results, inference_time = await self._predict_batch(
+            self.detection_model, images, confidence, classes
+        )
+
+        per_frame_time = round(inference_time / len(results), 2) if results else 0.0
+        batch_results = []
+        for result in results:
+            detections = self._parse_detection_results(result)
+            batch_results.append({
+                "status": "success",
+                "detections": detections,
+                "count": len(detections),
+                "image_shape": result.orig_shape,
+                "inference_time_ms": per_frame_time
             })
 
-        return detections
+        return batch_results
+
+    async def segment_batch(
+        self,
+        images: Union[List[np.ndarray], np.ndarray],
+        confidence: float = 0.5,
+        classes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Perform instance segmentation on a batch of decoded frames in one call
+
+        Args:
+            images: List of decoded frames (BGR numpy arrays, as read by OpenCV),
+                or one stacked (N, H, W, 3) array
+            confidence: Segmentation confidence threshold (0.0-1.0)
+            classes: List of class names to segment (None = all classes)
+
+        Returns:
+            List of segmentation result dictionaries, one per input frame
+        """
+        results, inference_time = await self._predict_batch(
+            self.segmentation_model, images, confidence, classes
+        )
+
+        per_frame_time = round(inference_time / len(results), 2) if results else 0.0
+        batch_results = []
+        for result in results:
+            segments = self._parse_segmentation_results(result)
+            batch_results.append({
+                "status": "success",
+                "segments": segments,
+                "count": len(segments),
+                "image_shape": result.orig_shape,
+                "inference_time_ms": per_frame_time
+            })
+
+        return batch_results
+
+    async def _predict_batch(
+        self,
+        model,
+        images: Union[List[np.ndarray], np.ndarray],
+        confidence: float,
+        classes: Optional[List[str]]
+    ) -> tuple:
+        """
+        Run a single batched predict call over decoded frames
+
+        Frames go to the model as numpy arrays, so there is no JPEG
+        encode/decode round-trip between frame extraction and inference.
+
+        Args:
+            model: YOLO model to run
+            images: List of decoded frames (BGR numpy arrays), or one stacked
+                (N, H, W, 3) array as returned by extract_frames_as_ndarray
+            confidence: Confidence threshold (0.0-1.0)
+            classes: List of class names or IDs to keep (None = all classes)
+
+        Returns:
+            Tuple of (list of YOLO result objects, total inference time in ms)
+        """
+        if isinstance(images, np.ndarray):
+            images = list(images)  # Row views, no copy
+
+        if not images:
+            return [], 0.0
+
+        start_time = time.time()
+
+        # Convert class names to class IDs if specified
+        class_ids = self._get_class_ids(classes) if classes else None
+
+        # TensorRT engines only accept batches within their optimization profile
+        chunk_size = settings.tensorrt_max_batch if self.use_tensorrt else len(images)
+
+        def predict() -> list:
+            # Resize into this worker's reusable buffer; predict copies the
+            # pixels out during preprocessing, before the buffer is reused
+            frames = self._frame_buffer.resize_batch(images, settings.max_image_size)
+            return [
+                result
+                for i in range(0, len(frames), chunk_size)
+                for result in model.predict(
+                    frames[i:i + chunk_size],
+                    conf=confidence,
+                    classes=class_ids,
+                    half=self.half,
+                    verbose=False
+                )
+            ]
+
+        # Run resize + inference for the whole batch in thread pool
+        results = await self._run_inference(predict)
+
+        inference_time = (time.time() - start_time) * 1000
+
+        # Update metrics (one request per frame, matching the single-image path)
+        self.total_requests += len(images)
+        self.total_inference_time += inference_time
+
+        return results, inference_time
+
+    def _parse_detection_results(self, result) -> List[Dict]:
+        """
+        Parse YOLO detection results into structured format
+
+        Args:
+            result: YOLO result object
+
+        Returns:
+            List of detection dictionaries
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # One device-to-host copy per field for the whole result rather than
+        # three small tensor reads per box. Boxes are fixed-size tuples:
+        # smaller than lists and not tracked by the GC
+        names = result.names
+        return [
+            {
+                "class_name": names[int(cls)],
+                "confidence": conf,
+                "bbox": tuple(bbox)  # (x1, y1, x2, y2)
+            }
+            for cls, conf, bbox in zip(boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist())
+        ]
 
     def _parse_segmentation_results(self, result) -> List[Dict]:
         """
@@ -387,27 +749,32 @@ class YOLOService:
         Returns:
             List of segmentation dictionaries
         """
-        segments = []
-
         if result.masks is None or len(result.masks) == 0:
-            return segments
-
-        for i, mask in enumerate(result.masks):
-            segments.append({
-                "class_name": result.names[int(result.boxes[i].cls)],
-                "confidence": float(result.boxes[i].conf),
-                "bbox": result.boxes[i].xyxy[0].tolist(),
-                "mask": mask.xy[0].tolist()  # Polygon points
-            })
-
-        return segments
+            return []
+
+        # masks.xy scales every polygon in one pass; indexing masks per
+        # object would redo that for each one
+        boxes = result.boxes
+        names = result.names
+        return [
+            {
+                "class_name": names[int(cls)],
+                "confidence": conf,
+                "bbox": tuple(bbox),
+                "mask": polygon.tolist()  # Polygon points
+            }
+            for cls, conf, bbox, polygon in zip(
+                boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist(), result.masks.xy
+            )
+        ]
 
-    def _get_class_ids(self, class_names: List[str]) -> Optional[List[int]]:
+    def _get_class_ids(self, class_names: List[Union[str, int]]) -> Optional[List[int]]:
         """
         Convert class names to class IDs
 
         Args:
-            class_names: List of class names
+            class_names: List of class names (entries that are already class
+                IDs, e.g. from resolve_classes, are kept as-is)
 
         Returns:
             List of class IDs, or None if no valid classes found
@@ -415,21 +782,52 @@ class YOLOService:
         if not class_names or not self.detection_model:
             return None
 
-        class_ids = []
-        model_names = self.detection_model.names  # Dict: {id: name}
+        # Same class filter is sent for every frame/request; resolve it once
+        class_ids = self._resolve_class_ids(tuple(class_names))
+        return list(class_ids) if class_ids else None
+
+    def _class_names_to_ids(self, class_names: Tuple[Union[str, int], ...]) -> Tuple[int, ...]:
+        """
+        Look up class IDs for class names in the detection model (uncached)
 
-        # Reverse lookup: name -> id
-        name_to_id = {v.lower(): k for k, v in model_names.items()}
+        Args:
+            class_names: Tuple of class names (or class IDs)
+
+        Returns:
+            Tuple of matching class IDs (empty if none match)
+        """
+        class_ids = []
 
         for name in class_names:
+            if isinstance(name, int):
+                class_ids.append(name)
+                continue
+
             # Clean up class name (remove quotes, extra spaces)
             name_clean = name.strip().strip('"').strip("'").strip().lower()
-            if name_clean in name_to_id:
-                class_ids.append(name_to_id[name_clean])
+            if name_clean in self._class_name_to_id:
+                class_ids.append(self._class_name_to_id[name_clean])
             # Silently skip invalid classes - YOLO will just detect all objects
 
-        # If no valid classes found, return None to detect all objects
-        return class_ids if class_ids else None
+        return tuple(class_ids)
+
+    def _parse_class_ids(self, classes: Optional[str]) -> Optional[Tuple[int, ...]]:
+        """
+        Resolve a comma-separated class form value to class IDs (uncached)
+
+        Exposed memoized as resolve_classes(), so a client sending the same
+        filter with every frame skips the string parsing and name lookups.
+
+        Args:
+            classes: Comma-separated class names (e.g. "car,person") or None
+
+        Returns:
+            Tuple of class IDs, or None for no filter / no valid classes
+        """
+        if not classes:
+            return None
+        names = tuple(c for c in classes.split(",") if c.strip())
+        return self._class_names_to_ids(names) or None
 
     def get_avg_inference_time(self) -> float:
         """
@@ -4,8 +4,10 @@ Provides context managers and helpers for async operations
 """
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Dict
+import asyncio
 import time
 import logging
+from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +38,7 @@ async def timed_operation(operation_name: str) -> AsyncGenerator[Dict[str, float
     finally:
         elapsed = time.time() - start_time
         timer['elapsed_ms'] = round(elapsed * 1000, 2)
-        logger.debug(f"{operation_name} completed in {timer['elapsed_ms']}ms")
+        logger.debug("%s completed in %sms", operation_name, timer['elapsed_ms'])
 
 
 @asynccontextmanager
@@ -59,6 +61,15 @@ async def error_context(
     """
     try:
         yield
+    except HTTPException as e:
+        # Client errors (bad uploads, invalid parameters) are expected and can
+        # be frequent; formatting a traceback for each would dominate their cost
+        if log_errors:
+            if e.status_code >= 500:
+                logger.error(f"{operation_name} failed: {e.detail}", exc_info=True)
+            else:
+                logger.warning("%s rejected (%d): %s", operation_name, e.status_code, e.detail)
+        raise
     except Exception as e:
         if log_errors:
             logger.error(f"{operation_name} failed: {e}", exc_info=True)
@@ -84,8 +95,6 @@ async def run_with_timeout(
     Raises:
         TimeoutError: If operation times out
     """
-    import asyncio
-
     try:
         return await asyncio.wait_for(coro, timeout=timeout_seconds)
     except asyncio.TimeoutError:
@@ -0,0 +1,152 @@
+"""
+In-memory result caching and request coalescing utilities
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import hashlib
+import time
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Fingerprint a blob of bytes for use as a cache key
+
+    BLAKE2b with a 16-byte digest: fast enough to hash a 50MB upload in
+    well under the cost of decoding it.
+
+    Args:
+        data: Raw bytes (e.g. an uploaded video)
+
+    Returns:
+        Hex digest string
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Fingerprint a file without loading it into memory
+
+    Gives the same digest as content_hash() of the file's bytes.
+
+    Args:
+        path: Path to the file
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time
+
+    Not thread-safe; intended to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 600):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of entries (least recently used are evicted)
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up an entry, refreshing its LRU position
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store an entry, evicting the least recently used if full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InFlightRequests:
+    """
+    Coalesces concurrent identical requests onto one computation
+
+    The first caller for a key starts the work as a task; callers arriving
+    with the same key while it runs await that task instead of starting
+    their own. The key is dropped as soon as the task finishes, so nothing
+    is cached beyond the lifetime of the computation.
+
+    Not thread-safe; intended to be used from the event loop only.
+    """
+
+    def __init__(self):
+        """Initialize with no requests in flight"""
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await the in-flight computation for key, starting it if needed
+
+        The computation is shielded, so a cancelled caller (e.g. a client
+        that disconnected) does not cancel it for the others.
+
+        Args:
+            key: Identifies the request (e.g. content hash plus parameters)
+            factory: Called with no arguments to start the computation
+
+        Returns:
+            Result of the shared computation
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._discard(key, done))
+        return await asyncio.shield(task)
+
+    def _discard(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished task unless a newer one replaced it"""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
@@ -0,0 +1,42 @@
+"""
+Response compression middleware
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Content types that are already compressed (or stream raw JPEG parts);
+# gzip spends CPU on them for no size gain
+UNCOMPRESSIBLE_TYPES = ("image/", "video/", "multipart/")
+
+
+class _SelectiveGZipResponder(GZipResponder):
+    """GZipResponder that passes already-compressed content types through as-is"""
+
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(UNCOMPRESSIBLE_TYPES):
+                # Reuse the responder's pass-through path for pre-encoded bodies
+                self.content_encoding_set = True
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that skips JPEG, video and multipart responses
+
+    Annotated images, annotated videos and multipart frame streams are
+    already entropy-coded, so gzip would only cost CPU on the event loop.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _SelectiveGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -2,9 +2,13 @@
 Image annotation utilities for drawing bounding boxes and labels
 """
 import io
+import cv2
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 from typing import List, Dict, Tuple, Optional
 
+from app.config import settings
+
 
 # Color palette for different classes (RGB format)
 COLORS = [
@@ -20,6 +24,12 @@ COLORS = [
     (255, 0, 128),    # Rose
 ]
 
+# Boxes covering less than this many pixels inside the image aren't drawn
+MIN_BOX_AREA = 4
+
+# COLORS as a float array indexed by mask-map value (index 0 = no mask)
+_MASK_PALETTE = np.array([(0, 0, 0)] + COLORS, dtype=np.float32)
+
 
 class ImageAnnotator:
     """
@@ -145,44 +155,131 @@ class ImageAnnotator:
         return COLORS[class_id % len(COLORS)]
 
     @staticmethod
-    def _image_to_bytes(image: Image.Image, format: str = "JPEG", quality: int = 95) -> bytes:
+    def _load_image(image_bytes: Optional[bytes], image: Optional[np.ndarray]) -> Image.Image:
+        """
+        Get a PIL Image to draw on
+
+        Args:
+            image_bytes: Encoded image (used if image is None)
+            image: Already-decoded image (BGR numpy array)
+
+        Returns:
+            PIL Image object
+        """
+        if image is not None:
+            return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        return Image.open(io.BytesIO(image_bytes))
+
+    @staticmethod
+    def _blend_masks(pixels: np.ndarray, mask_map: np.ndarray, alpha: float) -> None:
+        """
+        Blend palette colors into an image wherever a mask covers it, in place
+
+        Args:
+            pixels: RGB image array (H, W, 3), modified in place
+            mask_map: Palette index per pixel (H, W); 0 = no mask, k = COLORS[k - 1]
+            alpha: Mask opacity (0.0-1.0)
+        """
+        covered = mask_map > 0
+        if not covered.any():
+            return
+
+        colors = _MASK_PALETTE[mask_map[covered]]
+        blended = pixels[covered] * (1.0 - alpha) + colors * alpha
+        pixels[covered] = np.rint(blended).astype(np.uint8)
+
+    @staticmethod
+    def _image_to_bytes(image: Image.Image, format: str = "JPEG", quality: Optional[int] = None) -> bytes:
         """
         Convert PIL Image to bytes
 
         Args:
             image: PIL Image object
             format: Output format (JPEG, PNG, etc.)
-            quality: Quality for JPEG compression
+            quality: Quality for JPEG compression (settings.jpeg_quality if None)
 
         Returns:
             Image as bytes
         """
         output = io.BytesIO()
-        image.save(output, format=format, quality=quality)
+        image.save(output, format=format, quality=quality or settings.jpeg_quality)
         output.seek(0)
         return output.read()
 
+    @staticmethod
+    def _box_coords(detection: Dict) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Get (x1, y1, x2, y2) from a detection's bbox
+
+        Args:
+            detection: Detection dictionary, bbox as [x1, y1, x2, y2] (list or tuple) or dict
+
+        Returns:
+            Box corners, or None if the bbox is invalid
+        """
+        bbox = detection.get("bbox", [])
+        if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
+            return tuple(bbox)
+        if isinstance(bbox, dict):
+            return (bbox.get("x1", 0), bbox.get("y1", 0), bbox.get("x2", 0), bbox.get("y2", 0))
+        return None
+
+    @staticmethod
+    def _is_visible(box: Tuple[float, float, float, float], width: int, height: int) -> bool:
+        """
+        Check whether a box covers at least MIN_BOX_AREA pixels inside the image
+
+        Args:
+            box: Box corners (x1, y1, x2, y2)
+            width: Image width
+            height: Image height
+
+        Returns:
+            True if the box, clipped to the image, is large enough to draw
+        """
+        x1, y1, x2, y2 = box
+        clipped_width = min(x2, width) - max(x1, 0)
+        clipped_height = min(y2, height) - max(y1, 0)
+        return clipped_width > 0 and clipped_height > 0 and clipped_width * clipped_height >= MIN_BOX_AREA
+
     def draw_bounding_boxes(
         self,
-        image_bytes: bytes,
+        image_bytes: Optional[bytes],
         detections: List[Dict],
         line_width: Optional[int] = None,
-        font_size: Optional[int] = None
+        font_size: Optional[int] = None,
+        image: Optional[np.ndarray] = None
     ) -> bytes:
         """
         Draw bounding boxes and labels on an image
 
+        Boxes that fall (almost) entirely outside the image are skipped. If
+        none is left and image_bytes is given, image_bytes is returned as-is
+        instead of being re-encoded.
+
         Args:
-            image_bytes: Original image as bytes
+            image_bytes: Original image as bytes (not decoded if image is given)
             detections: List of detection dictionaries with bbox, class_name, confidence
             line_width: Width of bounding box lines (uses default if None)
             font_size: Size of label text (uses default if None)
+            image: Original image already decoded (BGR numpy array)
 
         Returns:
             Annotated image as bytes (JPEG)
         """
         # Load image
-        image = Image.open(io.BytesIO(image_bytes))
+        image = self._load_image(image_bytes, image)
+
+        # Keep detections with a valid bbox that is visible in the image
+        boxes = []
+        for detection in detections:
+            box = self._box_coords(detection)
+            if box is not None and self._is_visible(box, *image.size):
+                boxes.append((detection, box))
+
+        if not boxes and image_bytes is not None:
+            return image_bytes
+
         draw = ImageDraw.Draw(image)
 
         # Get settings
@@ -190,19 +287,7 @@ class ImageAnnotator:
         font = self._load_font(font_size)
 
         # Draw each detection
-        for detection in detections:
-            # Handle both list format [x1, y1, x2, y2] and dict format
-            bbox = detection.get("bbox", [])
-            if isinstance(bbox, list) and len(bbox) == 4:
-                x1, y1, x2, y2 = bbox
-            elif isinstance(bbox, dict):
-                x1 = bbox.get("x1", 0)
-                y1 = bbox.get("y1", 0)
-                x2 = bbox.get("x2", 0)
-                y2 = bbox.get("y2", 0)
-            else:
-                continue  # Skip invalid bbox
-
+        for detection, (x1, y1, x2, y2) in boxes:
             class_name = detection.get("class_name", "unknown")
             confidence = detection.get("confidence", 0.0)
             class_id = detection.get("class_id", 0)
@@ -225,31 +310,34 @@ class ImageAnnotator:
 
     def draw_segmentation_masks(
         self,
-        image_bytes: bytes,
+        image_bytes: Optional[bytes],
         segments: List[Dict],
         opacity: float = 0.5,
         line_width: Optional[int] = None,
-        font_size: Optional[int] = None
+        font_size: Optional[int] = None,
+        image: Optional[np.ndarray] = None
     ) -> bytes:
         """
         Draw segmentation masks as filled polygons with transparency
 
         Args:
-            image_bytes: Original image as bytes
+            image_bytes: Original image as bytes (ignored if image is given)
             segments: List of segmentation dictionaries with mask (polygon points), class_name, confidence
             opacity: Mask transparency (0.0 = fully transparent, 1.0 = fully opaque)
             line_width: Width of polygon outline (uses default if None)
             font_size: Size of label text (uses default if None)
+            image: Original image already decoded (BGR numpy array)
 
         Returns:
             Annotated image as bytes (JPEG)
         """
         # Load image
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+        image = self._load_image(image_bytes, image).convert("RGB")
 
-        # Create a transparent overlay for masks
-        overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
-        draw_overlay = ImageDraw.Draw(overlay)
+        # Rasterize masks into one palette-index map (0 = no mask) and
+        # blend them all in a single pass at the end
+        mask_map = Image.new("L", image.size, 0)
+        draw_mask = ImageDraw.Draw(mask_map)
 
         # Create draw context for outlines and labels
         draw = ImageDraw.Draw(image)
@@ -282,17 +370,15 @@ class ImageAnnotator:
             if len(polygon_points) < 6:  # Need at least 3 points (6 coordinates)
                 continue
 
-            # Draw filled polygon on overlay with transparency
-            alpha = int(255 * opacity)
-            fill_color = (*color, alpha)
-            draw_overlay.polygon(polygon_points, fill=fill_color, outline=None)
+            # Mark the polygon's pixels with its color's palette index
+            draw_mask.polygon(polygon_points, fill=COLORS.index(color) + 1, outline=None)
 
             # Draw polygon outline on main image
             draw.line(polygon_points + polygon_points[:2], fill=color, width=line_width)
 
             # Get bounding box for label placement
             bbox = segment.get("bbox", [])
-            if isinstance(bbox, list) and len(bbox) == 4:
+            if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
                 x1, y1, x2, y2 = bbox
             else:
                 # Calculate bbox from mask points if not provided
@@ -305,35 +391,35 @@ class ImageAnnotator:
             label = f"{class_name} {confidence:.2f}"
             self._draw_label(draw, label, (x1, y1), color, font)
 
-        # Composite overlay onto image
-        image = Image.alpha_composite(image, overlay)
-
-        # Convert back to RGB for JPEG
-        image = image.convert("RGB")
+        # Blend masks over the image (and its outlines and labels)
+        pixels = np.array(image)
+        self._blend_masks(pixels, np.asarray(mask_map), int(255 * opacity) / 255)
 
-        return self._image_to_bytes(image)
+        return self._image_to_bytes(Image.fromarray(pixels))
 
     def draw_faces(
         self,
-        image_bytes: bytes,
+        image_bytes: Optional[bytes],
         faces: List[Dict],
         line_width: Optional[int] = None,
-        font_size: Optional[int] = None
+        font_size: Optional[int] = None,
+        image: Optional[np.ndarray] = None
     ) -> bytes:
         """
         Draw bounding boxes around detected faces
 
         Args:
-            image_bytes: Original image as bytes
+            image_bytes: Original image as bytes (ignored if image is given)
             faces: List of face detection dictionaries
             line_width: Width of bounding box lines (uses default if None)
             font_size: Size of label text (uses default if None)
+            image: Original image already decoded (BGR numpy array)
 
         Returns:
             Annotated image as bytes (JPEG)
         """
         # Load image
-        image = Image.open(io.BytesIO(image_bytes))
+        image = self._load_image(image_bytes, image)
         draw = ImageDraw.Draw(image)
 
         # Get settings
@@ -347,7 +433,7 @@ class ImageAnnotator:
         for idx, face in enumerate(faces):
             # Handle both list format [x1, y1, x2, y2] and dict format
             bbox = face.get("bbox", [])
-            if isinstance(bbox, list) and len(bbox) == 4:
+            if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
                 x1, y1, x2, y2 = bbox
             elif isinstance(bbox, dict):
                 x1 = bbox.get("x1", 0)
@@ -380,34 +466,37 @@ def get_color_for_class(class_id: int) -> Tuple[int, int, int]:
 
 
 def draw_bounding_boxes(
-    image_bytes: bytes,
+    image_bytes: Optional[bytes],
     detections: List[Dict],
     line_width: int = 3,
-    font_size: int = 20
+    font_size: int = 20,
+    image: Optional[np.ndarray] = None
 ) -> bytes:
     """Draw bounding boxes on image (backward compatibility)"""
     annotator = ImageAnnotator(font_size=font_size, line_width=line_width)
-    return annotator.draw_bounding_boxes(image_bytes, detections)
+    return annotator.draw_bounding_boxes(image_bytes, detections, image=image)
 
 
 def draw_segmentation_masks(
-    image_bytes: bytes,
+    image_bytes: Optional[bytes],
     segments: List[Dict],
     opacity: float = 0.5,
     line_width: int = 2,
-    font_size: int = 20
+    font_size: int = 20,
+    image: Optional[np.ndarray] = None
 ) -> bytes:
     """Draw segmentation masks on image (backward compatibility)"""
     annotator = ImageAnnotator(font_size=font_size, line_width=line_width)
-    return annotator.draw_segmentation_masks(image_bytes, segments, opacity=opacity)
+    return annotator.draw_segmentation_masks(image_bytes, segments, opacity=opacity, image=image)
 
 
 def draw_faces(
-    image_bytes: bytes,
+    image_bytes: Optional[bytes],
     faces: List[Dict],
     line_width: int = 3,
-    font_size: int = 20
+    font_size: int = 20,
+    image: Optional[np.ndarray] = None
 ) -> bytes:
     """Draw face bounding boxes on image (backward compatibility)"""
     annotator = ImageAnnotator(font_size=font_size, line_width=line_width)
-    return annotator.draw_faces(image_bytes, faces)
+    return annotator.draw_faces(image_bytes, faces, image=image)
@@ -3,8 +3,10 @@ Image preprocessing utilities
 """
 from PIL import Image
 import io
+import threading
+import cv2
 import numpy as np
-from typing import Tuple
+from typing import List, Tuple
 
 
 class ImageProcessor:
@@ -73,6 +75,60 @@ class ImageProcessor:
 
         return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
+    @staticmethod
+    def decode_to_array(image_bytes: bytes) -> np.ndarray:
+        """
+        Decode image bytes straight to a BGR numpy array
+
+        Uses cv2.imdecode (libjpeg-turbo/libpng) and falls back to PIL for
+        formats OpenCV can't read. EXIF orientation is ignored, as with PIL.
+
+        Args:
+            image_bytes: Image data as bytes
+
+        Returns:
+            Decoded image (H, W, 3) in BGR order
+
+        Raises:
+            ValueError: If the bytes can't be decoded as an image
+        """
+        array = cv2.imdecode(
+            np.frombuffer(image_bytes, dtype=np.uint8),
+            cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+        )
+        if array is not None:
+            return array
+
+        try:
+            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        except Exception as e:
+            raise ValueError(f"Cannot decode image: {e}") from e
+        return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+
+    @staticmethod
+    def resize_array(array: np.ndarray, max_size: int = 1920) -> np.ndarray:
+        """
+        Resize a decoded image if larger than max_size while maintaining aspect ratio
+
+        Args:
+            array: Numpy array (H, W, C)
+            max_size: Maximum dimension size
+
+        Returns:
+            Resized array (the input if already small enough)
+        """
+        height, width = array.shape[:2]
+
+        if width <= max_size and height <= max_size:
+            return array
+
+        scale = max_size / max(width, height)
+        return cv2.resize(
+            array,
+            (int(width * scale), int(height * scale)),
+            interpolation=cv2.INTER_AREA
+        )
+
     @staticmethod
     def validate_image(image_bytes: bytes, max_size_mb: int = 10) -> Tuple[bool, str]:
         """
@@ -127,6 +183,106 @@ class ImageProcessor:
         return Image.fromarray(array)
 
 
+def cuda_resize_available() -> bool:
+    """Check whether OpenCV was built with CUDA and can see a GPU"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+class FrameBatchBuffer:
+    """
+    Reusable per-thread buffer for downscaling batches of video frames
+
+    Frames from one video share a shape, so each worker thread keeps a
+    single (N, H, W, C) array and resizes every batch into it instead of
+    allocating a new array per frame. Returned frames are views into that
+    buffer and are only valid until the same thread resizes the next batch.
+
+    With a CUDA-enabled OpenCV build the resize runs on the GPU, and only
+    the downscaled frame is copied back into the buffer.
+    """
+
+    def __init__(self, capacity: int = 16, use_cuda: bool = False):
+        """
+        Initialize buffer
+
+        Args:
+            capacity: Minimum number of frames to allocate room for
+            use_cuda: Resize on the GPU if OpenCV was built with CUDA
+        """
+        self.capacity = capacity
+        self.use_cuda = use_cuda and cuda_resize_available()
+        self._local = threading.local()
+
+    def _get_buffer(self, count: int, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """Return this thread's buffer, reallocating if it can't hold the batch"""
+        buffer = getattr(self._local, "buffer", None)
+        if (
+            buffer is None
+            or buffer.shape[1:] != shape
+            or buffer.dtype != dtype
+            or buffer.shape[0] < count
+        ):
+            buffer = np.empty((max(count, self.capacity), *shape), dtype=dtype)
+            self._local.buffer = buffer
+        return buffer
+
+    def resize_batch(self, frames: List[np.ndarray], max_size: int) -> List[np.ndarray]:
+        """
+        Downscale frames larger than max_size, keeping aspect ratio
+
+        Args:
+            frames: Decoded frames (numpy arrays, HxWxC)
+            max_size: Maximum dimension size
+
+        Returns:
+            List of frames (the inputs if already small enough, otherwise
+            views into this thread's buffer)
+        """
+        if not frames:
+            return []
+
+        if any(frame.shape != frames[0].shape for frame in frames):
+            # Mixed shapes can't share a buffer; resize one by one
+            return [self.resize_batch([frame], max_size)[0].copy() for frame in frames]
+
+        height, width = frames[0].shape[:2]
+        if width <= max_size and height <= max_size:
+            return list(frames)
+
+        scale = max_size / max(width, height)
+        new_size = (int(width * scale), int(height * scale))
+        out_shape = (new_size[1], new_size[0], *frames[0].shape[2:])
+
+        buffer = self._get_buffer(len(frames), out_shape, frames[0].dtype)
+        if self.use_cuda:
+            self._cuda_resize_into(frames, new_size, buffer)
+        else:
+            for i, frame in enumerate(frames):
+                cv2.resize(frame, new_size, dst=buffer[i], interpolation=cv2.INTER_AREA)
+
+        return [buffer[i] for i in range(len(frames))]
+
+    def _cuda_resize_into(
+        self,
+        frames: List[np.ndarray],
+        size: Tuple[int, int],
+        buffer: np.ndarray
+    ) -> None:
+        """Resize frames on the GPU, downloading each result into buffer"""
+        if not hasattr(self._local, "gpu_src"):
+            self._local.gpu_src = cv2.cuda_GpuMat()
+            self._local.gpu_dst = cv2.cuda_GpuMat()
+        gpu_src, gpu_dst = self._local.gpu_src, self._local.gpu_dst
+
+        for i, frame in enumerate(frames):
+            gpu_src.upload(frame)
+            cv2.cuda.resize(gpu_src, size, gpu_dst, interpolation=cv2.INTER_AREA)
+            gpu_dst.download(buffer[i])
+
+
 # Backward compatibility functions
 def bytes_to_image(image_bytes: bytes) -> Image.Image:
     """Convert bytes to PIL Image (backward compatibility)"""
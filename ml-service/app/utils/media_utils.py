@@ -6,19 +6,79 @@ from typing import Literal, Optional
 
 MediaType = Literal["image", "video"]
 
+# Number of leading bytes sniff_magic needs
+MAGIC_HEAD_SIZE = 32
 
-def detect_media_type(filename: Optional[str] = None, content_type: Optional[str] = None) -> MediaType:
+# ISO-BMFF (ftyp) major brands that are still images rather than video
+_IMAGE_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+# File signatures at offset 0
+_MAGIC_PREFIXES = (
+    (b"\xff\xd8\xff", "image"),          # JPEG
+    (b"\x89PNG\r\n\x1a\n", "image"),     # PNG
+    (b"GIF87a", "image"),
+    (b"GIF89a", "image"),
+    (b"BM", "image"),                    # BMP
+    (b"\x1aE\xdf\xa3", "video"),          # Matroska / WebM
+    (b"FLV\x01", "video"),
+)
+
+
+def sniff_magic(head: bytes) -> Optional[MediaType]:
+    """
+    Classify a file from the magic number in its first bytes
+
+    Args:
+        head: Leading bytes of the file (MAGIC_HEAD_SIZE is enough)
+
+    Returns:
+        "image" or "video", or None if the signature isn't recognized
+    """
+    for prefix, media_type in _MAGIC_PREFIXES:
+        if head.startswith(prefix):
+            return media_type
+
+    if head[:4] == b"RIFF":
+        if head[8:12] == b"WEBP":
+            return "image"
+        if head[8:12] == b"AVI ":
+            return "video"
+        return None
+
+    # MP4 / MOV / 3GP: size (4 bytes) then the ftyp box
+    if head[4:8] == b"ftyp":
+        return "image" if head[8:12] in _IMAGE_BRANDS else "video"
+
+    # Legacy QuickTime files without ftyp start with one of these atoms
+    if head[4:8] in (b"moov", b"mdat", b"wide", b"free", b"skip"):
+        return "video"
+
+    return None
+
+
+def detect_media_type(
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    head: Optional[bytes] = None
+) -> MediaType:
     """
-    Detect if file is image or video based on filename or content type
+    Detect if file is image or video based on its content, content type or filename
 
     Args:
         filename: Name of the file (optional)
         content_type: MIME content type (optional)
+        head: Leading bytes of the file (optional, checked first)
 
     Returns:
         "image" or "video"
     """
-    # Check content_type first (more reliable)
+    # The file's own signature can't be mislabeled by the client
+    if head:
+        media_type = sniff_magic(head)
+        if media_type:
+            return media_type
+
+    # Check content_type next (more reliable than the filename)
     if content_type:
         if content_type.startswith('image/'):
             return "image"
@@ -0,0 +1,155 @@
+"""
+MP4/MOV metadata probing without a decoder
+Reads the frame count straight from the container's sample tables
+"""
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Container boxes that hold the boxes we need
+_CONTAINER_BOXES = {b"trak", b"mdia", b"minf", b"stbl"}
+
+# Boxes an MP4 (ftyp) or legacy QuickTime file can start with
+_FIRST_BOXES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide"}
+
+# Upper bound on the moov box we are willing to load (sample tables of
+# very long videos); larger ones fall back to a decoder-based probe
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+
+def _iter_file_boxes(f: BinaryIO, file_size: int) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    Walk the top-level boxes of a file
+
+    Args:
+        f: File opened in binary mode
+        file_size: Size of the file in bytes
+
+    Yields:
+        Tuples of (box type, payload offset, payload size)
+    """
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:  # 64-bit size follows the type
+            if len(header) < 16:
+                return
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:  # Box extends to the end of the file
+            size = file_size - offset
+
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    Walk the child boxes in a buffer
+
+    Args:
+        data: Buffer holding the boxes
+        start: Offset of the first box
+        end: Offset where the boxes end (defaults to the end of data)
+
+    Yields:
+        Tuples of (box type, payload start, payload end)
+    """
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+
+        if size < header_size or offset + size > end:
+            return
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def _video_sample_count(moov: bytes) -> Optional[int]:
+    """
+    Sum the stts sample counts of the first video track in a moov payload
+
+    Args:
+        moov: Payload of the moov box
+
+    Returns:
+        Number of video samples (frames), or None if no video track has any
+    """
+    for box_type, start, end in _iter_boxes(moov):
+        if box_type != b"trak":
+            continue
+
+        handler = None
+        stts = None
+        pending = [(start, end)]
+        while pending:
+            child_start, child_end = pending.pop()
+            for child_type, payload_start, payload_end in _iter_boxes(moov, child_start, child_end):
+                if child_type in _CONTAINER_BOXES:
+                    pending.append((payload_start, payload_end))
+                elif child_type == b"hdlr" and payload_end - payload_start >= 12:
+                    # version/flags (4), pre_defined (4), handler_type (4)
+                    handler = moov[payload_start + 8:payload_start + 12]
+                elif child_type == b"stts" and payload_end - payload_start >= 8:
+                    stts = (payload_start, payload_end)
+
+        if handler != b"vide" or stts is None:
+            continue
+
+        payload_start, payload_end = stts
+        entry_count = struct.unpack_from(">I", moov, payload_start + 4)[0]
+        if payload_start + 8 + entry_count * 8 > payload_end:
+            return None
+        total = sum(
+            struct.unpack_from(">I", moov, payload_start + 8 + i * 8)[0]
+            for i in range(entry_count)
+        )
+        return total or None  # Fragmented MP4: samples live in moof boxes
+
+    return None
+
+
+def probe_frames(path: str) -> Optional[int]:
+    """
+    Read the video frame count of an MP4/MOV file from its sample tables
+
+    Only the box headers and the moov box are read; nothing is decoded.
+
+    Args:
+        path: Path to the video file
+
+    Returns:
+        Number of frames in the first video track, or None if the file isn't
+        an MP4/MOV with a sample table (callers should fall back to a decoder)
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            file_size = f.tell()
+
+            for index, (box_type, offset, size) in enumerate(_iter_file_boxes(f, file_size)):
+                if index == 0 and box_type not in _FIRST_BOXES:
+                    return None  # Not an MP4/MOV file
+                if box_type != b"moov":
+                    continue
+                if size > MAX_MOOV_SIZE or offset + size > file_size:
+                    return None
+                f.seek(offset)
+                return _video_sample_count(f.read(size))
+    except (OSError, struct.error):
+        return None
+
+    return None
@@ -0,0 +1,170 @@
+"""
+Upload reading utilities
+"""
+import asyncio
+import os
+import tempfile
+from typing import Optional
+from fastapi import UploadFile, HTTPException
+
+# Read uploads in 1MB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _too_large(max_bytes: int, label: str) -> HTTPException:
+    """Build the 413 error for an upload over its size limit"""
+    return HTTPException(
+        status_code=413,
+        detail=f"{label} too large (max: {max_bytes // (1024 * 1024)}MB)"
+    )
+
+
+async def read_capped(upload: UploadFile, max_bytes: int, label: str = "File") -> bytes:
+    """
+    Read an uploaded file, rejecting it as soon as it exceeds a size limit
+
+    When the upload's size is known (Starlette records it while parsing the
+    form), an oversized file is refused without reading it, and the rest
+    is read in one call into a single exactly-sized buffer, with no chunk
+    list to join (which would briefly hold the upload twice). Otherwise it
+    is read in chunks, so an oversized upload is refused after at most
+    max_bytes + one chunk, instead of being loaded into memory in full.
+
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum allowed size in bytes
+        label: Name used in the error message (e.g. "Video")
+
+    Returns:
+        File bytes
+
+    Raises:
+        HTTPException: 413 if the file is larger than max_bytes
+    """
+    chunks = []
+    size = 0
+
+    known_size = getattr(upload, "size", None)
+    if isinstance(known_size, int) and known_size > 0:
+        if known_size > max_bytes:
+            raise _too_large(max_bytes, label)
+        data = await upload.read(known_size)
+        chunks.append(data)
+        size = len(data)
+
+    # Chunked reads (or a check that the sized read got everything)
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(max_bytes, label)
+        chunks.append(chunk)
+
+    # join() hands back a lone chunk as-is, without copying
+    return b"".join(chunks)
+
+
+async def stream_upload_to_tempfile(
+    upload: UploadFile,
+    max_bytes: int,
+    label: str = "File",
+    suffix: str = ".mp4",
+    dir: Optional[str] = None
+) -> str:
+    """
+    Copy an uploaded file to a temporary file chunk by chunk
+
+    For consumers that read from a path (OpenCV), this avoids holding the
+    whole upload in memory as bytes and writing it out again afterwards.
+    The caller owns the returned file and must remove it.
+
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum allowed size in bytes
+        label: Name used in the error message (e.g. "Video")
+        suffix: Temporary file suffix
+        dir: Directory for the file (e.g. /dev/shm for tmpfs; None = system temp dir)
+
+    Returns:
+        Path to the temporary file
+
+    Raises:
+        HTTPException: 413 if the file is larger than max_bytes (no file is left behind)
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=dir or None)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            size = 0
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes, label)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return path
+
+
+def write_temp_file(data: bytes, suffix: str = ".mp4", dir: Optional[str] = None) -> str:
+    """
+    Write a buffer to a new temporary file
+
+    The buffer is written straight from memory (a single write syscall
+    unless the kernel accepts less, e.g. over 2GB on Linux), with no
+    Python-level file object or buffering in between.
+    The caller owns the returned file and must remove it.
+
+    Args:
+        data: Bytes to write
+        suffix: Temporary file suffix
+        dir: Directory for the file (e.g. /dev/shm for tmpfs; None = system temp dir)
+
+    Returns:
+        Path to the temporary file
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=dir or None)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.remove(path)
+        raise
+
+    os.close(fd)
+    return path
+
+
+def prefetch_file(path: str) -> None:
+    """
+    Ask the kernel to start reading a whole file into the page cache
+
+    Decoders read the file sequentially in small blocks; with the read-ahead
+    already queued, disk I/O overlaps decoding instead of stalling each read.
+    Best effort: no-op where posix_fadvise is unavailable (non-Linux) or
+    the file can't be opened (the decoder reports that itself).
+
+    Args:
+        path: Path to the file about to be read
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
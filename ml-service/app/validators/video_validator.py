@@ -3,7 +3,9 @@ Video validation for ML service
 """
 from typing import Optional
 import logging
+import os
 from app.models.validation import ValidationResult
+from app.utils.media_utils import MAGIC_HEAD_SIZE, sniff_magic
 
 logger = logging.getLogger(__name__)
 
@@ -37,16 +39,89 @@ class VideoValidator:
         Returns:
             ValidationResult indicating success or failure
         """
-        # Check size
-        size_bytes = len(video_bytes)
-        size_mb = size_bytes / (1024 * 1024)
+        for failure in (self._check_size(len(video_bytes)), self._check_format(filename)):
+            if failure is not None:
+                return failure
 
+        logger.info(f"Video validation passed: {len(video_bytes) / (1024 * 1024):.1f}MB")
+        return ValidationResult.success()
+
+    async def validate_header(self, head: bytes, filename: Optional[str] = None) -> ValidationResult:
+        """
+        Validate a video from its leading bytes only
+
+        Checks the filename's extension and that the data starts with a
+        known video container signature (MP4/MOV ftyp or atom, Matroska/WebM
+        EBML, AVI RIFF, FLV). Nothing is decoded; the decoder does the full
+        check once when it opens the video. Upload size is enforced while
+        reading (read_capped / stream_upload_to_tempfile).
+
+        Args:
+            head: Leading bytes of the video (MAGIC_HEAD_SIZE is enough)
+            filename: Optional filename for format detection
+
+        Returns:
+            ValidationResult indicating success or failure
+        """
+        for failure in (self._check_format(filename), self._check_container(head)):
+            if failure is not None:
+                return failure
+
+        return ValidationResult.success()
+
+    async def validate_file(self, path: str, filename: Optional[str] = None) -> ValidationResult:
+        """
+        Validate a video already written to disk
+
+        Only the file's size and first bytes are inspected.
+
+        Args:
+            path: Path to the video file
+            filename: Optional original filename for format detection
+
+        Returns:
+            ValidationResult indicating success or failure
+        """
+        size_bytes = os.path.getsize(path)
+        for failure in (self._check_size(size_bytes), self._check_format(filename)):
+            if failure is not None:
+                return failure
+
+        with open(path, "rb") as f:
+            head = f.read(MAGIC_HEAD_SIZE)
+        failure = self._check_container(head)
+        if failure is not None:
+            return failure
+
+        logger.info(f"Video validation passed: {size_bytes / (1024 * 1024):.1f}MB")
+        return ValidationResult.success()
+
+    def _check_size(self, size_bytes: int) -> Optional[ValidationResult]:
+        """
+        Check a video's size
+
+        Args:
+            size_bytes: Video size in bytes
+
+        Returns:
+            Failed ValidationResult, or None if the size is within the limit
+        """
         if size_bytes > self.max_file_size_bytes:
             return ValidationResult.failure(
-                f"Video too large: {size_mb:.1f}MB (max: {self.max_file_size_mb}MB)"
+                f"Video too large: {size_bytes / (1024 * 1024):.1f}MB (max: {self.max_file_size_mb}MB)"
             )
+        return None
+
+    def _check_format(self, filename: Optional[str]) -> Optional[ValidationResult]:
+        """
+        Check a video's format from its filename extension
 
-        # Check format if filename provided
+        Args:
+            filename: Optional filename (no check without one)
+
+        Returns:
+            Failed ValidationResult, or None if the format is supported
+        """
         if filename:
             extension = filename.lower().split('.')[-1]
             if extension not in self.supported_formats:
@@ -54,6 +129,19 @@ class VideoValidator:
                     f"Unsupported video format: .{extension} "
                     f"(supported: {', '.join(sorted(self.supported_formats))})"
                 )
+        return None
 
-        logger.info(f"Video validation passed: {size_mb:.1f}MB")
-        return ValidationResult.success()
+    @staticmethod
+    def _check_container(head: bytes) -> Optional[ValidationResult]:
+        """
+        Check that data starts with a known video container signature
+
+        Args:
+            head: Leading bytes of the video
+
+        Returns:
+            Failed ValidationResult, or None if the container is recognized
+        """
+        if sniff_magic(bytes(head[:MAGIC_HEAD_SIZE])) != "video":
+            return ValidationResult.failure("File content is not a recognized video container")
+        return None
@@ -2,6 +2,7 @@
 ML Service Runner
 Start the ML service with uvicorn
 """
+import sys
 import uvicorn
 from app.config import settings
 
@@ -11,6 +12,9 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.auto_reload,  # Explicit control over auto-reload (default: False)
-        log_level="info",
-        access_log=True
+        log_level=settings.log_level.lower(),
+        access_log=True,
+        # C event loop and HTTP parser (from uvicorn[standard]); uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
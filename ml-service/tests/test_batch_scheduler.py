@@ -0,0 +1,113 @@
+"""
+Tests for the cross-request BatchScheduler
+"""
+import asyncio
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+
+from app.services.batch_scheduler import BatchScheduler
+
+
+def make_infer_batch():
+    """Create a batched inference mock that echoes each image's marker value"""
+    async def infer_batch(images, confidence, classes):
+        return [
+            {"status": "success", "marker": int(image[0, 0, 0]), "confidence": confidence, "classes": classes}
+            for image in images
+        ]
+    return AsyncMock(side_effect=infer_batch)
+
+
+def image(marker: int) -> np.ndarray:
+    """Create a tiny image tagged with a marker value"""
+    return np.full((2, 2, 3), marker, dtype=np.uint8)
+
+
+class TestBatchScheduler:
+    """Test BatchScheduler class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_batched(self):
+        """Test that concurrent requests share one inference call and get their own results"""
+        infer_batch = make_infer_batch()
+        scheduler = BatchScheduler(infer_batch, max_batch=8, max_wait_ms=20)
+        scheduler.start()
+
+        try:
+            results = await asyncio.gather(*[
+                scheduler.submit(image(i), confidence=0.5) for i in range(5)
+            ])
+        finally:
+            await scheduler.stop()
+
+        assert [r["marker"] for r in results] == [0, 1, 2, 3, 4]
+        infer_batch.assert_awaited_once()
+        assert len(infer_batch.call_args.kwargs["images"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_max_batch(self):
+        """Test that batches are capped at max_batch"""
+        infer_batch = make_infer_batch()
+        scheduler = BatchScheduler(infer_batch, max_batch=2, max_wait_ms=20)
+        scheduler.start()
+
+        try:
+            results = await asyncio.gather(*[
+                scheduler.submit(image(i), confidence=0.5) for i in range(5)
+            ])
+        finally:
+            await scheduler.stop()
+
+        assert [r["marker"] for r in results] == [0, 1, 2, 3, 4]
+        assert [len(c.kwargs["images"]) for c in infer_batch.call_args_list] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_grouped_by_parameters(self):
+        """Test that requests with different confidence/classes run in separate calls"""
+        infer_batch = make_infer_batch()
+        scheduler = BatchScheduler(infer_batch, max_batch=8, max_wait_ms=20)
+        scheduler.start()
+
+        try:
+            results = await asyncio.gather(
+                scheduler.submit(image(0), confidence=0.5),
+                scheduler.submit(image(1), confidence=0.5, classes=["car"]),
+                scheduler.submit(image(2), confidence=0.5),
+            )
+        finally:
+            await scheduler.stop()
+
+        assert [r["marker"] for r in results] == [0, 1, 2]
+        assert results[1]["classes"] == ["car"]
+        assert results[0]["classes"] is None
+        assert infer_batch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_inference_error_propagates(self):
+        """Test that a failed batch raises in every waiting request"""
+        scheduler = BatchScheduler(AsyncMock(side_effect=RuntimeError("GPU error")), max_wait_ms=20)
+        scheduler.start()
+
+        try:
+            results = await asyncio.gather(
+                scheduler.submit(image(0), confidence=0.5),
+                scheduler.submit(image(1), confidence=0.5),
+                return_exceptions=True
+            )
+        finally:
+            await scheduler.stop()
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_queued_requests(self):
+        """Test that requests queued when the scheduler stops are failed, not left hanging"""
+        scheduler = BatchScheduler(make_infer_batch())
+
+        pending = asyncio.ensure_future(scheduler.submit(image(0), confidence=0.5))
+        await asyncio.sleep(0)
+        await scheduler.stop()
+
+        with pytest.raises(RuntimeError):
+            await pending
@@ -0,0 +1,119 @@
+"""
+Tests for in-memory result caching utilities
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.cache_utils import InFlightRequests, TTLCache, content_hash
+
+
+class TestContentHash:
+    """Test content_hash function"""
+
+    def test_same_bytes_same_hash(self):
+        """Test that the hash depends only on the content"""
+        assert content_hash(b"video") == content_hash(b"video")
+        assert content_hash(b"video") != content_hash(b"video2")
+        assert len(content_hash(b"video")) == 32
+
+
+class TestTTLCache:
+    """Test TTLCache class"""
+
+    def test_get_missing(self):
+        """Test that a missing key returns None"""
+        assert TTLCache().get("missing") is None
+
+    def test_set_and_get(self):
+        """Test storing and retrieving an entry"""
+        cache = TTLCache()
+        value = {"count": 1}
+        cache.set("key", value)
+        assert cache.get("key") is value
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        """Test that entries older than ttl are dropped"""
+        cache = TTLCache(ttl=10)
+        with patch("app.utils.cache_utils.time.monotonic", return_value=100.0):
+            cache.set("key", 1)
+        with patch("app.utils.cache_utils.time.monotonic", return_value=109.0):
+            assert cache.get("key") == 1
+        with patch("app.utils.cache_utils.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+
+class TestInFlightRequests:
+    """Test InFlightRequests class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_same_key_share_one_call(self):
+        """Test that concurrent callers with one key run the work once"""
+        in_flight = InFlightRequests()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return {"value": value}
+
+        results = await asyncio.gather(
+            in_flight.run("a", lambda: work(1)),
+            in_flight.run("a", lambda: work(2)),
+            in_flight.run("b", lambda: work(3)),
+        )
+
+        assert calls == [1, 3]
+        assert results[0] is results[1]
+        assert results[2] == {"value": 3}
+        assert len(in_flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_and_key_is_released(self):
+        """Test that a failure reaches every waiter and the next call retries"""
+        in_flight = InFlightRequests()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            in_flight.run("a", fail), in_flight.run("a", fail), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def succeed():
+            return "ok"
+
+        assert await in_flight.run("a", succeed) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one waiter leaves the shared work running"""
+        in_flight = InFlightRequests()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(in_flight.run("a", work))
+        second = asyncio.ensure_future(in_flight.run("a", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
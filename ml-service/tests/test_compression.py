@@ -0,0 +1,49 @@
+"""
+Tests for the selective gzip middleware
+"""
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import SelectiveGZipMiddleware
+
+
+def make_client() -> TestClient:
+    """App with one JSON, one JPEG and one multipart route behind the middleware"""
+    app = FastAPI()
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=100, compresslevel=1)
+
+    @app.get("/json")
+    async def json_route():
+        return {"detections": [{"class_name": "person"}] * 50}
+
+    @app.get("/jpeg")
+    async def jpeg_route():
+        return Response(b"\xff\xd8" + b"x" * 1000, media_type="image/jpeg")
+
+    @app.get("/multipart")
+    async def multipart_route():
+        parts = iter([b"--b\r\n", b"x" * 1000, b"--b--\r\n"])
+        return StreamingResponse(parts, media_type="multipart/mixed; boundary=b")
+
+    return TestClient(app)
+
+
+class TestSelectiveGZipMiddleware:
+    """Test which responses get compressed"""
+
+    def test_json_compressed(self):
+        """Test that JSON responses are still gzipped"""
+        response = make_client().get("/json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["detections"]) == 50
+
+    def test_jpeg_and_multipart_passed_through(self):
+        """Test that already-compressed content types are sent as-is"""
+        client = make_client()
+        for path in ("/jpeg", "/multipart"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+            assert "content-encoding" not in response.headers
+            assert len(response.content) > 1000
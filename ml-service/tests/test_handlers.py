@@ -1,14 +1,19 @@
 """
-Tests for DetectionHandler and AnnotationHandler
+Tests for DetectionHandler, AnnotationHandler and VideoHandler
 """
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import Response
 from io import BytesIO
+import numpy as np
 
 from app.handlers.detection_handler import DetectionHandler
 from app.handlers.annotation_handler import AnnotationHandler
+from app.handlers.video_handler import VideoHandler
+from app.services.video_frame_service import FrameData, VideoInfo
 
 
 # Helper function to create mock UploadFile
@@ -17,7 +22,9 @@ def create_mock_upload_file(content: bytes, filename: str = "test.jpg"):
     mock_file = Mock(spec=UploadFile)
     mock_file.filename = filename
     mock_file.content_type = "image/jpeg"
-    mock_file.read = AsyncMock(return_value=content)
+    stream = BytesIO(content)
+    mock_file.read = AsyncMock(side_effect=lambda size=-1: stream.read(size))
+    mock_file.seek = AsyncMock(side_effect=stream.seek)
     return mock_file
 
 
@@ -75,6 +82,33 @@ class TestDetectionHandler:
         assert len(result["detections"]) == 2
         mock_yolo_service.detect.assert_called_once()
 
+    def test_handlers_share_validators(self, mock_yolo_service):
+        """Test that handlers reuse one validator instance unless given their own"""
+        detection = DetectionHandler(yolo_service=mock_yolo_service)
+        video = VideoHandler(yolo_service=mock_yolo_service)
+
+        assert detection.image_validator is video.image_validator
+        assert detection.video_validator is video.video_validator
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesced(self, mock_yolo_service, sample_image_bytes):
+        """Test that identical concurrent uploads share one inference"""
+        async def slow_detect(**kwargs):
+            await asyncio.sleep(0.01)
+            return {"status": "success", "count": 0, "detections": []}
+
+        mock_yolo_service.detect = AsyncMock(side_effect=slow_detect)
+        handler = DetectionHandler(yolo_service=mock_yolo_service)
+
+        results = await asyncio.gather(
+            handler.process(create_mock_upload_file(sample_image_bytes), confidence=0.5, classes="car"),
+            handler.process(create_mock_upload_file(sample_image_bytes), confidence=0.5, classes="car"),
+            handler.process(create_mock_upload_file(sample_image_bytes), confidence=0.6, classes="car"),
+        )
+
+        assert all(result["status"] == "success" for result in results)
+        assert mock_yolo_service.detect.await_count == 2
+
     @pytest.mark.asyncio
     async def test_process_detection_invalid_confidence(self, mock_yolo_service, sample_image_bytes):
         """Test detection with invalid confidence value"""
@@ -112,6 +146,33 @@ class TestDetectionHandler:
         assert exc_info.value.status_code == 400
         assert "Model loading failed" in str(exc_info.value.detail)
 
+    @pytest.mark.asyncio
+    async def test_process_detection_oversized_image(self, mock_yolo_service):
+        """Test that an image over the size limit is rejected with 413"""
+        handler = DetectionHandler(yolo_service=mock_yolo_service)
+        mock_file = create_mock_upload_file(b"x" * (11 * 1024 * 1024))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await handler.process(image=mock_file, confidence=0.5)
+
+        assert exc_info.value.status_code == 413
+        mock_yolo_service.detect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_read_error_logged_without_traceback(self, mock_yolo_service, sample_image_bytes, caplog):
+        """Test that a client-side read error is a 400 logged as a one-line warning"""
+        handler = DetectionHandler(yolo_service=mock_yolo_service)
+        mock_file = create_mock_upload_file(sample_image_bytes)
+        mock_file.read = AsyncMock(side_effect=ValueError("truncated multipart body"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await handler.process(image=mock_file, confidence=0.5)
+
+        assert exc_info.value.status_code == 400
+        records = [r for r in caplog.records if "truncated" in r.getMessage()]
+        assert records
+        assert all(r.levelname == "WARNING" and r.exc_info is None for r in records)
+
     @pytest.mark.asyncio
     async def test_process_detection_with_classes(self, mock_yolo_service, sample_image_bytes):
         """Test detection with class filtering"""
@@ -126,7 +187,7 @@ class TestDetectionHandler:
 
         # Verify classes were parsed and passed to service
         call_args = mock_yolo_service.detect.call_args
-        assert call_args[1]["classes"] == ["person", "car", "dog"]
+        assert call_args[1]["classes"] == ("person", "car", "dog")
 
     @pytest.mark.asyncio
     async def test_process_segmentation_success(self, mock_yolo_service, sample_image_bytes):
@@ -161,6 +222,36 @@ class TestDetectionHandler:
         assert len(result["faces"]) == 1
         mock_yolo_service.detect_faces.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_process_with_schedulers(self, mock_yolo_service, sample_image_bytes):
+        """Test that detect/segment go through the batch schedulers when given"""
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_yolo_service.decode_image = Mock(return_value=frame)
+        detect_scheduler = Mock(submit=AsyncMock(return_value={"status": "success", "count": 0}))
+        segment_scheduler = Mock(submit=AsyncMock(return_value={"status": "success", "count": 0}))
+        handler = DetectionHandler(mock_yolo_service, detect_scheduler, segment_scheduler)
+
+        await handler.process(create_mock_upload_file(sample_image_bytes), confidence=0.4, classes="car")
+        await handler.process_segmentation(create_mock_upload_file(sample_image_bytes), confidence=0.6)
+
+        detect_scheduler.submit.assert_awaited_once_with(frame, confidence=0.4, classes=("car",))
+        segment_scheduler.submit.assert_awaited_once_with(frame, confidence=0.6, classes=None)
+        mock_yolo_service.detect.assert_not_called()
+        mock_yolo_service.segment.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_process_with_scheduler_undecodable(self, mock_yolo_service, sample_image_bytes):
+        """Test that an undecodable upload is rejected before reaching the scheduler"""
+        mock_yolo_service.decode_image = Mock(side_effect=ValueError("Cannot decode image"))
+        detect_scheduler = Mock(submit=AsyncMock())
+        handler = DetectionHandler(mock_yolo_service, detect_scheduler)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await handler.process(create_mock_upload_file(sample_image_bytes), confidence=0.5)
+
+        assert exc_info.value.status_code == 400
+        detect_scheduler.submit.assert_not_called()
+
 
 class TestAnnotationHandler:
     """Test AnnotationHandler class"""
@@ -193,6 +284,7 @@ class TestAnnotationHandler:
                 {"confidence": 0.98, "bbox": [20, 30, 60, 80]}
             ]
         })
+        service.decode_image = Mock(return_value=np.zeros((100, 100, 3), dtype=np.uint8))
         return service
 
     @pytest.mark.asyncio
@@ -227,6 +319,35 @@ class TestAnnotationHandler:
             assert result.body == b'annotated_image_bytes'
             mock_draw.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_process_annotated_detection_decodes_once(self, mock_yolo_service, sample_image_bytes):
+        """Test that the upload is decoded once and the same frame is used for inference and drawing"""
+        handler = AnnotationHandler(yolo_service=mock_yolo_service)
+        mock_file = create_mock_upload_file(sample_image_bytes)
+        frame = mock_yolo_service.decode_image.return_value
+
+        with patch('app.handlers.annotation_handler.draw_bounding_boxes') as mock_draw:
+            mock_draw.return_value = b'annotated_image_bytes'
+
+            await handler.process_annotated_detection(image=mock_file, confidence=0.5)
+
+        mock_yolo_service.decode_image.assert_called_once_with(sample_image_bytes)
+        assert mock_yolo_service.detect.call_args.kwargs["image"] is frame
+        assert mock_draw.call_args.kwargs["image"] is frame
+
+    @pytest.mark.asyncio
+    async def test_process_annotated_detection_undecodable(self, mock_yolo_service, sample_image_bytes):
+        """Test that an upload that can't be decoded is rejected with 400"""
+        mock_yolo_service.decode_image = Mock(side_effect=ValueError("Cannot decode image"))
+        handler = AnnotationHandler(yolo_service=mock_yolo_service)
+        mock_file = create_mock_upload_file(sample_image_bytes)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await handler.process_annotated_detection(image=mock_file, confidence=0.5)
+
+        assert exc_info.value.status_code == 400
+        mock_yolo_service.detect.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_process_annotated_detection_no_detections(self, mock_yolo_service, sample_image_bytes):
         """Test annotated detection with no detections returns original image"""
@@ -396,3 +517,276 @@ class TestAnnotationHandler:
 
         assert exc_info.value.status_code == 400
         assert "Detection failed" in str(exc_info.value.detail)
+
+
+class TestVideoHandler:
+    """Test VideoHandler class"""
+
+    @pytest.fixture
+    def frames(self):
+        """Create decoded frames as returned by the frame service"""
+        return [
+            FrameData(
+                frame_bytes=b"jpeg_%d" % i,
+                frame_index=i * 30,
+                timestamp=float(i),
+                frame_base64="YmFzZTY0",
+                image=np.zeros((4, 4, 3), dtype=np.uint8)
+            )
+            for i in range(3)
+        ]
+
+    @pytest.fixture
+    def mock_frame_service(self, frames):
+        """Create a mock video frame service"""
+        def extract_frames_by_interval(on_frame=None, **kwargs):
+            for frame_data in frames:
+                if on_frame is not None:
+                    on_frame(frame_data)
+            return frames, VideoInfo(total_frames=90, fps=30.0, duration=3.0, width=4, height=4)
+
+        frame_service = MagicMock()
+        frame_service.extract_frames_by_interval.side_effect = extract_frames_by_interval
+        return frame_service
+
+    @pytest.fixture
+    def spool_video(self, tmp_path):
+        """Stand-in for read_and_validate_video_file that writes a fresh temp file per call"""
+        paths = []
+
+        async def spool(video):
+            path = tmp_path / f"upload_{len(paths)}.mp4"
+            path.write_bytes(b"video")
+            paths.append(path)
+            return str(path)
+
+        spool.paths = paths
+        return spool
+
+    @pytest.fixture
+    def mock_yolo_service(self):
+        """Create a mock YOLO service with batched inference"""
+        service = AsyncMock()
+        service.detect_batch = AsyncMock(return_value=[
+            {"status": "success", "count": n, "image_shape": (4, 4),
+             "detections": [{"class_name": "car", "confidence": 0.9, "bbox": [0, 0, 1, 1]}] * n}
+            for n in (1, 0, 2)
+        ])
+        service.segment_batch = AsyncMock(return_value=[
+            {"status": "success", "count": 1, "image_shape": (4, 4),
+             "segments": [{"class_name": "car", "confidence": 0.9, "mask": [[0, 0]]}]}
+            for _ in range(3)
+        ])
+        return service
+
+    @pytest.mark.asyncio
+    async def test_single_frame_detection_uses_decoded_frame(self, mock_yolo_service, mock_frame_service, frames):
+        """Test that the decoded frame, not its JPEG, is sent to the model"""
+        mock_frame_service.extract_single_frame.return_value = frames[1]
+        mock_frame_service.get_video_info.return_value = VideoInfo(
+            total_frames=90, fps=30.0, duration=3.0, width=4, height=4
+        )
+        mock_yolo_service.detect_numpy = AsyncMock(return_value={
+            "status": "success", "count": 0, "detections": [], "image_shape": (4, 4)
+        })
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_media = AsyncMock(return_value=b"video")
+
+        result = await handler.process_single_frame_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5
+        )
+
+        assert mock_yolo_service.detect_numpy.call_args.kwargs["image"] is frames[1].image
+        mock_yolo_service.detect.assert_not_called()
+        assert result["frame_index"] == 30
+        assert result["total_frames"] == 90
+
+    @pytest.mark.asyncio
+    async def test_single_frame_detection_cached(self, mock_yolo_service, mock_frame_service, frames):
+        """Test that a repeated request with the same video and parameters is served from cache"""
+        mock_frame_service.extract_single_frame.return_value = frames[1]
+        mock_frame_service.get_video_info.return_value = VideoInfo(
+            total_frames=90, fps=30.0, duration=3.0, width=4, height=4
+        )
+        mock_yolo_service.detect_numpy = AsyncMock(return_value={
+            "status": "success", "count": 0, "detections": [], "image_shape": (4, 4)
+        })
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_media = AsyncMock(return_value=b"video")
+
+        first = await handler.process_single_frame_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"), confidence=0.5
+        )
+        second = await handler.process_single_frame_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"), confidence=0.5
+        )
+        await handler.process_single_frame_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"), confidence=0.7
+        )
+
+        assert second is first
+        assert mock_yolo_service.detect_numpy.call_count == 2
+        assert mock_frame_service.extract_single_frame.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_detection_batched(self, mock_yolo_service, mock_frame_service, frames, spool_video):
+        """Test that all extracted frames go through one batched detection call"""
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+
+        result = await handler.process_multiple_frames_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5
+        )
+
+        mock_yolo_service.detect_batch.assert_awaited_once()
+        images = mock_yolo_service.detect_batch.call_args.kwargs["images"]
+        assert all(img is frame.image for img, frame in zip(images, frames))
+        mock_yolo_service.detect.assert_not_called()
+
+        assert result["total_frames_processed"] == 3
+        assert result["total_detections"] == 3
+        assert [f["count"] for f in result["frames"]] == [1, 0, 2]
+        assert [f["frame_index"] for f in result["frames"]] == [0, 30, 60]
+
+        # The decoder got the spooled file, which is gone afterwards
+        (path,) = spool_video.paths
+        assert mock_frame_service.extract_frames_by_interval.call_args.kwargs["video_path"] == str(path)
+        assert not path.exists()
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_segmentation_batched(self, mock_yolo_service, mock_frame_service, spool_video):
+        """Test that all extracted frames go through one batched segmentation call"""
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+
+        result = await handler.process_multiple_frames_segmentation(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5
+        )
+
+        mock_yolo_service.segment_batch.assert_awaited_once()
+        mock_yolo_service.segment.assert_not_called()
+        assert result["total_segments"] == 3
+        assert len(result["frames"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_detection_in_batches(self, mock_yolo_service, mock_frame_service, spool_video):
+        """Test that frames are split into batches of video_batch_size"""
+        mock_yolo_service.detect_batch = AsyncMock(
+            side_effect=lambda images, **kwargs: [
+                {"status": "success", "count": 1, "detections": [], "image_shape": (4, 4)}
+                for _ in images
+            ]
+        )
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+
+        with patch('app.handlers.video_handler.settings.video_batch_size', 2):
+            result = await handler.process_multiple_frames_detection(
+                video=create_mock_upload_file(b"video", "test.mp4"),
+                confidence=0.5
+            )
+
+        batch_sizes = [len(c.kwargs["images"]) for c in mock_yolo_service.detect_batch.call_args_list]
+        assert batch_sizes == [2, 1]
+        assert [f["frame_index"] for f in result["frames"]] == [0, 30, 60]
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_decoded_once_per_video(self, mock_yolo_service, mock_frame_service, frames, spool_video):
+        """Test that segmentation after detection on the same video reuses the decoded frames"""
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+        mock_frame_service.encode_bytes_to_base64.return_value = "ZnJhbWU="
+        for frame_data in frames:
+            frame_data.frame_base64 = None
+
+        await handler.process_multiple_frames_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5,
+            include_base64=False
+        )
+        result = await handler.process_multiple_frames_segmentation(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5
+        )
+
+        mock_frame_service.extract_frames_by_interval.assert_called_once()
+        images = mock_yolo_service.segment_batch.call_args.kwargs["images"]
+        assert all(img is frame.image for img, frame in zip(images, frames))
+        assert [f["frame_base64"] for f in result["frames"]] == ["ZnJhbWU="] * 3
+
+        # Different extraction settings decode again
+        await handler.process_multiple_frames_detection(
+            video=create_mock_upload_file(b"video", "test.mp4"),
+            confidence=0.5,
+            max_frames=2
+        )
+        assert mock_frame_service.extract_frames_by_interval.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_decode_error(self, mock_yolo_service, mock_frame_service, spool_video):
+        """Test that a decode failure propagates to the caller"""
+        mock_frame_service.extract_frames_by_interval.side_effect = ValueError("Failed to open video file")
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+
+        with pytest.raises(ValueError, match="Failed to open video file"):
+            await handler.process_multiple_frames_detection(
+                video=create_mock_upload_file(b"video", "test.mp4"),
+                confidence=0.5
+            )
+
+        assert not any(path.exists() for path in spool_video.paths)
+
+    @pytest.mark.asyncio
+    async def test_multiple_frames_detection_stream(self, mock_yolo_service, mock_frame_service, spool_video):
+        """Test that frames are yielded batch by batch, then a summary, and the upload is removed"""
+        mock_yolo_service.detect_batch = AsyncMock(
+            side_effect=lambda images, **kwargs: [
+                {"status": "success", "count": 1, "detections": [], "image_shape": (4, 4)}
+                for _ in images
+            ]
+        )
+        handler = VideoHandler(yolo_service=mock_yolo_service, frame_service=mock_frame_service)
+        handler.read_and_validate_video_file = spool_video
+
+        with patch('app.handlers.video_handler.settings.video_batch_size', 2):
+            results = await handler.process_multiple_frames_detection_stream(
+                video=create_mock_upload_file(b"video", "test.mp4"),
+                confidence=0.5
+            )
+            items = [item async for item in results]
+
+        assert [item["frame_index"] for item in items[:-1]] == [0, 30, 60]
+        assert items[0]["frame_jpeg"] == b"jpeg_0"
+        assert items[-1]["total_frames_processed"] == 3
+        assert items[-1]["total_detections"] == 3
+        assert items[-1]["video_info"]["total_frames"] == 90
+        assert mock_yolo_service.detect_batch.await_count == 2
+        assert not spool_video.paths[0].exists()
+
+    @pytest.mark.asyncio
+    async def test_read_and_validate_video_file(self, mock_yolo_service, tmp_path):
+        """Test spooling an upload to a temp file and rejecting invalid ones"""
+        handler = VideoHandler(yolo_service=mock_yolo_service)
+        mkv_bytes = b"\x1aE\xdf\xa3" + b"video data"
+
+        with patch('app.handlers.base_handler.settings.upload_temp_dir', str(tmp_path)):
+            path = await handler.read_and_validate_video_file(
+                create_mock_upload_file(mkv_bytes, "clip.mkv")
+            )
+            assert path.startswith(str(tmp_path)) and path.endswith(".mkv")
+            with open(path, "rb") as f:
+                assert f.read() == mkv_bytes
+
+            for content, filename in ((mkv_bytes, "clip.xyz"), (b"video data", "clip.mkv")):
+                with pytest.raises(HTTPException) as exc_info:
+                    await handler.read_and_validate_video_file(
+                        create_mock_upload_file(content, filename)
+                    )
+                assert exc_info.value.status_code == 400
+
+        # Only the valid upload is left behind
+        assert [str(p) for p in tmp_path.iterdir()] == [path]
@@ -4,6 +4,8 @@ Tests for ImageAnnotator utility class
 import pytest
 from PIL import Image
 import io
+import numpy as np
+from unittest.mock import patch
 from app.utils.image_annotator import ImageAnnotator, COLORS
 
 
@@ -50,6 +52,57 @@ class TestImageAnnotator:
         result_image = Image.open(io.BytesIO(result_bytes))
         assert result_image.size == (100, 100)
 
+    def test_draw_bounding_boxes_decoded_image(self, sample_detections):
+        """Test drawing on an already-decoded BGR array instead of encoded bytes"""
+        frame = np.zeros((60, 80, 3), dtype=np.uint8)
+        frame[:, :, 0] = 255  # Blue in BGR
+
+        annotator = ImageAnnotator()
+        result_bytes = annotator.draw_bounding_boxes(
+            image_bytes=None,
+            detections=sample_detections,
+            image=frame
+        )
+
+        result_image = Image.open(io.BytesIO(result_bytes)).convert("RGB")
+        assert result_image.size == (80, 60)
+        # Colour order is converted: an untouched corner pixel is still blue
+        r, g, b = result_image.getpixel((79, 59))
+        assert b > 200 and r < 50
+
+    def test_draw_bounding_boxes_nothing_visible(self, sample_image_bytes):
+        """Test that the original bytes come back when no box lands in the image"""
+        detections = [
+            {"bbox": [150, 150, 200, 200], "class_name": "off", "class_id": 0, "confidence": 0.9},
+            {"bbox": [10, 10, 11, 11], "class_name": "tiny", "class_id": 1, "confidence": 0.9},
+        ]
+
+        annotator = ImageAnnotator()
+        result_bytes = annotator.draw_bounding_boxes(
+            image_bytes=sample_image_bytes,
+            detections=detections,
+            image=np.zeros((100, 100, 3), dtype=np.uint8)
+        )
+
+        assert result_bytes is sample_image_bytes
+
+    def test_is_visible(self):
+        """Test clipping boxes to the image before checking their area"""
+        assert ImageAnnotator._is_visible((-50, -50, 10, 10), 100, 100)
+        assert not ImageAnnotator._is_visible((-50, -50, 0, 10), 100, 100)
+        assert not ImageAnnotator._is_visible((99, 99, 120, 120), 100, 100)
+        assert ImageAnnotator._is_visible((98, 98, 120, 120), 100, 100)
+
+    def test_jpeg_quality_setting(self, sample_image_bytes, sample_detections):
+        """Test that annotated JPEGs are encoded at settings.jpeg_quality"""
+        annotator = ImageAnnotator()
+        with patch("app.utils.image_annotator.settings.jpeg_quality", 30):
+            low = annotator.draw_bounding_boxes(sample_image_bytes, sample_detections)
+        with patch("app.utils.image_annotator.settings.jpeg_quality", 95):
+            high = annotator.draw_bounding_boxes(sample_image_bytes, sample_detections)
+
+        assert len(low) < len(high)
+
     def test_draw_bounding_boxes_custom_settings(self, sample_image_bytes, sample_detections):
         """Test drawing with custom line width and font size"""
         annotator = ImageAnnotator(font_size=25, line_width=5)
@@ -76,6 +129,12 @@ class TestImageAnnotator:
         result_image = Image.open(io.BytesIO(result_bytes))
         assert result_image.size == (100, 100)
 
+    def test_box_coords_accepts_tuple_bbox(self):
+        """Test that service-built tuple bboxes are drawn like lists"""
+        assert ImageAnnotator._box_coords({"bbox": (10.0, 20.0, 50.0, 80.0)}) == (10.0, 20.0, 50.0, 80.0)
+        assert ImageAnnotator._box_coords({"bbox": [10, 20, 50, 80]}) == (10, 20, 50, 80)
+        assert ImageAnnotator._box_coords({"bbox": (10, 20)}) is None
+
     def test_draw_bounding_boxes_dict_bbox(self, sample_image_bytes):
         """Test drawing with dict-format bbox"""
         detections = [
@@ -134,6 +193,18 @@ class TestImageAnnotator:
         )
         assert isinstance(result2, bytes)
 
+    def test_blend_masks(self):
+        """Test that masked pixels are blended with their palette color in place"""
+        pixels = np.full((2, 2, 3), 100, dtype=np.uint8)
+        mask_map = np.array([[0, 1], [3, 0]], dtype=np.uint8)
+
+        ImageAnnotator._blend_masks(pixels, mask_map, 0.5)
+
+        assert pixels[0, 0].tolist() == [100, 100, 100]
+        assert pixels[1, 1].tolist() == [100, 100, 100]
+        assert pixels[0, 1].tolist() == [round(100 * 0.5 + c * 0.5) for c in COLORS[0]]
+        assert pixels[1, 0].tolist() == [round(100 * 0.5 + c * 0.5) for c in COLORS[2]]
+
     def test_draw_segmentation_masks_empty_segments(self, sample_image_bytes):
         """Test drawing with no segments"""
         annotator = ImageAnnotator()
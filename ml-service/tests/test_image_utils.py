@@ -1,10 +1,13 @@
 """
 Tests for ImageProcessor utility class
 """
+import io
 import pytest
 from PIL import Image
 import numpy as np
-from app.utils.image_utils import ImageProcessor
+import cv2
+from unittest.mock import patch
+from app.utils.image_utils import ImageProcessor, FrameBatchBuffer
 
 
 class TestImageProcessor:
@@ -107,6 +110,37 @@ class TestImageProcessor:
         assert isinstance(image, Image.Image)
         assert image.size == (100, 100)  # PIL uses (width, height)
 
+    def test_decode_to_array(self, sample_image_bytes):
+        """Test decoding image bytes to a BGR numpy array"""
+        array = ImageProcessor.decode_to_array(sample_image_bytes)
+
+        assert array.shape == (100, 100, 3)
+        assert array.dtype == np.uint8
+        # Red image: high value in the last (R) channel of BGR
+        assert array[50, 50, 2] > 200 and array[50, 50, 0] < 50
+
+    def test_decode_to_array_pil_fallback(self):
+        """Test that formats OpenCV can't read are decoded through PIL"""
+        output = io.BytesIO()
+        Image.new('RGB', (20, 10), color=(0, 0, 255)).save(output, format='TGA')
+
+        array = ImageProcessor.decode_to_array(output.getvalue())
+
+        assert array.shape[2] == 3
+        assert array[0, 0].tolist() == [255, 0, 0]
+
+    def test_decode_to_array_invalid(self):
+        """Test decoding invalid bytes"""
+        with pytest.raises(ValueError):
+            ImageProcessor.decode_to_array(b"not an image")
+
+    def test_resize_array(self):
+        """Test resizing a decoded image maintaining aspect ratio"""
+        array = np.zeros((1000, 2000, 3), dtype=np.uint8)
+
+        assert ImageProcessor.resize_array(array, max_size=500).shape == (250, 500, 3)
+        assert ImageProcessor.resize_array(array, max_size=2000) is array
+
     def test_roundtrip_numpy_conversion(self, sample_image_bytes):
         """Test converting image to numpy and back"""
         original_image = ImageProcessor.bytes_to_image(sample_image_bytes)
@@ -156,3 +190,53 @@ class TestBackwardCompatibility:
 
         assert isinstance(array, np.ndarray)
         assert array.shape == (100, 100, 3)
+
+
+class TestFrameBatchBuffer:
+    """Test FrameBatchBuffer class"""
+
+    @pytest.fixture
+    def frames(self):
+        """Create a batch of same-shaped BGR frames"""
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (100, 200, 3), dtype=np.uint8) for _ in range(3)]
+
+    def test_small_frames_passed_through(self, frames):
+        """Test that frames within max_size are returned unchanged"""
+        result = FrameBatchBuffer().resize_batch(frames, max_size=200)
+        assert all(out is frame for out, frame in zip(result, frames))
+
+    def test_resize_batch(self, frames):
+        """Test that frames are downscaled keeping aspect ratio"""
+        result = FrameBatchBuffer().resize_batch(frames, max_size=50)
+
+        assert len(result) == 3
+        for out, frame in zip(result, frames):
+            assert out.shape == (25, 50, 3)
+            expected = cv2.resize(frame, (50, 25), interpolation=cv2.INTER_AREA)
+            assert np.array_equal(out, expected)
+
+    def test_buffer_reused_across_batches(self, frames):
+        """Test that consecutive batches are resized into the same buffer"""
+        buffer = FrameBatchBuffer(capacity=4)
+        first = buffer.resize_batch(frames, max_size=50)
+        second = buffer.resize_batch(frames[:2], max_size=50)
+
+        assert np.shares_memory(first[0], second[0])
+
+    def test_mixed_shapes(self, frames):
+        """Test that frames of different shapes are resized independently"""
+        mixed = [frames[0], np.zeros((200, 100, 3), dtype=np.uint8)]
+        result = FrameBatchBuffer().resize_batch(mixed, max_size=50)
+
+        assert result[0].shape == (25, 50, 3)
+        assert result[1].shape == (50, 25, 3)
+        assert not np.shares_memory(result[0], result[1])
+
+    def test_cuda_falls_back_without_gpu(self, frames):
+        """Test that requesting CUDA resize without a CUDA-enabled OpenCV uses the CPU path"""
+        with patch("app.utils.image_utils.cuda_resize_available", return_value=False):
+            buffer = FrameBatchBuffer(use_cuda=True)
+
+        assert buffer.use_cuda is False
+        assert buffer.resize_batch(frames, max_size=50)[0].shape == (25, 50, 3)
@@ -0,0 +1,43 @@
+"""
+Tests for media type detection utilities
+"""
+import pytest
+
+from app.utils.media_utils import detect_media_type, sniff_magic
+
+
+class TestSniffMagic:
+    """Test magic-number media type detection"""
+
+    @pytest.mark.parametrize("head, expected", [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image"),
+        (b"GIF89a\x01\x00", "image"),
+        (b"\x00\x00\x00\x1cftypavif\x00\x00\x00\x00", "image"),
+        (b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00", "video"),
+        (b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00", "video"),
+        (b"\x1aE\xdf\xa3\x9fB\x86\x81", "video"),
+        (b"RIFF\x24\x00\x00\x00AVI LIST", "video"),
+        (b"\x00\x00\x00\x08wide\x00\x00\x00\x00mdat", "video"),
+        (b"not a known format", None),
+        (b"", None),
+    ])
+    def test_sniff_magic(self, head, expected):
+        """Test classifying common image and video signatures"""
+        assert sniff_magic(head) == expected
+
+
+class TestDetectMediaType:
+    """Test detect_media_type precedence"""
+
+    def test_magic_overrides_client_labels(self):
+        """Test that the file signature wins over content type and filename"""
+        mp4_head = b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00"
+        assert detect_media_type("photo.jpg", "image/jpeg", head=mp4_head) == "video"
+
+    def test_unknown_magic_falls_back(self):
+        """Test falling back to content type, then filename"""
+        assert detect_media_type("clip.bin", "video/mp4", head=b"????") == "video"
+        assert detect_media_type("clip.mkv", None, head=b"????") == "video"
+        assert detect_media_type(None, None, head=b"????") == "image"
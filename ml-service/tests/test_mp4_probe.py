@@ -0,0 +1,70 @@
+"""
+Tests for MP4/MOV frame-count probing
+"""
+import os
+import pytest
+import numpy as np
+import cv2
+
+from app.utils.mp4_probe import probe_frames
+
+
+def write_video(path: str, fourcc: str, num_frames: int) -> None:
+    """Encode a small test video with OpenCV"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), 10.0, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+
+
+class TestProbeFrames:
+    """Test probe_frames function"""
+
+    def test_mp4_frame_count(self, tmp_path):
+        """Test that the frame count comes from the sample table"""
+        path = str(tmp_path / "test.mp4")
+        write_video(path, "mp4v", 37)
+
+        assert probe_frames(path) == 37
+
+    def test_video_track_after_audio(self, tmp_path):
+        """Test that only the video track's samples are counted"""
+        av = pytest.importorskip("av")
+        path = str(tmp_path / "test.mp4")
+
+        with av.open(path, "w") as container:
+            container.add_stream("aac", rate=44100)
+            stream = container.add_stream("mpeg4", rate=10)
+            stream.width, stream.height = 64, 48
+            for i in range(25):
+                frame = av.VideoFrame.from_ndarray(np.full((48, 64, 3), i, dtype=np.uint8), format="bgr24")
+                container.mux(stream.encode(frame))
+            container.mux(stream.encode())
+
+        assert probe_frames(path) == 25
+
+    def test_non_mp4_container(self, tmp_path):
+        """Test that other containers return None for a decoder fallback"""
+        path = str(tmp_path / "test.avi")
+        write_video(path, "MJPG", 5)
+
+        assert probe_frames(path) is None
+
+    def test_truncated_file(self, tmp_path):
+        """Test that a moov box past the end of the file returns None"""
+        path = str(tmp_path / "test.mp4")
+        write_video(path, "mp4v", 10)
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        assert probe_frames(path) is None
+
+    def test_garbage_and_missing_files(self, tmp_path):
+        """Test that unreadable input returns None instead of raising"""
+        path = tmp_path / "garbage.mp4"
+        path.write_bytes(os.urandom(4096))
+
+        assert probe_frames(str(path)) is None
+        assert probe_frames(str(tmp_path / "missing.mp4")) is None
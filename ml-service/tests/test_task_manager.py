@@ -0,0 +1,143 @@
+"""
+Tests for the sharded TaskManager
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import orjson
+
+from app.services.task_manager import TASK_SHARDS, TaskManager, TaskStatus
+
+
+class TestTaskManager:
+    """Test task bookkeeping across shards"""
+
+    def test_lifecycle(self):
+        """Test create, progress, complete and fail on sharded storage"""
+        manager = TaskManager()
+        done_id = manager.create_task(total_frames=10)
+        failed_id = manager.create_task(total_frames=10)
+
+        manager.update_progress(done_id, 5, "Halfway")
+        task = manager.get_task(done_id)
+        assert task.status == TaskStatus.PROCESSING
+        assert task.progress == 0.5
+        assert task.message == "Halfway"
+
+        manager.complete_task(done_id, {"status": "success"})
+        manager.fail_task(failed_id, "boom")
+
+        assert manager.get_task(done_id).status == TaskStatus.COMPLETED
+        assert manager.get_task(failed_id).error == "boom"
+        assert manager.get_task("missing") is None
+
+        stats = manager.get_stats()
+        assert stats["total_tasks"] == 2
+        assert stats["by_status"] == {"completed": 1, "failed": 1}
+        assert set(manager.get_all_tasks()) == {done_id, failed_id}
+        assert set(manager.tasks) == {done_id, failed_id}
+
+    def test_tasks_spread_over_shards(self):
+        """Test that tasks land in more than one shard"""
+        manager = TaskManager()
+        for _ in range(64):
+            manager.create_task()
+
+        assert manager._count() == 64
+        assert sum(1 for _, shard in manager._shards if shard) > 1
+        assert len(manager._shards) == TASK_SHARDS
+
+    def test_cleanup_removes_oldest_finished(self):
+        """Test that cleanup drops the oldest finished tasks across shards"""
+        manager = TaskManager(max_tasks=20)
+        finished = []
+        for i in range(20):
+            task_id = manager.create_task()
+            manager.complete_task(task_id, {})
+            manager.get_task(task_id).completed_at = float(i)
+            finished.append(task_id)
+
+        running = manager.create_task()
+
+        assert manager._count() == 10
+        assert manager.get_task(running) is not None
+        assert all(manager.get_task(task_id) is None for task_id in finished[:11])
+        assert all(manager.get_task(task_id) is not None for task_id in finished[11:])
+
+    def test_finished_tasks_expire(self):
+        """Test that finished tasks are dropped after task_ttl, running ones kept"""
+        manager = TaskManager(task_ttl=10)
+        done_id = manager.create_task()
+        running_id = manager.create_task()
+        manager.complete_task(done_id, {})
+
+        with patch('app.services.task_manager.time.time', return_value=time.time() + 11):
+            assert manager.get_task(done_id) is None
+            assert manager.get_task(running_id) is not None
+
+    def test_task_progress_is_slotted(self):
+        """Test that tasks carry no per-instance __dict__"""
+        manager = TaskManager()
+        progress = manager.get_task(manager.create_task())
+
+        assert not hasattr(progress, "__dict__")
+
+    def test_status_is_plain_string(self):
+        """Test that status is stored and serialized as a plain interned str"""
+        manager = TaskManager()
+        task_id = manager.create_task()
+        manager.complete_task(task_id, {})
+
+        task = manager.get_task(task_id)
+        assert type(task.status) is str
+        assert task.status is TaskStatus.COMPLETED
+        assert task.to_dict()["status"] == "completed"
+
+    def test_frame_source_read_on_poll(self):
+        """Test that progress is pulled from an attached frame counter"""
+        manager = TaskManager()
+        task_id = manager.create_task(total_frames=100)
+        counter = [0]
+
+        manager.attach_frame_source(task_id, lambda: counter[0])
+        counter[0] = 40
+
+        assert manager.get_task(task_id).progress == 0.4
+        assert manager.get_all_tasks()[task_id]["current_frame"] == 40
+
+        counter[0] = 0  # Never steps back
+        assert manager.get_task(task_id).current_frame == 40
+
+    def test_finished_task_json_cached(self):
+        """Test that a finished task is serialized once, a running one every time"""
+        manager = TaskManager()
+        task_id = manager.create_task(total_frames=10)
+        manager.update_progress(task_id, 5)
+        task = manager.get_task(task_id)
+
+        assert task.to_json() is not task.to_json()
+
+        manager.complete_task(task_id, {"status": "success"})
+        body = task.to_json()
+        assert task.to_json() is body
+        assert orjson.loads(body)["status"] == "completed"
+        assert orjson.loads(body)["elapsed_time"] == round(task.completed_at - task.started_at, 2)
+
+    def test_concurrent_updates(self):
+        """Test progress updates from several threads while polling"""
+        manager = TaskManager()
+        task_ids = [manager.create_task(total_frames=1000) for _ in range(8)]
+
+        def update(task_id):
+            for frame in range(1, 1001):
+                manager.update_progress(task_id, frame)
+                manager.get_all_tasks()
+
+        threads = [threading.Thread(target=update, args=(task_id,)) for task_id in task_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(manager.get_task(task_id).progress == 1.0 for task_id in task_ids)
@@ -0,0 +1,175 @@
+"""
+Tests for upload reading utilities
+"""
+import os
+import tempfile
+import pytest
+from io import BytesIO
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, UploadFile
+
+from app.utils.upload_utils import (
+    read_capped, stream_upload_to_tempfile, write_temp_file, prefetch_file, UPLOAD_CHUNK_SIZE
+)
+
+
+def create_upload(content: bytes, size: int = None):
+    """Create a mock UploadFile that reads from an in-memory stream"""
+    upload = Mock(spec=UploadFile)
+    upload.size = size
+    stream = BytesIO(content)
+    upload.read = AsyncMock(side_effect=lambda size=-1: stream.read(size))
+    return upload
+
+
+class TestReadCapped:
+    """Test read_capped function"""
+
+    @pytest.mark.asyncio
+    async def test_reads_whole_file_in_chunks(self):
+        """Test reading a file larger than one chunk but under the limit"""
+        content = b"x" * (UPLOAD_CHUNK_SIZE * 2 + 10)
+        upload = create_upload(content)
+
+        result = await read_capped(upload, max_bytes=len(content))
+
+        assert result == content
+        upload.read.assert_called_with(UPLOAD_CHUNK_SIZE)
+
+    @pytest.mark.asyncio
+    async def test_empty_file(self):
+        """Test reading an empty upload"""
+        assert await read_capped(create_upload(b""), max_bytes=10) == b""
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_file_early(self):
+        """Test that reading stops with 413 once the limit is crossed"""
+        content = b"x" * (UPLOAD_CHUNK_SIZE * 5)
+        upload = create_upload(content)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await read_capped(upload, max_bytes=UPLOAD_CHUNK_SIZE, label="Video")
+
+        assert exc_info.value.status_code == 413
+        assert "Video too large" in exc_info.value.detail
+        assert upload.read.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_known_size_read_at_once(self):
+        """Test that an upload of known size is read with one sized call"""
+        content = b"x" * (UPLOAD_CHUNK_SIZE * 2 + 10)
+        upload = create_upload(content, size=len(content))
+
+        result = await read_capped(upload, max_bytes=len(content))
+
+        assert result == content
+        assert upload.read.call_args_list[0].args == (len(content),)
+        assert upload.read.call_count == 2  # Sized read + end-of-file check
+
+    @pytest.mark.asyncio
+    async def test_known_size_over_limit_not_read(self):
+        """Test that an upload known to be too large is refused unread"""
+        upload = create_upload(b"x" * 100, size=100)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await read_capped(upload, max_bytes=50, label="Image")
+
+        assert exc_info.value.status_code == 413
+        upload.read.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_known_size_understated(self):
+        """Test that data beyond a wrong declared size still counts toward the limit"""
+        upload = create_upload(b"x" * 100, size=10)
+
+        with pytest.raises(HTTPException):
+            await read_capped(upload, max_bytes=50)
+
+
+class TestStreamUploadToTempfile:
+    """Test stream_upload_to_tempfile function"""
+
+    @pytest.mark.asyncio
+    async def test_writes_upload_to_file(self):
+        """Test that the whole upload lands in the returned temp file"""
+        content = b"v" * (UPLOAD_CHUNK_SIZE + 123)
+
+        path = await stream_upload_to_tempfile(create_upload(content), max_bytes=len(content))
+        try:
+            assert path.endswith(".mp4")
+            with open(path, "rb") as f:
+                assert f.read() == content
+        finally:
+            os.remove(path)
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_file_and_cleans_up(self):
+        """Test that an oversized upload raises 413 and leaves no temp file"""
+        content = b"x" * (UPLOAD_CHUNK_SIZE * 3)
+
+        created = []
+        real_mkstemp = tempfile.mkstemp
+
+        def mkstemp(suffix, dir=None):
+            fd, path = real_mkstemp(suffix=suffix, dir=dir)
+            created.append(path)
+            return fd, path
+
+        with patch("app.utils.upload_utils.tempfile.mkstemp", side_effect=mkstemp):
+            with pytest.raises(HTTPException) as exc_info:
+                await stream_upload_to_tempfile(create_upload(content), max_bytes=UPLOAD_CHUNK_SIZE, label="Video")
+
+        assert exc_info.value.status_code == 413
+        assert "Video too large" in exc_info.value.detail
+        assert len(created) == 1 and not os.path.exists(created[0])
+
+
+class TestWriteTempFile:
+    """Test write_temp_file function"""
+
+    def test_writes_buffer(self, tmp_path):
+        """Test writing a buffer into the given directory"""
+        path = write_temp_file(b"video" * 1000, suffix=".mov", dir=str(tmp_path))
+
+        assert path.startswith(str(tmp_path)) and path.endswith(".mov")
+        with open(path, "rb") as f:
+            assert f.read() == b"video" * 1000
+
+    def test_short_writes_resumed(self, tmp_path):
+        """Test that a partial write is continued from where it stopped"""
+        real_write = os.write
+        with patch("app.utils.upload_utils.os.write", side_effect=lambda fd, data: real_write(fd, data[:3])):
+            path = write_temp_file(b"abcdefgh", dir=str(tmp_path))
+
+        with open(path, "rb") as f:
+            assert f.read() == b"abcdefgh"
+
+    def test_failed_write_cleans_up(self, tmp_path):
+        """Test that no file is left behind when writing fails"""
+        with patch("app.utils.upload_utils.os.write", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                write_temp_file(b"data", dir=str(tmp_path))
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPrefetchFile:
+    """Test prefetch_file function"""
+
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+    def test_advises_whole_file(self, tmp_path):
+        """Test that the whole file is marked as needed and the fd closed"""
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"v" * 1024)
+
+        with patch("app.utils.upload_utils.os.posix_fadvise") as mock_fadvise:
+            prefetch_file(str(path))
+
+        fd, offset, length, advice = mock_fadvise.call_args.args
+        assert (offset, length, advice) == (0, 0, os.POSIX_FADV_WILLNEED)
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+    def test_missing_file_ignored(self, tmp_path):
+        """Test that a missing file is left for the decoder to report"""
+        prefetch_file(str(tmp_path / "missing.mp4"))
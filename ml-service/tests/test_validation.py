@@ -15,6 +15,14 @@ class TestValidationResult:
         assert result.error_message is None
         assert bool(result) is True
 
+    def test_success_is_shared_and_immutable(self):
+        """Test that success() reuses one frozen instance"""
+        result = ValidationResult.success()
+        assert ValidationResult.success() is result
+
+        with pytest.raises(AttributeError):
+            result.is_valid = False
+
     def test_failure_creation(self):
         """Test creating a failure validation result"""
         error_msg = "Invalid image format"
@@ -7,6 +7,10 @@ from app.validators.video_validator import VideoValidator
 from app.models.validation import ValidationResult
 
 
+# Leading bytes of an MP4 file (ftyp box)
+MP4_HEAD = b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00"
+
+
 class TestImageValidator:
     """Test ImageValidator class"""
 
@@ -201,3 +205,34 @@ class TestVideoValidator:
 
         # Should be valid at exactly the limit
         assert result.is_valid is True
+
+    @pytest.mark.asyncio
+    async def test_validate_file(self, tmp_path):
+        """Test validating a video on disk by its size, filename and header"""
+        validator = VideoValidator(max_file_size_mb=1)
+        small = tmp_path / "small.mp4"
+        small.write_bytes(MP4_HEAD + b'fake_video_data' * 100)
+        large = tmp_path / "large.mp4"
+        large.write_bytes(MP4_HEAD + b'x' * (2 * 1024 * 1024))
+        not_video = tmp_path / "image.mp4"
+        not_video.write_bytes(b'\xff\xd8\xff\xe0' + b'x' * 100)
+
+        assert (await validator.validate_file(str(small), filename="clip.mp4")).is_valid is True
+        assert (await validator.validate_file(str(small), filename="clip.xyz")).is_valid is False
+        assert (await validator.validate_file(str(not_video))).is_valid is False
+        result = await validator.validate_file(str(large))
+        assert result.is_valid is False
+        assert "too large" in result.error_message.lower()
+
+    @pytest.mark.asyncio
+    async def test_validate_header(self):
+        """Test validating a video from its container signature alone"""
+        validator = VideoValidator()
+
+        assert (await validator.validate_header(MP4_HEAD, filename="clip.mp4")).is_valid is True
+        assert (await validator.validate_header(b'\x1aE\xdf\xa3\x9fB\x86\x81', filename="clip.webm")).is_valid is True
+        assert (await validator.validate_header(MP4_HEAD, filename="clip.xyz")).is_valid is False
+
+        result = await validator.validate_header(b'fake_video_data', filename="clip.mp4")
+        assert result.is_valid is False
+        assert "not a recognized video container" in result.error_message
@@ -1,8 +1,11 @@
 """
 Tests for VideoFrameService
 """
+import os
 import pytest
 import numpy as np
+import cv2
+from io import BytesIO
 from unittest.mock import Mock, patch, MagicMock
 from app.services.video_frame_service import VideoFrameService, VideoInfo, FrameData
 
@@ -53,7 +56,13 @@ class TestFrameData:
 
 
 class TestVideoFrameService:
-    """Test VideoFrameService class"""
+    """Test VideoFrameService class (temp file + OpenCV decode path)"""
+
+    @pytest.fixture(autouse=True)
+    def opencv_backend(self):
+        """Force the OpenCV fallback even when PyAV is installed"""
+        with patch('app.services.video_frame_service.AV_AVAILABLE', False):
+            yield
 
     def test_initialization(self):
         """Test service initialization"""
@@ -68,19 +77,17 @@ class TestVideoFrameService:
         assert isinstance(result, str)
 
     @patch('app.services.video_frame_service.cv2.VideoCapture')
-    @patch('app.services.video_frame_service.tempfile.mkstemp')
+    @patch('app.utils.upload_utils.tempfile.mkstemp')
     @patch('os.write')
     @patch('os.close')
-    @patch('os.remove')
-    @patch('os.path.exists')
+    @patch('os.unlink')
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FRAME_COUNT', 7)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FPS', 5)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FRAME_WIDTH', 3)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FRAME_HEIGHT', 4)
     def test_get_video_info(
         self,
-        mock_exists,
-        mock_remove,
+        mock_unlink,
         mock_os_close,
         mock_os_write,
         mock_mkstemp,
@@ -89,7 +96,6 @@ class TestVideoFrameService:
         """Test getting video info"""
         # Setup mocks
         mock_mkstemp.return_value = (123, '/tmp/test.mp4')
-        mock_exists.return_value = True
 
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = True
@@ -113,18 +119,16 @@ class TestVideoFrameService:
 
         # Verify cleanup
         mock_cap.release.assert_called_once()
-        mock_remove.assert_called_once()
+        mock_unlink.assert_called_once()
 
     @patch('app.services.video_frame_service.cv2.VideoCapture')
-    @patch('app.services.video_frame_service.tempfile.mkstemp')
+    @patch('app.utils.upload_utils.tempfile.mkstemp')
     @patch('os.write')
     @patch('os.close')
-    @patch('os.remove')
-    @patch('os.path.exists')
+    @patch('os.unlink')
     def test_get_video_info_failed_open(
         self,
-        mock_exists,
-        mock_remove,
+        mock_unlink,
         mock_os_close,
         mock_os_write,
         mock_mkstemp,
@@ -132,7 +136,6 @@ class TestVideoFrameService:
     ):
         """Test get_video_info when video can't be opened"""
         mock_mkstemp.return_value = (123, '/tmp/test.mp4')
-        mock_exists.return_value = True
 
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = False
@@ -145,31 +148,26 @@ class TestVideoFrameService:
             service.get_video_info(video_bytes)
 
     @patch('app.services.video_frame_service.cv2.VideoCapture')
-    @patch('app.services.video_frame_service.cv2.cvtColor')
-    @patch('app.services.video_frame_service.Image.fromarray')
-    @patch('app.services.video_frame_service.tempfile.mkstemp')
+    @patch('app.services.video_frame_service.cv2.imencode')
+    @patch('app.utils.upload_utils.tempfile.mkstemp')
     @patch('os.write')
     @patch('os.close')
-    @patch('os.remove')
-    @patch('os.path.exists')
+    @patch('os.unlink')
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FRAME_COUNT', 7)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FPS', 5)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_POS_FRAMES', 1)
     def test_extract_single_frame(
         self,
-        mock_exists,
-        mock_remove,
+        mock_unlink,
         mock_os_close,
         mock_os_write,
         mock_mkstemp,
-        mock_from_array,
-        mock_cvt_color,
+        mock_imencode,
         mock_capture_class
     ):
         """Test extracting a single frame"""
         # Setup mocks
         mock_mkstemp.return_value = (123, '/tmp/test.mp4')
-        mock_exists.return_value = True
 
         # Mock video capture
         mock_cap = MagicMock()
@@ -182,50 +180,39 @@ class TestVideoFrameService:
         mock_cap.read.return_value = (True, fake_frame)
         mock_capture_class.return_value = mock_cap
 
-        # Mock image conversion
-        mock_cvt_color.return_value = fake_frame
-        mock_pil_image = MagicMock()
-        mock_pil_image.save = MagicMock()
-        mock_from_array.return_value = mock_pil_image
-
-        # Mock BytesIO for JPEG output
-        with patch('app.services.video_frame_service.BytesIO') as mock_bytesio:
-            mock_bytes_obj = MagicMock()
-            mock_bytes_obj.getvalue.return_value = b'jpeg_bytes'
-            mock_bytesio.return_value = mock_bytes_obj
-
-            # Test
-            service = VideoFrameService()
-            video_bytes = b'fake_video_bytes'
-            frame_data = service.extract_single_frame(
-                video_bytes=video_bytes,
-                frame_index=50,
-                include_base64=False,
-                jpeg_quality=85
-            )
+        # Mock JPEG encoding
+        mock_imencode.return_value = (True, np.frombuffer(b'jpeg_bytes', dtype=np.uint8))
 
-            # Assertions
-            assert isinstance(frame_data, FrameData)
-            assert frame_data.frame_index == 50
-            assert frame_data.timestamp == 50 / 30.0
-            assert frame_data.frame_bytes == b'jpeg_bytes'
-            assert frame_data.frame_base64 is None
+        # Test
+        service = VideoFrameService()
+        video_bytes = b'fake_video_bytes'
+        frame_data = service.extract_single_frame(
+            video_bytes=video_bytes,
+            frame_index=50,
+            include_base64=False,
+            jpeg_quality=85
+        )
 
-            # Verify frame seeking
-            mock_cap.set.assert_called_once()
+        # Assertions
+        assert isinstance(frame_data, FrameData)
+        assert frame_data.frame_index == 50
+        assert frame_data.timestamp == 50 / 30.0
+        assert frame_data.frame_bytes == b'jpeg_bytes'
+        assert frame_data.frame_base64 is None
+
+        # Verify frame seeking
+        mock_cap.set.assert_called_once()
 
     @patch('app.services.video_frame_service.cv2.VideoCapture')
-    @patch('app.services.video_frame_service.tempfile.mkstemp')
+    @patch('app.utils.upload_utils.tempfile.mkstemp')
     @patch('os.write')
     @patch('os.close')
-    @patch('os.remove')
-    @patch('os.path.exists')
+    @patch('os.unlink')
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FRAME_COUNT', 7)
     @patch('app.services.video_frame_service.cv2.CAP_PROP_FPS', 5)
     def test_extract_single_frame_invalid_index(
         self,
-        mock_exists,
-        mock_remove,
+        mock_unlink,
         mock_os_close,
         mock_os_write,
         mock_mkstemp,
@@ -233,7 +220,6 @@ class TestVideoFrameService:
     ):
         """Test extracting frame with invalid index"""
         mock_mkstemp.return_value = (123, '/tmp/test.mp4')
-        mock_exists.return_value = True
 
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = True
@@ -252,43 +238,254 @@ class TestVideoFrameService:
                 include_base64=False
             )
 
+    def test_cv2_iter_frames_reads_sequentially(self):
+        """Test that frames are grabbed in order and only wanted ones decoded"""
+        mock_cap = MagicMock()
+        mock_cap.grab.return_value = True
+        mock_cap.retrieve.side_effect = lambda: (True, np.zeros((2, 2, 3), dtype=np.uint8))
+
+        frames = list(VideoFrameService._cv2_iter_frames(mock_cap, [4, 1]))
+
+        assert [idx for idx, _ in frames] == [1, 4]
+        assert mock_cap.grab.call_count == 5
+        assert mock_cap.retrieve.call_count == 2
+        mock_cap.set.assert_not_called()
+
+    def test_cv2_iter_frames_stops_at_end_of_stream(self):
+        """Test that a short stream yields only the frames it has"""
+        mock_cap = MagicMock()
+        mock_cap.grab.side_effect = [True, True, False]
+        mock_cap.retrieve.return_value = (True, np.zeros((2, 2, 3), dtype=np.uint8))
+
+        frames = list(VideoFrameService._cv2_iter_frames(mock_cap, [1, 10]))
+
+        assert [idx for idx, _ in frames] == [1]
+
+    def test_interval_frame_indices(self):
+        """Test sampling times, the max_frames cap and frames past the end"""
+        info = VideoInfo(total_frames=300, fps=60.0, duration=5.0, width=1, height=1)
+
+        frames = VideoFrameService._interval_frame_indices(info, 0.7, 100)
+        assert [idx for idx, _ in frames] == [0, 42, 84, 126, 168, 210, 252, 294]
+        assert frames[1][1] == pytest.approx(0.7)
+
+        assert len(VideoFrameService._interval_frame_indices(info, 0.7, 3)) == 3
+        short = VideoInfo(total_frames=10, fps=10.0, duration=5.0, width=1, height=1)
+        assert VideoFrameService._interval_frame_indices(short, 0.5, 100) == [(0, 0.0), (5, 0.5)]
+
+    def test_interval_frame_indices_low_fps(self):
+        """Test that intervals shorter than a frame give each frame once, at its first time"""
+        info = VideoInfo(total_frames=10, fps=1.0, duration=10.0, width=1, height=1)
+
+        frames = VideoFrameService._interval_frame_indices(info, 0.5, 10)
+        assert frames == [(0, 0.0), (1, 1.0), (2, 2.0), (3, 3.0), (4, 4.0)]
+
     def test_frame_to_jpeg_bytes(self):
         """Test converting frame to JPEG bytes"""
         # Create a simple test frame
         fake_frame = np.zeros((100, 100, 3), dtype=np.uint8)
 
-        with patch('app.services.video_frame_service.cv2.cvtColor') as mock_cvt:
-            with patch('app.services.video_frame_service.Image.fromarray') as mock_from_array:
-                # Mock PIL image
-                mock_pil_image = MagicMock()
-                mock_from_array.return_value = mock_pil_image
+        result = VideoFrameService._frame_to_jpeg_bytes(fake_frame, quality=90)
 
-                # Mock BytesIO
-                with patch('app.services.video_frame_service.BytesIO') as mock_bytesio:
-                    mock_bytes_obj = MagicMock()
-                    mock_bytes_obj.getvalue.return_value = b'test_jpeg'
-                    mock_bytesio.return_value = mock_bytes_obj
+        assert isinstance(result, bytes)
+        assert result[:2] == b'\xff\xd8'  # JPEG SOI marker
+        decoded = cv2.imdecode(np.frombuffer(result, dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == (100, 100, 3)
 
-                    # Mock cvtColor to return RGB frame
-                    mock_cvt.return_value = fake_frame
+    def test_frame_to_jpeg_bytes_encode_failure(self):
+        """Test that a failed encode raises ValueError"""
+        fake_frame = np.zeros((100, 100, 3), dtype=np.uint8)
 
-                    # Test
-                    result = VideoFrameService._frame_to_jpeg_bytes(fake_frame, quality=90)
+        with patch('app.services.video_frame_service.cv2.imencode', return_value=(False, None)):
+            with pytest.raises(ValueError, match="Failed to encode frame"):
+                VideoFrameService._frame_to_jpeg_bytes(fake_frame)
 
-                    assert result == b'test_jpeg'
-                    mock_pil_image.save.assert_called_once()
+    def test_frame_to_jpeg_bytes_turbojpeg(self):
+        """Test that PyTurboJPEG encodes BGR frames directly when installed"""
+        fake_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        turbo = Mock(encode=Mock(return_value=b'\xff\xd8jpeg'))
+
+        with patch('app.services.video_frame_service._turbo_jpeg', turbo), \
+             patch('app.services.video_frame_service.TJPF_BGR', 'bgr', create=True), \
+             patch('app.services.video_frame_service.TJFLAG_FASTDCT', 'fast', create=True), \
+             patch('app.services.video_frame_service.cv2.imencode') as imencode:
+            result = VideoFrameService._frame_to_jpeg_bytes(fake_frame, quality=90)
+
+        assert result == b'\xff\xd8jpeg'
+        turbo.encode.assert_called_once_with(fake_frame, quality=90, pixel_format='bgr', flags='fast')
+        imencode.assert_not_called()
+
+    def test_write_video_to_temp(self, tmp_path):
+        """Test writing video bytes to a temp file in upload_temp_dir"""
+        with patch('app.services.video_frame_service.settings.upload_temp_dir', str(tmp_path)):
+            result = VideoFrameService._write_video_to_temp(b'fake_video_data', suffix='.mp4')
+
+        assert os.path.dirname(result) == str(tmp_path)
+        assert result.endswith('.mp4')
+        with open(result, 'rb') as f:
+            assert f.read() == b'fake_video_data'
+
+class TestVideoFrameServicePyAV:
+    """Test VideoFrameService in-memory decode path (PyAV)"""
+
+    @pytest.fixture(autouse=True)
+    def pyav_backend(self):
+        """Skip unless PyAV is installed"""
+        pytest.importorskip("av")
+        with patch('app.services.video_frame_service.AV_AVAILABLE', True):
+            yield
+
+    @pytest.fixture
+    def video_bytes(self, tmp_path):
+        """Encode a 3s, 10 FPS video whose frame i has brightness i * 8"""
+        path = str(tmp_path / "test.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 10.0, (64, 48))
+        for i in range(30):
+            writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+        writer.release()
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_get_video_info(self, video_bytes):
+        """Test reading metadata without a temp file"""
+        with patch('app.utils.upload_utils.tempfile.mkstemp') as mock_mkstemp:
+            info = VideoFrameService().get_video_info(video_bytes)
+
+        mock_mkstemp.assert_not_called()
+        assert info.total_frames == 30
+        assert info.fps == 10.0
+        assert info.duration == 3.0
+        assert (info.width, info.height) == (64, 48)
+
+    def test_extract_single_frame_middle(self, video_bytes):
+        """Test seeking to the middle frame"""
+        frame_data = VideoFrameService().extract_single_frame(video_bytes, include_base64=True)
+
+        assert frame_data.frame_index == 15
+        assert frame_data.timestamp == 1.5
+        assert frame_data.frame_base64 is not None
+        assert abs(frame_data.image.mean() - 15 * 8) < 8
+
+    def test_extract_frames_by_interval(self, video_bytes):
+        """Test sequential decode of interval frames"""
+        frames, info = VideoFrameService().extract_frames_by_interval(
+            video_bytes, frame_interval=1.0, max_frames=10
+        )
 
-    @patch('app.services.video_frame_service.tempfile.mkstemp')
-    @patch('os.write')
-    @patch('os.close')
-    def test_write_video_to_temp(self, mock_os_close, mock_os_write, mock_mkstemp):
-        """Test writing video bytes to temporary file"""
-        mock_mkstemp.return_value = (123, '/tmp/test.mp4')
+        assert info.total_frames == 30
+        assert [f.frame_index for f in frames] == [0, 10, 20]
+        for f in frames:
+            assert abs(f.image.mean() - f.frame_index * 8) < 8
+
+    def test_extract_frames_by_interval_from_path(self, video_bytes, tmp_path):
+        """Test decoding a video file in place, leaving it on disk"""
+        path = tmp_path / "upload.mp4"
+        path.write_bytes(video_bytes)
+
+        frames, info = VideoFrameService().extract_frames_by_interval(
+            video_path=str(path), frame_interval=1.0, max_frames=10
+        )
+
+        assert [f.frame_index for f in frames] == [0, 10, 20]
+        assert path.exists()
 
-        video_bytes = b'fake_video_data'
-        result = VideoFrameService._write_video_to_temp(video_bytes, suffix='.mp4')
+    def test_extract_frames_by_indices_keeps_order(self, video_bytes):
+        """Test that frames come back in the requested order"""
+        frames = VideoFrameService().extract_frames_by_indices(video_bytes, [27, 3])
 
-        assert result == '/tmp/test.mp4'
-        mock_mkstemp.assert_called_once_with(suffix='.mp4')
-        mock_os_write.assert_called_once_with(123, video_bytes)
-        mock_os_close.assert_called_once_with(123)
+        assert [f.frame_index for f in frames] == [27, 3]
+
+    @pytest.mark.parametrize("av_available", [True, False])
+    def test_extract_frames_by_interval_low_fps(self, tmp_path, av_available, caplog):
+        """Test that a sub-frame interval on a 1 FPS video repeats no frame and warns of none"""
+        path = str(tmp_path / "slow.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 1.0, (64, 48))
+        for i in range(10):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+
+        with patch('app.services.video_frame_service.AV_AVAILABLE', av_available):
+            frames, _ = VideoFrameService().extract_frames_by_interval(
+                video_path=path, frame_interval=0.5, max_frames=10
+            )
+
+        assert [(f.frame_index, f.timestamp) for f in frames] == [(i, float(i)) for i in range(5)]
+        assert "Failed to extract" not in caplog.text
+
+    @pytest.mark.parametrize("av_available", [True, False])
+    def test_extract_frames_as_ndarray(self, video_bytes, av_available):
+        """Test decoding interval frames into one batch without JPEG encoding"""
+        with patch('app.services.video_frame_service.AV_AVAILABLE', av_available), \
+             patch.object(VideoFrameService, '_frame_to_jpeg_buffer') as mock_encode:
+            batch, frame_indices, info = VideoFrameService().extract_frames_as_ndarray(
+                video_bytes, frame_interval=1.0, max_frames=10
+            )
+
+        mock_encode.assert_not_called()
+        assert info.total_frames == 30
+        assert frame_indices == [0, 10, 20]
+        assert batch.shape == (3, 48, 64, 3) and batch.dtype == np.uint8
+        for frame, frame_idx in zip(batch, frame_indices):
+            assert abs(frame.mean() - frame_idx * 8) < 8
+
+    @pytest.mark.parametrize("encode_workers", [0, 2])
+    def test_extract_frames_encode_workers(self, video_bytes, encode_workers):
+        """Test that pooled and inline encoding stream frames in decode order"""
+        service = VideoFrameService(encode_workers=encode_workers)
+        streamed = []
+
+        frames, _ = service.extract_frames_by_interval(
+            video_bytes, frame_interval=0.2, max_frames=15,
+            include_base64=True, on_frame=streamed.append
+        )
+
+        assert (service._encode_pool is None) == (encode_workers == 0)
+        assert [f.frame_index for f in frames] == list(range(0, 30, 2))
+        assert streamed == frames
+        assert all(f.frame_base64 for f in frames)
+
+    @pytest.fixture
+    def gop_video_bytes(self):
+        """Encode a 6s, 10 FPS video with a keyframe every 10 frames"""
+        import av
+
+        buffer = BytesIO()
+        container = av.open(buffer, 'w', format='mp4')
+        stream = container.add_stream('mpeg4', rate=10)
+        stream.width, stream.height, stream.pix_fmt = 64, 48, 'yuv420p'
+        stream.codec_context.gop_size = 10
+        for i in range(60):
+            frame = av.VideoFrame.from_ndarray(np.full((48, 64, 3), i * 4, dtype=np.uint8), format='bgr24')
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+        container.close()
+        return buffer.getvalue()
+
+    def test_iter_frames_skips_gops(self, gop_video_bytes):
+        """Test that decoding jumps to the keyframe before distant frames"""
+        container, stream = VideoFrameService._open_av_container(gop_video_bytes)
+        decoded = []
+        decode = container.decode
+
+        def counting_decode(*args, **kwargs):
+            for frame in decode(*args, **kwargs):
+                decoded.append(frame.pts)
+                yield frame
+
+        container = Mock(wraps=container, decode=counting_decode)
+        try:
+            frames = list(VideoFrameService._av_iter_frames(container, stream, [45, 5, 46], fps=10.0))
+        finally:
+            container.close()
+
+        assert [idx for idx, _ in frames] == [5, 45, 46]
+        for idx, image in frames:
+            assert abs(image.mean() - idx * 4) < 8
+        assert len(decoded) < 47
+
+    def test_invalid_video(self):
+        """Test that undecodable bytes raise ValueError"""
+        with pytest.raises(ValueError, match="Failed to open video file"):
+            VideoFrameService().get_video_info(b'not a video')
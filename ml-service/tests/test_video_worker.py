@@ -0,0 +1,144 @@
+"""
+Tests for the out-of-process video task worker
+"""
+import os
+import queue
+import tempfile
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.task_manager import TaskManager, TaskStatus
+from app.services.video_worker import VideoTaskWorker, _worker_main
+
+
+@pytest.fixture
+def video_path():
+    """Temp file standing in for an uploaded video"""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def run_worker(jobs, frame_counters=None):
+    """Run _worker_main in-process over the given jobs and return its events"""
+    job_queue, event_queue = queue.Queue(), queue.Queue()
+    for job in jobs + [None]:
+        job_queue.put(job)
+    _worker_main(job_queue, event_queue, frame_counters, slot=1)
+
+    events = []
+    while not event_queue.empty():
+        events.append(event_queue.get())
+    return events
+
+
+class TestWorkerMain:
+    """Test the worker process loop"""
+
+    def test_job_completes(self, video_path):
+        """Test that a job reports progress and a result, then removes its files"""
+        output_paths = []
+
+        async def annotate(video_path, progress_callback, **params):
+            progress_callback(10, "Processing frame 10/20")
+            fd, output_path = tempfile.mkstemp(suffix=".mp4")
+            os.write(fd, b"x" * 1024)
+            os.close(fd)
+            output_paths.append(output_path)
+            return output_path, {"total_detections": 3}
+
+        video_service = Mock()
+        video_service.annotate_video_to_file = AsyncMock(side_effect=annotate)
+
+        with patch('app.services.video_worker.YOLOService') as mock_yolo, \
+             patch('app.services.video_worker.VideoYOLOService', return_value=video_service):
+            mock_yolo.return_value.load_models = AsyncMock()
+            events = run_worker([("task-1", video_path, {"confidence": 0.4})])
+
+        assert events[0] == ("progress", "task-1", 10, "Processing frame 10/20")
+        kind, task_id, result = events[1]
+        assert (kind, task_id) == ("completed", "task-1")
+        assert result["stats"] == {"total_detections": 3}
+        assert result["output_size_mb"] == pytest.approx(1 / 1024)
+        assert video_service.annotate_video_to_file.call_args.kwargs["confidence"] == 0.4
+        assert not os.path.exists(video_path)
+        assert not os.path.exists(output_paths[0])
+
+    def test_progress_written_to_frame_counter(self, video_path):
+        """Test that shared-memory progress replaces per-update progress events"""
+        async def annotate(video_path, progress_callback, **params):
+            progress_callback(10, "Processing frame 10/20")
+            raise RuntimeError("decode error")
+
+        video_service = Mock()
+        video_service.annotate_video_to_file = AsyncMock(side_effect=annotate)
+        frame_counters = [0, 0]
+
+        with patch('app.services.video_worker.YOLOService') as mock_yolo, \
+             patch('app.services.video_worker.VideoYOLOService', return_value=video_service):
+            mock_yolo.return_value.load_models = AsyncMock()
+            events = run_worker([("task-1", video_path, {})], frame_counters)
+
+        assert events == [("started", "task-1", 1), ("failed", "task-1", "decode error")]
+        assert frame_counters == [0, 10]
+
+    def test_cleanup_error_keeps_worker_running(self, video_path):
+        """Test that a video file that can't be removed doesn't strand later jobs"""
+        with patch('app.services.video_worker.YOLOService', side_effect=ImportError("no ultralytics")), \
+             patch('app.services.video_worker.Path.unlink', side_effect=PermissionError("EPERM")):
+            events = run_worker([("task-1", video_path, {}), ("task-2", video_path, {})])
+
+        assert [(kind, task_id) for kind, task_id, _ in events] == [("failed", "task-1"), ("failed", "task-2")]
+
+    def test_startup_failure_fails_jobs(self, video_path):
+        """Test that jobs fail (and are cleaned up) if the models can't load"""
+        with patch('app.services.video_worker.YOLOService', side_effect=ImportError("no ultralytics")):
+            events = run_worker([("task-1", video_path, {})])
+
+        assert len(events) == 1
+        kind, task_id, error = events[0]
+        assert (kind, task_id) == ("failed", "task-1")
+        assert "no ultralytics" in error
+        assert not os.path.exists(video_path)
+
+
+class TestVideoTaskWorker:
+    """Test applying worker events to the TaskManager"""
+
+    def test_apply_events(self):
+        """Test that progress, completion and failure reach the TaskManager"""
+        task_manager = TaskManager()
+        worker = VideoTaskWorker(processes=0, task_manager=task_manager)
+        done_id = task_manager.create_task(total_frames=20)
+        failed_id = task_manager.create_task(total_frames=20)
+
+        worker._apply_event(("progress", done_id, 10, "Processing frame 10/20"))
+        assert task_manager.get_task(done_id).progress == 0.5
+        assert task_manager.get_task(done_id).status == TaskStatus.PROCESSING
+
+        worker._apply_event(("completed", done_id, {"status": "success"}))
+        worker._apply_event(("failed", failed_id, "boom"))
+
+        assert task_manager.get_task(done_id).status == TaskStatus.COMPLETED
+        assert task_manager.get_task(done_id).result == {"status": "success"}
+        assert task_manager.get_task(failed_id).status == TaskStatus.FAILED
+        assert task_manager.get_task(failed_id).error == "boom"
+
+    def test_started_event_reads_frame_counter(self):
+        """Test that a started task reports the frame its worker last wrote"""
+        task_manager = TaskManager()
+        worker = VideoTaskWorker(processes=1, task_manager=task_manager)
+        task_id = task_manager.create_task(total_frames=20)
+
+        worker._apply_event(("started", task_id, 0))
+        worker._frames[0] = 5
+        task = task_manager.get_task(task_id)
+        assert task.status == TaskStatus.PROCESSING
+        assert (task.current_frame, task.progress) == (5, 0.25)
+
+        worker._frames[0] = 15
+        worker._apply_event(("completed", task_id, {"status": "success"}))
+        worker._frames[0] = 0  # Reset for the worker's next job
+        assert task_manager.get_task(task_id).current_frame == 15
@@ -0,0 +1,272 @@
+"""
+Tests for VideoYOLOService helpers that don't need a loaded model
+"""
+import pytest
+import numpy as np
+import cv2
+from unittest.mock import Mock, patch
+
+from app.services.video_yolo_service import VideoYOLOService
+
+SIZE = (4, 4)  # (width, height) of the fake frames
+
+class FakeFrames:
+    """read_frame stand-in that fills the given buffer with the frame number"""
+
+    def __init__(self, num_frames: int):
+        self.num_frames = num_frames
+        self.position = 0
+        self.buffers = set()
+
+    def __call__(self, buffer):
+        if self.position >= self.num_frames:
+            return None
+        self.buffers.add(id(buffer))
+        buffer.fill(self.position % 256)
+        self.position += 1
+        return buffer
+
+
+class FakeWriter:
+    """cv2.VideoWriter stand-in recording the tag of each written frame"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.written = []
+
+    def write(self, frame):
+        if self.fail:
+            raise IOError("disk full")
+        self.written.append(int(frame[0, 0, 0]))
+
+
+def passthrough(batch):
+    """annotate stand-in writing frames unchanged"""
+    return [frame for _, frame in batch]
+
+
+@pytest.fixture
+def video_service():
+    """VideoYOLOService without a loaded model (these helpers don't run inference)"""
+    service = object.__new__(VideoYOLOService)
+    service.yolo_service = Mock(device="cpu")
+    return service
+
+
+class TestRunPipeline:
+    """Test the decode/annotate/encode pipeline"""
+
+    def test_frames_written_in_order(self, video_service):
+        """Test that every frame is annotated and written in decode order"""
+        writer = FakeWriter()
+        seen = []
+
+        def annotate(batch):
+            seen.extend(frame_number for frame_number, _ in batch)
+            return [frame for _, frame in batch]
+
+        frames = video_service._run_pipeline(FakeFrames(50), SIZE, writer, annotate)
+
+        assert frames == 50
+        assert seen == list(range(50))
+        assert writer.written == list(range(50))
+
+    def test_frames_annotated_in_batches(self, video_service):
+        """Test that annotate gets full batches, then the remainder"""
+        writer = FakeWriter()
+        sizes = []
+
+        def annotate(batch):
+            sizes.append(len(batch))
+            return [frame for _, frame in batch]
+
+        frames = FakeFrames(50)
+        with patch('app.services.video_yolo_service.settings.video_pipeline_prefetch', 2):
+            video_service._run_pipeline(frames, SIZE, writer, annotate, batch_size=16)
+
+        assert sizes == [16, 16, 16, 2]
+        assert writer.written == list(range(50))
+        assert len(frames.buffers) <= 2 + 16 + 1
+
+    def test_buffers_reused(self, video_service):
+        """Test that frames are decoded into a fixed pool of buffers"""
+        frames = FakeFrames(100)
+        with patch('app.services.video_yolo_service.settings.video_pipeline_prefetch', 2):
+            video_service._run_pipeline(frames, SIZE, FakeWriter(), passthrough)
+        assert len(frames.buffers) <= 4
+
+    def test_on_frame_called_per_frame(self, video_service):
+        """Test that progress is reported with the running frame count"""
+        done = []
+        video_service._run_pipeline(
+            FakeFrames(5), SIZE, FakeWriter(), passthrough, on_frame=done.append
+        )
+        assert done == [1, 2, 3, 4, 5]
+
+    def test_annotate_error_stops_pipeline(self, video_service):
+        """Test that an inference error propagates and stops the reader"""
+        frames = FakeFrames(10_000)
+
+        def annotate(batch):
+            if batch[0][0] == 20:
+                raise RuntimeError("inference failed")
+            return [frame for _, frame in batch]
+
+        with pytest.raises(RuntimeError, match="inference failed"):
+            video_service._run_pipeline(frames, SIZE, FakeWriter(), annotate)
+        assert frames.position < frames.num_frames
+
+    def test_writer_error_propagates(self, video_service):
+        """Test that an encoder error surfaces from the pipeline"""
+        with pytest.raises(IOError, match="disk full"):
+            video_service._run_pipeline(FakeFrames(10_000), SIZE, FakeWriter(fail=True), passthrough)
+
+
+class TestOpenFrameSource:
+    """Test choosing the annotated-video decoder"""
+
+    @pytest.fixture
+    def video_path(self, tmp_path):
+        """Encode a 1s, 10 FPS video whose frame i has brightness i * 20"""
+        path = str(tmp_path / "test.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 10.0, (64, 48))
+        for i in range(10):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+        return path
+
+    @pytest.mark.parametrize("backend", ["opencv", "pyav"])
+    def test_decodes_all_frames(self, video_service, video_path, backend):
+        """Test that both backends decode every BGR frame into the given buffer"""
+        if backend == "pyav":
+            pytest.importorskip("av")
+
+        with patch('app.services.video_yolo_service.settings.video_backend', backend):
+            read_frame, size, close = video_service._open_frame_source(video_path)
+            try:
+                decoded = []
+                buffer = np.empty((48, 64, 3), dtype=np.uint8)
+                while (frame := read_frame(buffer)) is not None:
+                    assert frame is buffer
+                    decoded.append(frame.copy())
+            finally:
+                close()
+
+        assert size == (64, 48)
+        assert len(decoded) == 10
+        assert decoded[0].shape == (48, 64, 3)
+        assert abs(int(decoded[5].mean()) - 100) < 10
+
+    @pytest.mark.parametrize("backend", ["opencv", "pyav"])
+    def test_invalid_video(self, video_service, tmp_path, backend):
+        """Test that an unreadable file raises ValueError"""
+        if backend == "pyav":
+            pytest.importorskip("av")
+        path = tmp_path / "bad.mp4"
+        path.write_bytes(b"not a video")
+
+        with patch('app.services.video_yolo_service.settings.video_backend', backend):
+            with pytest.raises(ValueError):
+                video_service._open_frame_source(str(path))
+
+
+class TestIterVideoFrames:
+    """Test sequential decoding for whole-video detection"""
+
+    @pytest.fixture
+    def video_path(self, tmp_path):
+        """Encode a 1s, 10 FPS video whose frame i has brightness i * 20"""
+        path = str(tmp_path / "test.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 10.0, (64, 48))
+        for i in range(10):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+        return path
+
+    def test_bytes_and_path_decode_alike(self, video_path):
+        """Test that in-memory bytes (PyAV) and a file (OpenCV) give the same frames"""
+        pytest.importorskip("av")
+        with open(video_path, 'rb') as f:
+            video_bytes = f.read()
+
+        with patch('app.services.video_yolo_service.cv2.VideoCapture') as capture:
+            from_bytes = list(VideoYOLOService._iter_video_frames(video_bytes))
+        capture.assert_not_called()
+        from_path = list(VideoYOLOService._iter_video_frames(video_path))
+
+        assert len(from_bytes) == len(from_path) == 10
+        assert abs(int(from_bytes[5].mean()) - int(from_path[5].mean())) < 10
+
+    @pytest.mark.asyncio
+    async def test_video_info_from_bytes(self, video_service, video_path):
+        """Test reading metadata from in-memory bytes"""
+        pytest.importorskip("av")
+        video_service.executor = None  # Default executor
+        with open(video_path, 'rb') as f:
+            info = await video_service._get_video_info(f.read())
+
+        assert info == {
+            "total_frames": 10,
+            "fps": 10.0,
+            "duration_seconds": 1.0,
+            "resolution": (64, 48)
+        }
+
+    def test_invalid_path(self, tmp_path):
+        """Test that an unreadable file raises ValueError"""
+        path = tmp_path / "bad.mp4"
+        path.write_bytes(b"not a video")
+
+        with pytest.raises(ValueError):
+            list(VideoYOLOService._iter_video_frames(str(path)))
+
+    @pytest.mark.asyncio
+    async def test_process_video_frames_batched(self, video_service, video_path):
+        """Test that non-skipped frames go to the model in batches, results in order"""
+        calls = []
+
+        def predict(frames, **kwargs):
+            calls.append(len(frames))
+            return [Mock(frame=frame) for frame in frames]
+
+        video_service.executor = None  # Default executor
+        video_service.yolo_service.use_tensorrt = False
+        video_service.yolo_service.detection_model.predict = predict
+        video_service.yolo_service._parse_detection_results = lambda result: []
+
+        with patch('app.services.video_yolo_service.settings.video_batch_size', 2):
+            results = await video_service._process_video_frames(
+                video_path, 0.5, None, 1, {"fps": 10.0}
+            )
+
+        assert calls == [2, 2, 1]
+        assert [r["frame_number"] for r in results] == [0, 2, 4, 6, 8]
+        assert [r["timestamp"] for r in results] == [0.0, 0.2, 0.4, 0.6, 0.8]
+
+    @pytest.mark.asyncio
+    async def test_segment_objects_in_video(self, video_service, video_path):
+        """Test that the public segmentation call runs the batched segmentation path"""
+        calls = []
+
+        def predict(frames, **kwargs):
+            calls.append(len(frames))
+            return [Mock() for _ in frames]
+
+        video_service.executor = None  # Default executor
+        video_service.yolo_service.use_tensorrt = False
+        video_service.yolo_service.segmentation_model.predict = predict
+        video_service.yolo_service._parse_segmentation_results = lambda result: [
+            {"class_name": "car", "confidence": 0.9, "bbox": (0.0, 0.0, 1.0, 1.0), "mask": []}
+        ]
+        with open(video_path, 'rb') as f:
+            video_bytes = f.read()
+
+        with patch('app.services.video_yolo_service.settings.video_batch_size', 4):
+            result = await video_service.segment_objects_in_video(
+                video_bytes, confidence=0.5, classes=["car"], frame_skip=0
+            )
+
+        assert result["status"] == "success"
+        assert calls == [4, 4, 2]
+        assert len(result["frame_segmentations"]) == 10
+        assert result["summary"]["total_detections"] == 10
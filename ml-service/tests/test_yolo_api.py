@@ -8,7 +8,29 @@ import os
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.api.yolo import parse_classes
+import orjson
+import tempfile
+from io import BytesIO
+from fastapi import HTTPException, UploadFile
+from unittest.mock import AsyncMock, Mock, create_autospec, patch
+
+from app.api.yolo import (
+    parse_classes,
+    wants_multipart,
+    multipart_frames_response,
+    multipart_frames_stream_response,
+    _process_video_frames,
+    _submit_video_task,
+    _run_video_task,
+    detect_objects_in_video_annotated,
+    detect_stream,
+    detect_objects_in_video,
+    segment_objects_in_video,
+    get_task_status,
+    list_tasks
+)
+from app.services.task_manager import TaskManager, TaskStatus
+from app.services.video_yolo_service import VideoYOLOService
 
 
 class TestParseClasses:
@@ -17,17 +39,17 @@ class TestParseClasses:
     def test_parse_valid_classes(self):
         """Test parsing valid comma-separated class names"""
         result = parse_classes("person,car,dog")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_classes_with_spaces(self):
         """Test parsing classes with extra spaces"""
         result = parse_classes("person, car , dog")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_single_class(self):
         """Test parsing a single class"""
         result = parse_classes("person")
-        assert result == ["person"]
+        assert result == ("person",)
 
     def test_parse_empty_string(self):
         """Test parsing empty string returns None"""
@@ -40,33 +62,318 @@ class TestParseClasses:
         assert result is None
 
     def test_parse_whitespace_only(self):
-        """Test parsing whitespace-only string returns None or empty list"""
+        """Test parsing whitespace-only string returns None"""
         result = parse_classes("   ")
-        # The function returns empty list when all values are whitespace
-        assert result == [] or result is None
+        assert result is None
 
     def test_parse_classes_with_empty_values(self):
         """Test parsing with empty values between commas"""
         result = parse_classes("person,,car,  ,dog")
         # Empty values should be filtered out
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_classes_trailing_comma(self):
         """Test parsing with trailing comma"""
         result = parse_classes("person,car,dog,")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_classes_leading_comma(self):
         """Test parsing with leading comma"""
         result = parse_classes(",person,car,dog")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_classes_multiple_commas(self):
         """Test parsing with multiple consecutive commas"""
         result = parse_classes("person,,,car,,dog")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
 
     def test_parse_classes_complex(self):
         """Test parsing complex input with various edge cases"""
         result = parse_classes(" , person , , car , dog , , ")
-        assert result == ["person", "car", "dog"]
+        assert result == ("person", "car", "dog")
+
+    def test_parse_classes_cached(self):
+        """Test that repeated form values return the cached tuple"""
+        assert parse_classes("person,car") is parse_classes("person,car")
+
+    def test_parse_classes_interned(self):
+        """Test that different filter strings share interned class names"""
+        first = parse_classes("person, car")
+        second = parse_classes("car,person,dog")
+        assert first[0] is second[1]
+        assert first[1] is second[0]
+
+
+class TestMultipartFramesResponse:
+    """Test multipart/mixed frame responses"""
+
+    def test_wants_multipart(self):
+        """Test Accept header detection"""
+        request = Mock()
+        request.headers = {"accept": "multipart/mixed, application/json;q=0.5"}
+        assert wants_multipart(request) is True
+
+        request.headers = {"accept": "application/json"}
+        assert wants_multipart(request) is False
+
+        request.headers = {}
+        assert wants_multipart(request) is False
+
+    @pytest.mark.asyncio
+    async def test_multipart_frames_response(self):
+        """Test that JSON metadata comes first, then one raw JPEG part per frame"""
+        payload = {
+            "status": "success",
+            "frames": [
+                {"frame_index": 0, "timestamp": 0.0, "frame_base64": None,
+                 "frame_jpeg": b"\xff\xd8jpeg0", "count": 0},
+                {"frame_index": 30, "timestamp": 1.0, "frame_base64": None,
+                 "frame_jpeg": memoryview(b"\xff\xd8jpeg1"), "count": 1},
+            ]
+        }
+
+        response = multipart_frames_response(payload)
+        body = b"".join([bytes(chunk) async for chunk in response.body_iterator])
+
+        boundary = response.media_type.split("boundary=")[1]
+        parts = body.split(f"--{boundary}".encode())
+        assert parts[-1] == b"--\r\n"
+
+        headers, metadata = parts[1].strip(b"\r\n").split(b"\r\n\r\n", 1)
+        assert headers == b"Content-Type: application/json"
+        metadata = orjson.loads(metadata)
+        assert [f["frame_index"] for f in metadata["frames"]] == [0, 30]
+        assert all("frame_jpeg" not in f and "frame_base64" not in f for f in metadata["frames"])
+
+        headers, jpeg = parts[3].strip(b"\r\n").split(b"\r\n\r\n", 1)
+        assert b"Content-Type: image/jpeg" in headers
+        assert b"X-Frame-Index: 30" in headers
+        assert jpeg == b"\xff\xd8jpeg1"
+
+    @pytest.mark.asyncio
+    async def test_multipart_frames_stream_response(self):
+        """Test that each frame streams as a JPEG part plus a JSON part, then the summary"""
+        async def results():
+            yield {"frame_index": 0, "timestamp": 0.0, "frame_base64": None,
+                   "frame_jpeg": b"\xff\xd8jpeg0", "detections": [], "count": 0}
+            yield {"status": "success", "total_frames_processed": 1, "total_detections": 0,
+                   "video_info": {"total_frames": 30, "duration": 1.0}}
+
+        response = multipart_frames_stream_response(results(), total_key="total_detections")
+        body = b"".join([bytes(chunk) async for chunk in response.body_iterator])
+
+        boundary = response.media_type.split("boundary=")[1]
+        parts = [p.strip(b"\r\n").split(b"\r\n\r\n", 1) for p in body.split(f"--{boundary}".encode())[1:-1]]
+        assert len(parts) == 3
+
+        assert b"X-Frame-Index: 0" in parts[0][0]
+        assert parts[0][1] == b"\xff\xd8jpeg0"
+        frame = orjson.loads(parts[1][1])
+        assert frame["frame_index"] == 0 and "frame_jpeg" not in frame
+        assert orjson.loads(parts[2][1]) == {
+            "status": "success", "total_frames_in_video": 30, "video_duration": 1.0,
+            "frames_analyzed": 1, "total_detections": 0
+        }
+
+    @pytest.mark.asyncio
+    async def test_multipart_frames_stream_response_error(self):
+        """Test that a failure after streaming began ends with an error part"""
+        async def results():
+            raise RuntimeError("decoder crashed")
+            yield
+
+        response = multipart_frames_stream_response(results(), total_key="total_detections")
+        body = b"".join([bytes(chunk) async for chunk in response.body_iterator])
+
+        boundary = response.media_type.split("boundary=")[1]
+        assert body.endswith(f"--{boundary}--\r\n".encode())
+        error = orjson.loads(body.split(b"\r\n\r\n", 1)[1].split(b"\r\n")[0])
+        assert error["status"] == "error"
+        assert "decoder crashed" in error["detail"]
+
+
+class TestBackgroundVideoTasks:
+    """Test submitting whole-video requests as background tasks"""
+
+    @pytest.fixture
+    def task_manager(self):
+        """Patch in a fresh task manager"""
+        manager = TaskManager()
+        with patch("app.api.yolo.get_task_manager", return_value=manager):
+            yield manager
+
+    def test_submit_video_task(self, task_manager):
+        """Test that submitting queues the call and returns a task to poll"""
+        background_tasks = Mock()
+        process = AsyncMock(__name__="detect_objects_in_video")
+
+        response = _submit_video_task(background_tasks, process, video_bytes=b"video", confidence=0.5)
+
+        task_id = response["task_id"]
+        assert response["status_url"] == f"/api/task/{task_id}/status"
+        assert task_manager.get_task(task_id).status == TaskStatus.PENDING
+        background_tasks.add_task.assert_called_once_with(
+            _run_video_task, task_id, process, video_bytes=b"video", confidence=0.5
+        )
+        process.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("endpoint, method", [
+        (detect_objects_in_video, "detect_objects_in_video"),
+        (segment_objects_in_video, "segment_objects_in_video"),
+    ])
+    async def test_background_call_matches_service_signature(self, task_manager, endpoint, method):
+        """Test that queued whole-video calls are valid for the real VideoYOLOService methods"""
+        video_service = create_autospec(VideoYOLOService, instance=True)
+        getattr(video_service, method).return_value = {"status": "success"}
+        background_tasks = Mock()
+        video = UploadFile(file=BytesIO(b"video"), filename="clip.mp4")
+
+        response = await endpoint(
+            background_tasks, video=video, confidence=0.5, classes="car",
+            frame_skip=0, background=True, video_service=video_service
+        )
+
+        # Run the queued call; autospec rejects arguments the method doesn't take
+        await _run_video_task(*background_tasks.add_task.call_args.args[1:],
+                              **background_tasks.add_task.call_args.kwargs)
+        assert task_manager.get_task(response["task_id"]).status == TaskStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_run_video_task_completes(self, task_manager):
+        """Test that a successful run stores the result on the task"""
+        task_id = task_manager.create_task()
+        result = {"status": "success", "summary": {"total_detections": 3}}
+        process = AsyncMock(return_value=result)
+
+        await _run_video_task(task_id, process, video_bytes=b"video")
+
+        process.assert_awaited_once_with(video_bytes=b"video")
+        task = task_manager.get_task(task_id)
+        assert task.status == TaskStatus.COMPLETED
+        assert task.result == result
+
+    @pytest.mark.asyncio
+    async def test_run_video_task_fails(self, task_manager):
+        """Test that error results and exceptions mark the task failed"""
+        error_task = task_manager.create_task()
+        await _run_video_task(error_task, AsyncMock(return_value={"status": "error", "message": "bad video"}))
+
+        raising_task = task_manager.create_task()
+        await _run_video_task(raising_task, AsyncMock(side_effect=RuntimeError("boom")))
+
+        assert task_manager.get_task(error_task).status == TaskStatus.FAILED
+        assert task_manager.get_task(error_task).error == "bad video"
+        assert task_manager.get_task(raising_task).error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_task_status_and_list(self, task_manager):
+        """Test that status polling and task listing serialize with orjson"""
+        task_id = task_manager.create_task(total_frames=10)
+        task_manager.update_progress(task_id, 5, "Processing frame 5/10")
+
+        status = await get_task_status(task_id)
+        listing = await list_tasks()
+
+        assert status.media_type == "application/json"
+        body = orjson.loads(status.body)
+        assert body["status"] == "processing"
+        assert body["progress"] == 0.5
+        assert orjson.loads(listing.body)["stats"]["total_tasks"] == 1
+
+        task_manager.complete_task(task_id, {"status": "success"})
+        first, second = await get_task_status(task_id), await get_task_status(task_id)
+        assert first.body == second.body == task_manager.get_task(task_id).json_cache
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_task_status("missing")
+        assert exc_info.value.status_code == 404
+
+
+class TestAnnotatedVideoResponse:
+    """Test serving the annotated video"""
+
+    @pytest.mark.asyncio
+    async def test_served_from_disk_and_removed(self):
+        """Test that the annotated MP4 is sent as a file and removed afterwards"""
+        fd, output_path = tempfile.mkstemp(suffix=".mp4")
+        os.write(fd, b"annotated")
+        os.close(fd)
+
+        video_service = Mock()
+        video_service.annotate_video_to_file = AsyncMock(return_value=(
+            output_path,
+            {"total_detections": 4, "frames_processed": 10, "processing_time_seconds": 1.5}
+        ))
+        upload = UploadFile(file=BytesIO(b"video"), filename="clip.mp4")
+
+        response = await detect_objects_in_video_annotated(
+            video=upload, confidence=0.5, classes=None, frame_skip=0,
+            line_width=2, font_scale=0.6, video_service=video_service
+        )
+
+        input_path = video_service.annotate_video_to_file.call_args.kwargs["video_path"]
+        assert not os.path.exists(input_path)
+        assert response.path == output_path
+        assert response.media_type == "video/mp4"
+        assert response.headers["x-total-detections"] == "4"
+        assert 'filename="annotated_clip.mp4"' in response.headers["content-disposition"]
+
+        await response.background()
+        assert not os.path.exists(output_path)
+
+
+class TestStreamEndpoints:
+    """Test the real-time stream endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_detect_stream_returns_result_as_is(self):
+        """Test that the scheduler's result is serialized without re-validation"""
+        result = {
+            "status": "success",
+            "detections": [{"class_name": "car", "confidence": 0.9, "bbox": [1.0, 2.0, 3.0, 4.0]}],
+            "count": 1,
+            "image_shape": (480, 640),
+            "inference_time_ms": 4.2
+        }
+        service = Mock(resolve_classes=Mock(return_value=None), decode_stream_frame=Mock(return_value="frame"))
+        scheduler = Mock(submit=AsyncMock(return_value=result))
+        image = UploadFile(file=BytesIO(b"jpeg"), filename="frame.jpg")
+
+        response = await detect_stream(image, confidence=0.5, classes=None, service=service, scheduler=scheduler)
+
+        assert response.media_type == "application/json"
+        assert orjson.loads(response.body) == {**result, "image_shape": [480, 640]}
+
+    @pytest.mark.asyncio
+    async def test_detect_stream_error_result(self):
+        """Test that a service error result becomes a 500"""
+        service = Mock(resolve_classes=Mock(return_value=None), decode_stream_frame=Mock(return_value="frame"))
+        scheduler = Mock(submit=AsyncMock(return_value={"status": "error", "message": "boom"}))
+        image = UploadFile(file=BytesIO(b"jpeg"), filename="frame.jpg")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await detect_stream(image, confidence=0.5, classes=None, service=service, scheduler=scheduler)
+
+        assert exc_info.value.status_code == 500
+        assert "boom" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    async def test_video_frames_json_response(self):
+        """Test that multi-frame results are rendered by orjson directly"""
+        result = {
+            "status": "success",
+            "video_info": {"total_frames": 30, "duration": 1.0},
+            "total_frames_processed": 1,
+            "total_detections": 0,
+            "frames": [{"frame_index": 0, "timestamp": 0.0, "detections": []}]
+        }
+        process = AsyncMock(return_value=result)
+
+        response = await _process_video_frames(
+            Mock(headers={}), process, "total_detections", "Failed", video=None
+        )
+
+        assert response.media_type == "application/json"
+        assert orjson.loads(response.body)["frames"] == result["frames"]
+        process.assert_awaited_once_with(include_base64=True, video=None)
@@ -0,0 +1,201 @@
+"""
+Tests for YOLOService logic that doesn't need real models
+"""
+import asyncio
+import threading
+import time
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.yolo_service import YOLOService
+
+
+@pytest.fixture
+def yolo_service():
+    """YOLOService whose models are mocks with a small COCO-style name table"""
+    model = Mock(names={0: "person", 2: "car", 16: "dog"})
+    with patch("app.services.yolo_service.ULTRALYTICS_AVAILABLE", True), \
+         patch.object(YOLOService, "_load_model", return_value=model), \
+         patch("app.services.yolo_service.settings.model_warmup", False):
+        service = YOLOService()
+        asyncio.run(service.load_models())
+        yield service
+
+
+class TestClassResolution:
+    """Test class-name filters resolving to class IDs"""
+
+    def test_get_class_ids(self, yolo_service):
+        """Test names resolve case-insensitively and unknown names are skipped"""
+        assert yolo_service._get_class_ids(["Car", " 'person' ", "unicorn"]) == [2, 0]
+        assert yolo_service._get_class_ids(["unicorn"]) is None
+
+    def test_get_class_ids_passes_ids_through(self, yolo_service):
+        """Test that already-resolved IDs are kept as-is"""
+        assert yolo_service._get_class_ids([16, 2]) == [16, 2]
+
+    def test_resolve_classes(self, yolo_service):
+        """Test parsing a comma-separated form value into class IDs"""
+        assert yolo_service.resolve_classes("car, dog,,") == (2, 16)
+        assert yolo_service.resolve_classes("unicorn") is None
+        assert yolo_service.resolve_classes("") is None
+        assert yolo_service.resolve_classes(None) is None
+
+    def test_resolve_classes_cached(self, yolo_service):
+        """Test that repeated form values are served from the cache"""
+        yolo_service.resolve_classes("car,person")
+        yolo_service.resolve_classes("car,person")
+
+        info = yolo_service.resolve_classes.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
+class TestParseResults:
+    """Test turning YOLO result objects into response dicts"""
+
+    @pytest.fixture
+    def result(self):
+        """Result with two boxes and their mask polygons"""
+        boxes = Mock(
+            cls=np.array([2.0, 0.0]),
+            conf=np.array([0.75, 0.5]),
+            xyxy=np.array([[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]])
+        )
+        boxes.__len__ = Mock(return_value=2)
+        masks = Mock(xy=[np.array([[1.0, 2.0], [3.0, 4.0]]), np.array([[5.0, 6.0]])])
+        masks.__len__ = Mock(return_value=2)
+        return Mock(boxes=boxes, masks=masks, names={0: "person", 2: "car"})
+
+    def test_parse_detection_results(self, yolo_service, result):
+        """Test detections are built from whole-result arrays"""
+        assert yolo_service._parse_detection_results(result) == [
+            {"class_name": "car", "confidence": 0.75, "bbox": (1.0, 2.0, 3.0, 4.0)},
+            {"class_name": "person", "confidence": 0.5, "bbox": (5.0, 6.0, 7.0, 8.0)},
+        ]
+
+    def test_parse_segmentation_results(self, yolo_service, result):
+        """Test segments pair each box with its mask polygon"""
+        segments = yolo_service._parse_segmentation_results(result)
+
+        assert [segment["class_name"] for segment in segments] == ["car", "person"]
+        assert segments[0]["mask"] == [[1.0, 2.0], [3.0, 4.0]]
+        assert segments[1]["bbox"] == (5.0, 6.0, 7.0, 8.0)
+
+    def test_parse_empty_results(self, yolo_service):
+        """Test results without boxes or masks give no entries"""
+        empty = Mock(boxes=None, masks=None)
+        assert yolo_service._parse_detection_results(empty) == []
+        assert yolo_service._parse_segmentation_results(empty) == []
+
+
+class TestDecodeStreamFrame:
+    """Test choosing between GPU and CPU decoding for stream frames"""
+
+    @pytest.fixture
+    def jpeg_bytes(self):
+        """Small JPEG frame"""
+        return cv2.imencode(".jpg", np.zeros((20, 30, 3), dtype=np.uint8))[1].tobytes()
+
+    def test_cpu_decode(self, yolo_service, jpeg_bytes):
+        """Test that frames are decoded on the CPU when GPU decoding is off"""
+        yolo_service.gpu_decode = False
+        with patch.object(YOLOService, "_decode_gpu") as decode_gpu:
+            frame = yolo_service.decode_stream_frame(jpeg_bytes)
+
+        decode_gpu.assert_not_called()
+        assert frame.shape == (20, 30, 3)
+
+    def test_gpu_decode_jpeg_only(self, yolo_service, jpeg_bytes):
+        """Test that only JPEG frames go to the GPU decoder"""
+        yolo_service.gpu_decode = True
+        gpu_frame = np.zeros((20, 30, 3), dtype=np.uint8)
+        png_bytes = cv2.imencode(".png", gpu_frame)[1].tobytes()
+
+        with patch.object(YOLOService, "_decode_gpu", return_value=gpu_frame) as decode_gpu:
+            assert yolo_service.decode_stream_frame(jpeg_bytes) is gpu_frame
+            assert yolo_service.decode_stream_frame(png_bytes).shape == (20, 30, 3)
+
+        decode_gpu.assert_called_once_with(jpeg_bytes)
+
+    def test_gpu_decode_falls_back_to_cpu(self, yolo_service, jpeg_bytes):
+        """Test that a failed GPU decode is retried on the CPU"""
+        yolo_service.gpu_decode = True
+        with patch.object(YOLOService, "_decode_gpu", side_effect=RuntimeError("nvjpeg")):
+            frame = yolo_service.decode_stream_frame(jpeg_bytes)
+
+        assert frame.shape == (20, 30, 3)
+
+
+class TestRunInference:
+    """Test offloading model calls to the inference pool"""
+
+    def test_runs_in_executor_thread(self, yolo_service):
+        """Test that model calls run off the event loop thread"""
+        caller = threading.get_ident()
+        worker = asyncio.run(yolo_service._run_inference(threading.get_ident))
+
+        assert worker != caller
+        assert not hasattr(yolo_service._thread_local, "cuda_stream")  # CPU: no streams
+
+    def test_cuda_warmup_covers_every_worker(self, yolo_service):
+        """Test that CUDA warmup runs on each inference thread"""
+        threads = set()
+
+        def predict(*args, **kwargs):
+            threads.add(threading.get_ident())
+            time.sleep(0.05)
+
+        yolo_service.device = "cuda"
+        for model in (yolo_service.detection_model, yolo_service.segmentation_model):
+            model.predict = predict
+
+        with patch.object(YOLOService, "_run_on_worker_stream", lambda self, fn: fn()), \
+             patch("app.services.yolo_service.settings.warmup_batch_sizes", [1]), \
+             patch("app.services.yolo_service.settings.warmup_iterations", 1):
+            asyncio.run(yolo_service._warmup_models())
+
+        assert len(threads) == yolo_service.executor._max_workers
+
+    def test_detect_batch_accepts_stacked_array(self, yolo_service):
+        """Test that an (N, H, W, 3) batch is split into per-frame inputs"""
+        seen = []
+
+        def predict(frames, **kwargs):
+            seen.append(frames)
+            return [Mock(boxes=None, orig_shape=frame.shape[:2]) for frame in frames]
+
+        yolo_service.detection_model.predict = predict
+        batch = np.zeros((3, 20, 30, 3), dtype=np.uint8)
+
+        results = asyncio.run(yolo_service.detect_batch(batch, confidence=0.5))
+
+        assert len(results) == 3
+        assert [frame.shape for frame in seen[0]] == [(20, 30, 3)] * 3
+
+
+class TestLoadModel:
+    """Test choosing the model format to load"""
+
+    def test_int8_exports_openvino_once(self, tmp_path):
+        """Test that INT8 on CPU exports an OpenVINO model, then reuses it"""
+        weights = tmp_path / "yolo11n.pt"
+        export_dir = tmp_path / "yolo11n_int8_openvino_model"
+        with patch("app.services.yolo_service.ULTRALYTICS_AVAILABLE", True), \
+             patch("app.services.yolo_service.settings.precision", "int8"):
+            yolo_service = YOLOService()
+        assert yolo_service.use_openvino_int8
+
+        def export(**kwargs):
+            export_dir.mkdir()
+            return str(export_dir)
+
+        with patch("app.services.yolo_service.YOLO", create=True) as yolo:
+            yolo.return_value.export.side_effect = export
+            yolo_service._load_model(str(weights))
+            yolo_service._load_model(str(weights))
+
+        yolo.return_value.export.assert_called_once_with(format="openvino", int8=True)
+        assert yolo.call_args_list[-1].args == (str(export_dir),)
+        yolo.return_value.to.assert_not_called()